@@ -0,0 +1,95 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compares decode, parse and encode time (in ms) of the available JSON
+codecs on synthetic effective member lists and group documents.
+
+    python benchmarks/bench_codec.py [--members 50000] [--groups 2000]
+"""
+
+from commonconf.backends import use_configparser_backend
+from os.path import abspath, dirname
+import argparse
+import json
+import os
+import timeit
+
+use_configparser_backend(abspath(os.path.join(
+    dirname(__file__), "..", "conf", "test.conf")), "GWS")
+
+from uw_gws import GWS  # noqa: E402
+from uw_gws.codec import available_codecs, get_codec  # noqa: E402
+
+
+def member_payload(count):
+    return json.dumps({"data": [
+        {"id": "netid{}".format(i), "type": "uwnetid",
+         "mtype": "direct" if i % 3 else "indirect",
+         "source": "u_acadev_source{}".format(i % 7)}
+        for i in range(count)]})
+
+
+def group_payload(index):
+    entities = [{"id": "user{}".format(i), "type": "uwnetid",
+                 "name": "User {}".format(i)} for i in range(10)]
+    return json.dumps({"data": {
+        "id": "u_acadev_bench{}".format(index),
+        "regid": "{:032x}".format(index),
+        "displayName": "Benchmark group {}".format(index),
+        "description": "Synthetic group used for codec benchmarks",
+        "contact": "javerage", "authnfactor": 1, "classification": "u",
+        "dependson": "", "lastModified": 1626119425407,
+        "lastMemberModified": 1626119425407,
+        "admins": entities, "updaters": entities, "creators": entities,
+        "readers": entities, "optins": [], "optouts": [],
+        "affiliates": [{"name": "google", "status": "active",
+                        "forward": "", "sender": entities[:2]}]}})
+
+
+def run(members, groups, repeat):
+    gws = GWS()
+
+    members_doc = member_payload(members)
+    group_docs = [group_payload(i) for i in range(groups)]
+
+    print("{:8} {:>14} {:>14} {:>14} {:>14} {:>14}".format(
+        "codec", "members loads", "members parse", "groups loads",
+        "groups parse", "groups dumps"))
+    for name in available_codecs():
+        codec = get_codec(name)
+
+        def load_members():
+            return codec.loads(members_doc)
+
+        def load_groups():
+            return [codec.loads(d) for d in group_docs]
+
+        def parse_members():
+            return [gws._group_member_from_json(d)
+                    for d in codec.loads(members_doc)["data"]]
+
+        def parse_groups():
+            return [gws._group_from_json(codec.loads(d)["data"])
+                    for d in group_docs]
+
+        bodies = [{"data": gws._group_from_json(
+            json.loads(d)["data"]).json_data(is_put_req=True)}
+            for d in group_docs]
+
+        def dump_groups():
+            return [codec.dumps(b) for b in bodies]
+
+        print("{:8} {:>14.1f} {:>14.1f} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+            name, *[min(timeit.repeat(f, number=1, repeat=repeat)) * 1e3
+                    for f in (load_members, parse_members, load_groups,
+                              parse_groups, dump_groups)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=50000)
+    parser.add_argument("--groups", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.members, args.groups, args.repeat)
@@ -0,0 +1,91 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Measures the cold start cost of uw_gws as seen by cron jobs and serverless
+functions: importing the package, creating a GWS client, and the first
+(mock) request, each in a fresh interpreter.  Exits with status 1 if the
+median import or construction time is over its threshold.
+
+    python benchmarks/bench_import.py [--runs 7] [--max-import-ms 60]
+"""
+
+from os.path import abspath, dirname
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CONF = abspath(os.path.join(dirname(__file__), "..", "conf", "test.conf"))
+
+CHILD = """
+import json, sys, time
+from commonconf.backends import use_configparser_backend
+use_configparser_backend({conf!r}, "GWS")
+
+start = time.perf_counter()
+import uw_gws
+imported = time.perf_counter()
+gws = uw_gws.GWS()
+created = time.perf_counter()
+for i in range({constructions}):
+    uw_gws.GWS()
+constructed = time.perf_counter()
+heavy = [m for m in ("restclients_core.dao", "urllib3", "uw_gws.models")
+         if m in sys.modules]
+
+gws.get_members("u_acadev_unittest")
+done = time.perf_counter()
+
+json.dump({{
+    "import_ms": (imported - start) * 1000,
+    "construct_us": (constructed - created) * 1e6 / {constructions},
+    "first_request_ms": (done - constructed) * 1000,
+    "heavy_modules": heavy,
+}}, sys.stdout)
+"""
+
+
+def run_child(constructions):
+    code = CHILD.format(constructions=constructions, conf=CONF)
+    out = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(out.decode())
+
+
+def run(runs, constructions, max_import_ms, max_construct_us):
+    results = [run_child(constructions) for i in range(runs)]
+    medians = dict((key, statistics.median(r[key] for r in results))
+                   for key in ("import_ms", "construct_us",
+                               "first_request_ms"))
+
+    print("{:18} {:>10}".format("stage", "median"))
+    print("{:18} {:>8.1f}ms".format("import uw_gws", medians["import_ms"]))
+    print("{:18} {:>8.1f}us".format("GWS()", medians["construct_us"]))
+    print("{:18} {:>8.1f}ms".format("first request",
+                                    medians["first_request_ms"]))
+
+    failures = []
+    if medians["import_ms"] > max_import_ms:
+        failures.append("import took {:.1f}ms, limit {}ms".format(
+            medians["import_ms"], max_import_ms))
+    if medians["construct_us"] > max_construct_us:
+        failures.append("GWS() took {:.1f}us, limit {}us".format(
+            medians["construct_us"], max_construct_us))
+    for module in results[0]["heavy_modules"]:
+        failures.append("{} is imported by GWS()".format(module))
+    for failure in failures:
+        print("FAIL: {}".format(failure))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--constructions", type=int, default=1000)
+    parser.add_argument("--max-import-ms", type=float, default=60)
+    parser.add_argument("--max-construct-us", type=float, default=50)
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.constructions, args.max_import_ms,
+                 args.max_construct_us))
@@ -0,0 +1,112 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compares the memory and lookup time of effective memberships held as lists
+of GroupMember (as returned by GWS.get_effective_members) and in a
+MembershipStore, for synthetic groups drawn from a shared population.
+
+    python benchmarks/bench_membership.py [--groups 1000] [--members 500]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from uw_gws import GWS
+from uw_gws.membership import MembershipStore
+
+
+def member_data(groups, members, population):
+    rand = random.Random(42)
+    netids = ["netid{}".format(i) for i in range(population)]
+    sources = ["u_acadev_source{}".format(i) for i in range(20)]
+    data = {}
+    for i in range(groups):
+        data["u_acadev_bench{}".format(i)] = [
+            {"id": netid, "type": "uwnetid",
+             "mtype": "direct" if j % 3 else "indirect",
+             "source": None if j % 3 else rand.choice(sources)}
+            for j, netid in enumerate(rand.sample(netids, members))]
+    return data, netids
+
+
+def measure(build):
+    # Returns the result of build and the bytes it holds
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+def run(groups, members, population, lookups):
+    gws = GWS()
+    # Copies the strings, as each group's JSON is decoded separately
+    data, netids = member_data(groups, members, population)
+    data = dict((group_id, [dict((k, "".join(v) if v else v)
+                                 for k, v in d.items()) for d in members])
+                for group_id, members in data.items())
+
+    lists, list_bytes = measure(lambda: dict(
+        (group_id, [gws._group_member_from_json(d) for d in members])
+        for group_id, members in data.items()))
+
+    def build_store():
+        store = MembershipStore()
+        for group_id, members in data.items():
+            store.update_json(group_id, members)
+        return store
+    store, store_bytes = measure(build_store)
+
+    rand = random.Random(7)
+    group_ids = list(data)
+    checks = [(rand.choice(group_ids), rand.choice(netids))
+              for i in range(lookups)]
+
+    start = time.perf_counter()
+    for group_id, netid in checks:
+        any(m.name == netid for m in lists[group_id])
+    list_lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for group_id, netid in checks:
+        store.is_member(group_id, netid)
+    store_lookup = time.perf_counter() - start
+
+    pairs = [(rand.choice(group_ids), rand.choice(group_ids))
+             for i in range(lookups // 10)]
+    start = time.perf_counter()
+    for a, b in pairs:
+        set(m.name for m in lists[a]) & set(m.name for m in lists[b])
+    list_intersect = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        store.intersection(a, b)
+    store_intersect = time.perf_counter() - start
+
+    print("{} groups x {} members from {} netids".format(
+        groups, members, population))
+    print("{:18} {:>12} {:>14} {:>16}".format(
+        "representation", "memory MB", "is_member us", "intersect us"))
+    for name, used, lookup, intersect in (
+            ("GroupMember lists", list_bytes, list_lookup, list_intersect),
+            ("MembershipStore", store_bytes, store_lookup, store_intersect)):
+        print("{:18} {:>12.1f} {:>14.2f} {:>16.1f}".format(
+            name, used / 1e6, lookup * 1e6 / len(checks),
+            intersect * 1e6 / len(pairs)))
+    print("store arrays: {:.1f} MB, symbols: {}".format(
+        store.nbytes() / 1e6, len(store.symbols)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--population", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.groups, args.members, args.population, args.lookups)
@@ -20,11 +20,15 @@ url = "https://github.com/uw-it-aca/uw-restclients-gws"
 setup(
     name='UW-RestClients-GWS',
     version=VERSION,
-    packages=['uw_gws'],
+    packages=['uw_gws', 'uw_gws.cache'],
     author="UW-IT SETS",
     author_email="aca-it@uw.edu",
     include_package_data=True,
     install_requires=['UW-RestClients-Core'],
+    extras_require={'fast': ['orjson'], 'brotli': ['brotli']},
+    entry_points={
+        'console_scripts': ['uw-gws=uw_gws.cli:main'],
+    },
     license='Apache License, Version 2.0',
     description=('A library for connecting to the Groups Web Service at the '
                  'University of Washington'),
@@ -6,33 +6,198 @@
 This is the interface for interacting with the Group Web Service.
 """
 
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
 from datetime import datetime
-from copy import deepcopy
+import importlib
 import json
 import logging
 import re
+import threading
+import time
+from hashlib import sha1
 from urllib.parse import urlencode
 from restclients_core.exceptions import DataFailureException
-from uw_gws.dao import GWS_DAO
-from uw_gws.models import (
-    Group, CourseGroup, GroupReference, GroupEntity, GroupMember,
-    GroupAffiliate, GroupHistory)
-from uw_gws.exceptions import InvalidGroupID
+from uw_gws.compression import TransferStats, accept_encoding, decode_response
+from uw_gws.deadline import INCOMPLETE, deadline
+from uw_gws.scheduler import DEFAULT, INTERACTIVE
+from uw_gws.tracing import traced
+from uw_gws.exceptions import DeadlineExceeded, InvalidGroupID
+
+# The DAO (restclients_core, urllib3), the models and the settings are
+# imported on first use, so that importing uw_gws and creating a client
+# stay cheap for short-lived processes.  See benchmarks/bench_import.py.
+_UNSET = object()
+
+# Names importable from uw_gws, loaded by __getattr__ on first use
+_LAZY_EXPORTS = {
+    "GWS_DAO": "uw_gws.dao",
+    "Group": "uw_gws.models",
+    "CourseGroup": "uw_gws.models",
+    "GroupReference": "uw_gws.models",
+    "GroupEntity": "uw_gws.models",
+    "GroupMember": "uw_gws.models",
+    "GroupAffiliate": "uw_gws.models",
+    "GroupHistory": "uw_gws.models",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def _models():
+    """
+    Returns uw_gws.models, imported on first use.
+    """
+    return importlib.import_module("uw_gws.models")
+
+
+_act_as = ContextVar("uw_gws_act_as", default=None)
+_uncached = ContextVar("uw_gws_uncached", default=False)
+
+
+@contextmanager
+def acting_as(netid):
+    """
+    Makes the GWS requests in the block, and in batch operations started
+    in it, as netid in place of the client's act_as.  Pass "" to make
+    them without acting as anyone.  A client can then be shared between
+    threads acting for different users.
+    """
+    token = _act_as.set(netid)
+    try:
+        yield
+    finally:
+        _act_as.reset(token)
+
+
+@contextmanager
+def uncached():
+    """
+    Makes the reads in the block, and in batch operations started in it,
+    from GWS rather than from the client's cache or refresher.  What is
+    read is still stored in the cache.
+    """
+    token = _uncached.set(True)
+    try:
+        yield
+    finally:
+        _uncached.reset(token)
 
 
 class GWS(object):
     """
     The GWS object has methods for getting group information.
+
+    A client can be shared between threads: requests carry no per-call
+    state on the client, and use the DAO and connection pool shared by
+    the process.  Use acting_as() for per-request act_as.
     """
     API = '/group_sws/v3'
     QTRS = {'win': 'winter', 'spr': 'spring', 'sum': 'summer', 'aut': 'autumn'}
     RE_GROUP_ID = re.compile(r'^[a-z0-9][\w\.-]+$', re.I)
-
-    def __init__(self, act_as=None, log_errors=False):
-        self.DAO = GWS_DAO()
+    # Group fields set by the service, left out of group fingerprints
+    SERVER_FIELDS = ("regid", "lastModified", "lastMemberModified")
+    # Seconds member counts are reused by get_effective_member_counts
+    COUNT_TTL = 60
+    # Member counts kept for reuse, the least recently counted are dropped
+    # first
+    MAX_COUNTS = 10000
+    # Group states kept for update_group, the least recently fetched are
+    # dropped first
+    MAX_GROUP_STATES = 1000
+    # Group model fields and their GWS JSON keys
+    GROUP_JSON_FIELDS = (
+        ("name", "id"), ("uwregid", "regid"), ("display_name", "displayName"),
+        ("description", "description"), ("contact", "contact"),
+        ("authnfactor", "authnfactor"), ("classification", "classification"),
+        ("dependson", "dependson"))
+    GROUP_COLUMNS = tuple(name for name, key in GROUP_JSON_FIELDS) + (
+        "last_modified", "membership_modified")
+
+    def __init__(self, act_as=None, log_errors=False, cache=None,
+                 timeout=None, scheduler=None, tracer=None, dao=None):
+        """
+        :param cache: optional uw_gws.cache.CacheBackend for read requests
+        :param timeout: optional limit in seconds on each request, within
+            any uw_gws.deadline.deadline() in effect
+        :param scheduler: optional uw_gws.scheduler.RequestScheduler,
+            shared by the clients that share a connection pool
+        :param tracer: optional uw_gws.tracing.Tracer, to record spans for
+            each stage of a call
+        :param dao: optional uw_gws.dao.GWS_DAO, by default the DAO shared
+            by all clients in the process
+        """
+        self._dao = dao
+        self._codec = None
+        self._accept_encoding = _UNSET
+        self.cache = cache
+        self.transfer_stats = TransferStats()
         self.act_as = act_as
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.tracer = tracer
         self.logger = logging.getLogger(__name__) if log_errors else None
+        # uw_gws.refresh.Refresher serving reads, see start_refresher()
+        self.refresher = None
+        self._timeline = None
+        # (group id, is_effective, act_as): (count, time counted)
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        # (act_as, group id): (JSON data, ETag) of the last group state
+        # fetched, fingerprinted only when the group is updated
+        self._group_state = {}
+        self._group_state_lock = threading.Lock()
+
+    @property
+    def DAO(self):
+        if self._dao is None:
+            from uw_gws.dao import shared_dao
+            self._dao = shared_dao()
+        return self._dao
+
+    @DAO.setter
+    def DAO(self, dao):
+        self._dao = dao
+
+    @property
+    def codec(self):
+        """
+        The uw_gws.codec codec named by the JSON_CODEC setting.
+        """
+        if self._codec is None:
+            from uw_gws.codec import get_codec
+            self._codec = get_codec(
+                self.DAO.get_service_setting("JSON_CODEC"))
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec):
+        self._codec = codec
+
+    @property
+    def accept_encoding(self):
+        """
+        The Accept-Encoding sent with requests, from the COMPRESSION
+        setting.
+        """
+        if self._accept_encoding is _UNSET:
+            self._accept_encoding = accept_encoding(
+                self.DAO.get_service_setting("COMPRESSION"))
+        return self._accept_encoding
 
+    @accept_encoding.setter
+    def accept_encoding(self, value):
+        self._accept_encoding = value
+
+    @traced
     def search_groups(self, **kwargs):
         """
         Returns a list of restclients.GroupReference objects matching the
@@ -71,59 +236,189 @@ class GWS(object):
 
         data = self._get_resource(url)
 
-        groups = []
-        for datum in data.get('data', []):
-            group = GroupReference(uwregid=datum.get('regid'),
-                                   name=datum.get('id'),
-                                   url=datum.get('url'))
-            if datum.get('displayName') is not None:
-                group.display_name = datum.get('displayName')
-            else:
-                group.display_name = datum.get('name')
-            groups.append(group)
+        GroupReference = _models().GroupReference
+
+        with self._span("parse"):
+            groups = []
+            for datum in data.get('data', []):
+                group = GroupReference(uwregid=datum.get('regid'),
+                                       name=datum.get('id'),
+                                       url=datum.get('url'))
+                if datum.get('displayName') is not None:
+                    group.display_name = datum.get('displayName')
+                else:
+                    group.display_name = datum.get('name')
+                groups.append(group)
 
         return groups
 
+    def groups_for_members(self, netids, effective=True, stem=None,
+                           max_workers=8):
+        """
+        Yields (netid, [GroupReference]) pairs as the member searches for
+        netids complete, running max_workers searches at once.  Repeated
+        netids are searched once in a call.  Searches are reused between
+        calls only if the client was created with a cache.  If stem is
+        passed, only groups under it are returned.
+
+        Netids not searched before the deadline are yielded with INCOMPLETE
+        in place of the list, and netids whose search failed with the
+        exception, so one failure doesn't end the run.
+        """
+        from uw_gws.utilities import map_concurrent
+
+        kwargs = {"type": "effective"} if effective else {}
+        prefix = None if stem is None else stem.lower() + "_"
+
+        def search(netid):
+            groups = self.search_groups(member=netid, **kwargs)
+            if prefix is not None:
+                groups = [g for g in groups if (
+                    g.name.lower() + "_").startswith(prefix)]
+            return groups
+
+        def distinct(netids):
+            seen = set()
+            for netid in netids:
+                if netid not in seen:
+                    seen.add(netid)
+                    yield netid
+
+        for netid, groups, ex in map_concurrent(
+                search, distinct(netids), max_workers):
+            if isinstance(ex, DeadlineExceeded):
+                groups = INCOMPLETE
+            elif ex is not None:
+                groups = ex
+            yield netid, groups
+
+    @traced
     def get_group_by_id(self, group_id):
         """
         Returns a restclients.Group object for the group identified by the
         passed group ID.
         """
         self._valid_group_id(group_id)
+        if self._use_refresher():
+            return self.refresher.get_group_by_id(group_id,
+                                                  self._acting_as())
+
+        url = "{}/group/{}".format(self.API, group_id)
+
+        data, response = self._fetch_resource(url)
+
+        with self._span("parse"):
+            group = self._group_from_json(data.get("data"))
+        if response is not None:
+            self._record_group_state(group.name, data.get("data"), response)
+        return group
+
+    @traced
+    def group_exists(self, group_id):
+        """
+        Returns True if the group identified by the passed group ID exists,
+        False if it is not found.
+        """
+        self._valid_group_id(group_id)
+
+        url = "{}/group/{}".format(self.API, group_id)
+        try:
+            self._get_resource(url)
+        except DataFailureException as ex:
+            if ex.status == 404:
+                return False
+            raise
+        return True
+
+    def preflight(self, group_ids=(), members=None, check_exists=False,
+                  max_workers=8):
+        """
+        Checks a batch of group IDs and members before any of it is
+        written, and returns a uw_gws.preflight.PreflightReport.
+        :param members: optional dict of group ID to its members
+        :param check_exists: also look up group_ids and group members
+        """
+        from uw_gws.preflight import preflight
+        return preflight(self, group_ids, members=members,
+                         check_exists=check_exists, max_workers=max_workers)
+
+    @traced
+    def get_group_affiliates(self, group_id):
+        """
+        Returns a list of restclients.GroupAffiliate objects, with their
+        senders, for the group identified by the passed group ID, without
+        building the rest of the group.
+        """
+        self._valid_group_id(group_id)
 
         url = "{}/group/{}".format(self.API, group_id)
 
         data = self._get_resource(url)
 
-        return self._group_from_json(data.get("data"))
+        GroupAffiliate = _models().GroupAffiliate
+
+        with self._span("parse"):
+            affiliates = []
+            for datum in data.get("data").get("affiliates", []):
+                affiliate = GroupAffiliate(name=datum.get("name"),
+                                           status=datum.get("status"),
+                                           forward=datum.get("forward"))
+                affiliate.senders = [self._group_entity_from_json(d)
+                                     for d in datum.get("sender", [])]
+                affiliates.append(affiliate)
+        return affiliates
 
+    @traced
     def create_group(self, group):
         """
         Creates a group from the passed restclients.Group object.
         """
         self._valid_group_id(group.name)
 
-        body = {"data": group.json_data(is_put_req=True)}
+        with self._span("serialize"):
+            body = {"data": group.json_data(is_put_req=True)}
         url = "{}/group/{}".format(self.API, group.name)
 
-        data = self._put_resource(url, headers={}, body=body)
+        data, response = self._send_resource(url, headers={}, body=body)
 
-        return self._group_from_json(data.get("data"))
+        with self._span("parse"):
+            created = self._group_from_json(data.get("data"))
+        self._record_group_state(created.name, data.get("data"), response)
+        return created
 
-    def update_group(self, group):
+    @traced
+    def update_group(self, group, force=False):
         """
         Updates a group from the passed restclients.Group object.
+
+        If the group matches the state last fetched from GWS, no request is
+        made and the passed group is returned, unless force is True.
+        Otherwise the update is conditional on the ETag of the last fetch,
+        and raises DataFailureException with status 412 if the group has
+        been changed since.
         """
         self._valid_group_id(group.name)
 
-        body = {"data": group.json_data(is_put_req=True)}
-        headers = {"If-Match": "*"}
+        with self._span("serialize"):
+            body = {"data": group.json_data(is_put_req=True)}
+        state, etag = self._group_state.get(
+            (self._acting_as(), group.name), (None, None))
+        if not force and state is not None and (
+                self._state_fingerprint(state) ==
+                self._group_fingerprint(body["data"])):
+            return group
+
+        headers = {"If-Match": etag or "*"}
         url = "{}/group/{}".format(self.API, group.name)
 
-        data = self._put_resource(url, headers, body)
+        data, response = self._send_resource(url, headers, body)
 
-        return self._group_from_json(data.get("data"))
+        with self._span("parse"):
+            updated = self._group_from_json(data.get("data"))
+        self._record_group_state(updated.name, data.get("data"), response)
+        return updated
 
+    @traced
     def delete_group(self, group_id):
         """
         Deletes the group identified by the passed group ID.
@@ -136,6 +431,7 @@ class GWS(object):
 
         return True
 
+    @traced
     def get_members(self, group_id):
         """
         Returns a list of restclients.GroupMember objects for the group
@@ -147,11 +443,11 @@ class GWS(object):
 
         data = self._get_resource(url)
 
-        members = []
-        for datum in data.get("data"):
-            members.append(self._group_member_from_json(datum))
-        return members
+        with self._span("parse"):
+            return [self._group_member_from_json(datum)
+                    for datum in data.get("data")]
 
+    @traced
     def add_members(self, group_id, members):
         """
         Adds members into the group identified by group_id
@@ -167,6 +463,7 @@ class GWS(object):
 
         return True
 
+    @traced
     def delete_members(self, group_id, members):
         """
         Deletes members from the group identified by group_id
@@ -181,6 +478,7 @@ class GWS(object):
 
         return True
 
+    @traced
     def update_members(self, group_id, members):
         """
         Updates the membership of the group represented by the passed group id.
@@ -188,7 +486,9 @@ class GWS(object):
         """
         self._valid_group_id(group_id)
 
-        body = {"data": [m.json_data(is_put_req=True) for m in members]}
+        with self._span("serialize"):
+            body = {"data": [m.json_data(is_put_req=True)
+                             for m in members]}
         headers = {"If-Match": "*"}
         url = "{}/group/{}/member".format(self.API, group_id)
 
@@ -199,6 +499,7 @@ class GWS(object):
             return errors[0].get("notFound", [])
         return []
 
+    @traced
     def get_group_history(self, group_id,
                           activity=None,
                           start=0,
@@ -221,28 +522,82 @@ class GWS(object):
         self._valid_group_id(group_id)
         if len(kwargs):
             url = "{}?{}".format(url, urlencode(kwargs))
-        data = self._get_resource(url)
-        changes = []
-        for datum in data.get("data"):
-            changes.insert(0, GroupHistory(data=datum))
+        # History is polled with the same start until there are changes,
+        # so it isn't cached
+        data = self._fetch_resource(url, cached=False)[0]
+
+        GroupHistory = _models().GroupHistory
+        with self._span("parse"):
+            changes = []
+            for datum in data.get("data"):
+                changes.insert(0, GroupHistory(data=datum))
         return changes
 
+    def membership_at(self, group_id, timestamp):
+        """
+        Returns the set of direct member ids of the group identified by the
+        passed group ID at timestamp, a datetime or epoch seconds.  See
+        uw_gws.history.MembershipTimeline.
+        """
+        self._valid_group_id(group_id)
+
+        if self._timeline is None:
+            from uw_gws.history import MembershipTimeline
+            self._timeline = MembershipTimeline(self)
+        return self._timeline.membership_at(group_id, timestamp)
+
+    def watch(self, group_ids, since=None, **kwargs):
+        """
+        Returns a uw_gws.watch.Watcher, which yields MemberAdded and
+        MemberDeleted events for the passed group IDs from group history,
+        with "for" or "async for".
+        :param since: a WatchCursor to resume from, or epoch seconds or a
+            datetime to start from, defaults to now
+        """
+        group_ids = list(group_ids)
+        for group_id in group_ids:
+            self._valid_group_id(group_id)
+
+        from uw_gws.watch import Watcher
+        return Watcher(self, group_ids, since=since, **kwargs)
+
+    def start_refresher(self, interval=30, **kwargs):
+        """
+        Serves get_group_by_id and get_effective_members from memory,
+        refreshing hot groups in the background, and returns the
+        uw_gws.refresh.Refresher made with kwargs.  Writes made through
+        the client drop its entries for the group; refresher.stop() ends
+        it.  The groups and members returned are shared between callers:
+        copy them before making changes.
+        """
+        from uw_gws.refresh import Refresher
+        if self.refresher is not None:
+            self.refresher.stop()
+        refresher = Refresher(self, **kwargs)
+        refresher.start(interval)
+        self.refresher = refresher
+        return refresher
+
+    @traced
     def get_effective_members(self, group_id):
         """
         Returns a list of effective restclients.GroupMember objects for the
         group identified by the passed group ID.
         """
         self._valid_group_id(group_id)
+        if self._use_refresher():
+            return self.refresher.get_effective_members(group_id,
+                                                        self._acting_as())
 
         url = "{}/group/{}/effective_member".format(self.API, group_id)
 
         data = self._get_resource(url)
 
-        members = []
-        for datum in data.get("data"):
-            members.append(self._group_member_from_json(datum))
-        return members
+        with self._span("parse"):
+            return [self._group_member_from_json(datum)
+                    for datum in data.get("data")]
 
+    @traced
     def get_effective_member_count(self, group_id):
         """
         Returns a count of effective members for the group identified by the
@@ -258,6 +613,79 @@ class GWS(object):
         count = data.get("data").get("count")
         return int(count)
 
+    @traced
+    def get_member_count(self, group_id):
+        """
+        Returns a count of direct members for the group identified by the
+        passed group ID, without building GroupMember objects.
+        """
+        self._valid_group_id(group_id)
+
+        url = "{}/group/{}/member".format(self.API, group_id)
+
+        data = self._get_resource(url)
+
+        return len(data.get("data"))
+
+    def get_effective_member_counts(self, group_ids, max_workers=8,
+                                    ttl=None):
+        """
+        Returns a dict of group id to the count of effective members for
+        group_ids, counted with max_workers requests at once.  Counts are
+        reused for ttl seconds, default COUNT_TTL.
+
+        Groups that don't exist map to None, groups not counted before
+        the deadline to INCOMPLETE, and groups whose count failed to the
+        exception, so one failure doesn't lose the other counts.  Failures
+        aren't reused.
+        """
+        return self._member_counts(group_ids, True, max_workers, ttl)
+
+    def get_member_counts(self, group_ids, max_workers=8, ttl=None):
+        """
+        Returns a dict of group id to the count of direct members for
+        group_ids, as for get_effective_member_counts.
+        """
+        return self._member_counts(group_ids, False, max_workers, ttl)
+
+    def _member_counts(self, group_ids, is_effective, max_workers, ttl):
+        from uw_gws.utilities import map_concurrent
+
+        ttl = self.COUNT_TTL if ttl is None else ttl
+        count = (self.get_effective_member_count if is_effective else
+                 self.get_member_count)
+        act_as = self._acting_as()
+        now = time.monotonic()
+        counts = {}
+        for group_id in group_ids:
+            self._valid_group_id(group_id)
+            cached = self._counts.get((group_id, is_effective, act_as))
+            if cached is not None and now - cached[1] < ttl:
+                counts[group_id] = cached[0]
+            else:
+                counts.setdefault(group_id, INCOMPLETE)
+
+        missing = [g for g, c in counts.items() if c is INCOMPLETE]
+        for group_id, value, ex in map_concurrent(
+                count, missing, max_workers):
+            if isinstance(ex, DeadlineExceeded):
+                continue
+            elif isinstance(ex, DataFailureException) and ex.status == 404:
+                value = None
+            elif ex is not None:
+                counts[group_id] = ex
+                continue
+            counts[group_id] = value
+            self._record_count((group_id, is_effective, act_as), value, now)
+        return counts
+
+    def _record_count(self, key, value, now):
+        with self._counts_lock:
+            self._counts.pop(key, None)
+            while len(self._counts) >= self.MAX_COUNTS:
+                del self._counts[next(iter(self._counts))]
+            self._counts[key] = (value, now)
+
     def is_effective_member(self, group_id, netid):
         """
         Returns True if the netid is in the group, False otherwise.
@@ -270,40 +698,136 @@ class GWS(object):
         """
         return self.is_member(group_id, netid, False)
 
+    @traced
     def is_member(self, group_id, netid, is_effective):
-        self._valid_group_id(group_id)
+        url = self._member_url(group_id, netid, is_effective)
 
-        # GWS doesn't accept EPPNs on effective member checks, for UW users
-        netid = re.sub('@washington.edu', '', netid)
-        url = "{}/group/{}/{}/{}".format(
-            self.API, group_id,
-            "effective_member" if is_effective else "member", netid)
+        if self.cache is not None:
+            key = self._cache_key(url)
+            cached, generation = self._cache_get(key)
+            if cached is not None:
+                return cached == b"1"
 
         # Not using _get_resource() here because it automatically logs 404s
-        response = self.DAO.getURL(url, self._headers())
+        response = self._request(self.DAO.getURL, url, self._headers(),
+                                 default_priority=INTERACTIVE)
+        data = self._response_data(response)
 
         if response.status == 200:
-            return True
+            is_member = True
         elif response.status == 404:
-            return False
+            is_member = False
         else:
-            self._log_error(url, response)
-            raise DataFailureException(url, response.status, response.data)
+            self._log_error(url, response, data)
+            raise DataFailureException(url, response.status, data)
+
+        if self.cache is not None:
+            self._cache_set(key, b"1" if is_member else b"0", generation)
+
+        return is_member
+
+    @traced
+    def is_member_of_any(self, netid, group_ids, is_effective=True,
+                         max_workers=8):
+        """
+        Returns True if the netid is in any of the groups, False otherwise.
+        Cached answers are used first, the remaining groups are checked
+        concurrently, and the result is returned as soon as it is known.
+        """
+        return self._is_member_of(
+            netid, group_ids, is_effective, True, max_workers)
+
+    @traced
+    def is_member_of_all(self, netid, group_ids, is_effective=True,
+                         max_workers=8):
+        """
+        Returns True if the netid is in every one of the groups, False
+        otherwise.  Checks are made as for is_member_of_any.
+        """
+        return not self._is_member_of(
+            netid, group_ids, is_effective, False, max_workers)
+
+    def _is_member_of(self, netid, group_ids, is_effective, match,
+                      max_workers):
+        # Returns True if the netid's membership in any group equals match
+        from uw_gws.utilities import map_concurrent
+
+        group_ids = list(group_ids)
+        urls = dict((self._member_url(group_id, netid, is_effective),
+                     group_id) for group_id in group_ids)
+
+        if self.cache is not None:
+            keys = dict((self._cache_key(url), url) for url in urls)
+            for key, value in self._cache_get_many(keys)[0].items():
+                if (value == b"1") == match:
+                    return True
+                urls.pop(keys[key], None)
+
+        error = None
+        results = map_concurrent(
+            lambda group_id: self.is_member(group_id, netid, is_effective),
+            urls.values(), max_workers, wait_running=False)
+        try:
+            for group_id, is_member, ex in results:
+                if ex is not None:
+                    error = error or ex
+                elif is_member == match:
+                    return True
+        finally:
+            # Cancels the checks that are no longer needed
+            results.close()
+
+        if error is not None:
+            raise error
+        return False
+
+    def _member_url(self, group_id, netid, is_effective):
+        self._valid_group_id(group_id)
+
+        # GWS doesn't accept EPPNs on effective member checks, for UW users
+        netid = re.sub('@washington.edu', '', netid)
+        return "{}/group/{}/{}/{}".format(
+            self.API, group_id,
+            "effective_member" if is_effective else "member", netid)
 
     def _group_entity_from_json(self, data):
-        return GroupEntity(name=data.get('id'),
-                           type=data.get('type'),
-                           display_name=data.get('name'))
+        return _models().GroupEntity(name=data.get('id'),
+                                     type=data.get('type'),
+                                     display_name=data.get('name'))
 
     def _group_member_from_json(self, data):
-        member = GroupMember(name=data.get('id'), type=data.get('type'))
+        member = _models().GroupMember(name=data.get('id'),
+                                       type=data.get('type'))
         if data.get('mtype', None):
             member.mtype = data.get('mtype')
         if data.get('source', None):
             member.source = data.get('source')
         return member
 
+    def groups_from_json_many(self, data, columns=False):
+        """
+        Returns a list of Group and CourseGroup objects for an iterable of
+        GWS group JSON data, such as a search snapshot or the "group" of
+        each `uw-gws export` record.
+
+        If columns is True, returns a dict of each of GROUP_COLUMNS to the
+        list of its values, in the order of data, without building models,
+        which is much faster for large batches.
+        """
+        if columns:
+            return self._group_columns(data)
+        return [self._group_from_json(datum) for datum in data]
+
+    def group_from_json(self, data):
+        """
+        Returns a Group or CourseGroup object for GWS group JSON data, or
+        Group.json_data(), such as the "group" of a `uw-gws export` record.
+        """
+        return self._group_from_json(data)
+
     def _group_from_json(self, data):
+        from uw_gws.models import CourseGroup, Group, GroupAffiliate
+
         def _add_dt(timestamp):
             return datetime.fromtimestamp(float(timestamp)/1000.0)
 
@@ -361,50 +885,250 @@ class GWS(object):
 
         return group
 
+    def _group_columns(self, data):
+        columns = dict((name, []) for name in self.GROUP_COLUMNS)
+        fields = [(columns[name].append, key)
+                  for name, key in self.GROUP_JSON_FIELDS]
+        last_modified = columns["last_modified"].append
+        membership_modified = columns["membership_modified"].append
+        to_datetime = self._json_datetime
+        for datum in data:
+            for append, key in fields:
+                append(datum.get(key))
+            last_modified(to_datetime(datum.get('lastModified')))
+            membership_modified(to_datetime(datum.get('lastMemberModified')))
+        return columns
+
+    @staticmethod
+    def _json_datetime(timestamp):
+        # Returns the datetime of a GWS timestamp in ms, None if not valid
+        try:
+            return datetime.fromtimestamp(float(timestamp)/1000.0)
+        except (AttributeError, TypeError):
+            return None
+
     def _valid_group_id(self, group_id):
         if (group_id is None or not self.RE_GROUP_ID.match(group_id)):
             raise InvalidGroupID(group_id)
 
     def _get_resource(self, url):
-        response = self.DAO.getURL(url, self._headers())
+        return self._fetch_resource(url)[0]
 
-        if response.status != 200:
-            self._log_error(url, response)
-            raise DataFailureException(url, response.status, response.data)
+    def _fetch_resource(self, url, cached=True):
+        # Returns the decoded data and the response, None if it was cached
+        cached = cached and self.cache is not None
+        if cached:
+            key = self._cache_key(url)
+            data, generation = self._cache_get(key)
+            if data is not None:
+                return self._loads(data), None
+
+        response = self._request(self.DAO.getURL, url, self._headers())
+        data = self._response_data(response)
 
-        return json.loads(response.data)
+        if response.status != 200:
+            self._log_error(url, response, data)
+            raise DataFailureException(url, response.status, data)
+
+        if cached:
+            self._cache_set(key, data, generation)
+
+        return self._loads(data), response
+
+    def _cache_key(self, url):
+        from uw_gws.cache.base import cache_key
+
+        path, _, params = url[len(self.API) + 1:].partition("?")
+        parts = path.split("/")
+        if parts[0] == "group":
+            return cache_key("/".join(parts[2:]) or "group", parts[1],
+                             self._acting_as(), params)
+        return cache_key(path, None, self._acting_as(), params)
+
+    def _cache_get(self, key):
+        values, generations = self._cache_get_many([key])
+        return values.get(key), generations[key]
+
+    def _cache_get_many(self, keys):
+        # Returns a dict of the keys cached in the current generation of
+        # their group, and a dict of each key to that generation, which
+        # values fetched for the key are stored with.  A write made while
+        # a value is fetched replaces the generation, so the value is not
+        # used.
+        from uw_gws.cache.base import generation_key, new_generation
+
+        gen_keys = dict((key, generation_key(key)) for key in keys)
+        found = self.cache.get_many(
+            ([] if _uncached.get() else list(gen_keys)) +
+            list(set(gen_keys.values())))
+        new = dict((gen_key, new_generation()) for gen_key in set(
+            gen_keys.values()) if gen_key not in found)
+        if len(new):
+            self.cache.set_many(new)
+            found.update(new)
+
+        values = {}
+        generations = {}
+        for key, gen_key in gen_keys.items():
+            generations[key] = found[gen_key]
+            value = found.get(key)
+            if value is not None:
+                generation, _, data = value.partition(b"\n")
+                if generation == generations[key]:
+                    values[key] = data
+        return values, generations
+
+    def _cache_set(self, key, data, generation):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.cache.set(key, generation + b"\n" + data)
+
+    def _use_refresher(self):
+        return (self.refresher is not None and not self.refresher.fetching
+                and not _uncached.get())
+
+    def _invalidate(self, url):
+        # Ends the cached reads of the group written to at url, for every
+        # act_as, its cached member counts, its states kept for
+        # update_group and its refresher entries.
+        # Effective members of the groups that contain it are left to the
+        # cache TTL.
+        group_id = url[len(self.API) + 1:].partition("?")[0].split("/")[1]
+        if self.refresher is not None:
+            self.refresher.invalidate(group_id)
+        with self._counts_lock:
+            for count_key in list(self._counts):
+                if count_key[0] == group_id:
+                    del self._counts[count_key]
+        # The group states fetched by other act_as users are stale
+        with self._group_state_lock:
+            for state_key in list(self._group_state):
+                if state_key[1] == group_id:
+                    del self._group_state[state_key]
+        if self.cache is None:
+            return
+
+        from uw_gws.cache.base import cache_key, generation_key, new_generation
+
+        self.cache.set_many({
+            generation_key(cache_key("group", group_id)): new_generation(),
+            generation_key(cache_key("search")): new_generation()})
 
     def _put_resource(self, url, headers, body={}):
+        return self._send_resource(url, headers, body)[0]
+
+    def _send_resource(self, url, headers, body={}):
+        headers = dict(headers, **self._headers())
         headers["Content-Type"] = "application/json"
-        headers.update(self._headers())
 
-        response = self.DAO.putURL(url, headers, json.dumps(body))
+        with self._span("serialize"):
+            payload = self.codec.dumps(body)
+        try:
+            response = self._request(self.DAO.putURL, url, headers, payload)
+        finally:
+            # Also after errors, as the write may have been made
+            self._invalidate(url)
+        data = self._response_data(response)
 
         if response.status != 200 and response.status != 201:
-            self._log_error(url, response)
-            raise DataFailureException(url, response.status, response.data)
+            self._log_error(url, response, data)
+            raise DataFailureException(url, response.status, data)
 
-        return json.loads(response.data)
+        return self._loads(data), response
 
     def _delete_resource(self, url):
-        response = self.DAO.deleteURL(url, self._headers())
+        try:
+            response = self._request(self.DAO.deleteURL, url, self._headers())
+        finally:
+            self._invalidate(url)
+        data = self._response_data(response)
 
         if response.status != 200:
-            self._log_error(url, response)
-            raise DataFailureException(url, response.status, response.data)
+            self._log_error(url, response, data)
+            raise DataFailureException(url, response.status, data)
+
+        return self._loads(data)
+
+    def _request(self, method, *args, default_priority=DEFAULT):
+        with deadline(self.timeout), self._span("network", url=args[0]):
+            if self.scheduler is None:
+                return method(*args)
+            with self.scheduler.slot(default_priority):
+                return method(*args)
 
-        return json.loads(response.data)
+    def _response_data(self, response):
+        with self._span("decompress"):
+            return decode_response(response, self.transfer_stats,
+                                   self.accept_encoding)
+
+    def _loads(self, data):
+        with self._span("decode"):
+            return self.codec.loads(data)
+
+    def _span(self, name, **args):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **args)
+
+    def group_fields(self, data):
+        """
+        Returns the fields of group JSON data, or Group.json_data(), that
+        are set by clients, to compare group states: fields set by the
+        service are left out and entity lists are sorted.
+        """
+        data = dict((k, v) for k, v in data.items()
+                    if k not in self.SERVER_FIELDS)
+        for key, value in data.items():
+            # Entity lists compare equal in any order
+            if isinstance(value, list):
+                data[key] = sorted(value, key=lambda v: json.dumps(
+                    v, sort_keys=True))
+        return data
+
+    def _group_fingerprint(self, data):
+        return sha1(json.dumps(self.group_fields(data),
+                               sort_keys=True).encode()).hexdigest()
+
+    def _state_fingerprint(self, data):
+        # The fingerprint of fetched group data as a client would PUT it,
+        # None if the data doesn't round trip, so the update is sent
+        try:
+            return self._group_fingerprint(
+                self._group_from_json(data).json_data(is_put_req=True))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _record_group_state(self, group_id, data, response):
+        etag = None
+        for name, value in (getattr(response, "headers", None) or {}).items():
+            if name.lower() == "etag":
+                etag = value
+        key = (self._acting_as(), group_id)
+        state = (data, etag)
+        with self._group_state_lock:
+            self._group_state.pop(key, None)
+            while len(self._group_state) >= self.MAX_GROUP_STATES:
+                del self._group_state[next(iter(self._group_state))]
+            self._group_state[key] = state
+
+    def _acting_as(self):
+        netid = _act_as.get()
+        return self.act_as if netid is None else netid
 
     def _headers(self):
         headers = {"Accept": "application/json", "Connection": "keep-alive"}
 
-        if self.act_as:
-            headers["X-UW-Act-as"] = self.act_as
+        act_as = self._acting_as()
+        if act_as:
+            headers["X-UW-Act-as"] = act_as
+
+        if self.accept_encoding:
+            headers["Accept-Encoding"] = self.accept_encoding
 
         return headers
 
-    def _log_error(self, url, response):
+    def _log_error(self, url, response, data):
         if self.logger:
             self.logger.error(
                 "url: {0}, status: {1}, data: {2}, act_as: {3}".format(
-                    url, response.status, response.data, self.act_as))
+                    url, response.status, data, self._acting_as()))
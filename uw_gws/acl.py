@@ -0,0 +1,196 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A reverse index from group entities to the groups whose ACLs reference
+them, answering questions like "which groups can netid N administer?"
+without fetching every group.
+"""
+
+from uw_gws.utilities import map_concurrent
+import json
+import sys
+import threading
+
+ROLES = ("admins", "updaters", "creators", "readers", "optins", "optouts",
+         "instructors")
+ROLE_BITS = dict((role, 1 << i) for i, role in enumerate(ROLES))
+
+
+class AclIndex(object):
+    """
+    Entities and group ids are interned to integers; each entity maps to
+    the groups that reference it and a bitmask of the roles it holds.
+    Entity names and types of None are indexed and looked up as "".
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entity_ids = {}
+        self._entities = []
+        # name: entity types interned with it
+        self._types_by_name = {}
+        self._group_ids = {}
+        self._groups = []
+        self._by_entity = {}
+        self._by_group = {}
+
+    @classmethod
+    def from_groups(cls, groups):
+        index = cls()
+        for group in groups:
+            index.update(group)
+        return index
+
+    @classmethod
+    def from_export(cls, path):
+        """
+        Builds an index from a `uw-gws export` JSON lines file.
+        """
+        index = cls()
+        with open(path) as f:
+            for line in f:
+                if len(line.strip()):
+                    index.update_json(json.loads(line)["group"])
+        return index
+
+    def update(self, group):
+        """
+        Replaces the index entries for a Group.
+        """
+        refs = {}
+        for role in ROLES:
+            for entity in getattr(group, role, []):
+                key = (entity.name, entity.type)
+                refs[key] = refs.get(key, 0) | ROLE_BITS[role]
+        self._replace(group.name, refs)
+
+    def update_json(self, data):
+        """
+        Replaces the index entries for a group from its GWS JSON data.
+        """
+        refs = {}
+        sources = [data, data.get("course") or {}]
+        for role in ROLES:
+            for source in sources:
+                for entity in source.get(role) or []:
+                    key = (entity.get("id"), entity.get("type"))
+                    refs[key] = refs.get(key, 0) | ROLE_BITS[role]
+        self._replace(data.get("id"), refs)
+
+    def remove(self, group_id):
+        self._replace(group_id, {})
+
+    def crawl(self, gws, group_ids=None, stem=None, max_workers=8):
+        """
+        Fetches groups concurrently and indexes them.  Groups are listed by
+        group_ids or by a search of stem.  Returns a dict of the group ids
+        that couldn't be fetched and their exceptions.
+        """
+        if group_ids is None and stem is None:
+            raise ValueError("crawl needs group_ids or a stem")
+        if group_ids is None:
+            group_ids = (g.name for g in gws.search_groups(
+                stem=stem, scope="all"))
+
+        errors = {}
+        for group_id, group, ex in map_concurrent(
+                gws.get_group_by_id, group_ids, max_workers):
+            if ex is not None:
+                errors[group_id] = ex
+            else:
+                self.update(group)
+        return errors
+
+    def lookup(self, name, type=None):
+        """
+        Returns a dict of group id to the list of roles held by the entity
+        identified by name (and type, if passed).
+        """
+        result = {}
+        with self._lock:
+            for entity_type in self._types(name, type):
+                entity = self._entity_ids.get(self._entity_key(
+                    name, entity_type))
+                for group, mask in self._by_entity.get(entity, {}).items():
+                    group_id = self._groups[group]
+                    result[group_id] = sorted(
+                        set(result.get(group_id, [])) | set(
+                            self._roles(mask)), key=ROLES.index)
+        return result
+
+    def groups_for(self, name, type=None, role=None):
+        """
+        Returns the sorted ids of groups that reference the entity, in the
+        passed role or in any role.
+        """
+        return sorted(group_id for group_id, roles in self.lookup(
+            name, type).items() if role is None or role in roles)
+
+    def entities(self, group_id):
+        """
+        Returns a dict of (name, type) to roles for a group in the index.
+        """
+        with self._lock:
+            group = self._group_ids.get(group_id)
+            return dict((self._entities[entity], self._roles(mask))
+                        for entity, mask in self._by_group.get(
+                            group, {}).items())
+
+    def __len__(self):
+        return len(self._by_group)
+
+    def __contains__(self, group_id):
+        return self._group_ids.get(group_id) in self._by_group
+
+    def _replace(self, group_id, refs):
+        with self._lock:
+            group = self._intern_group(group_id)
+            for entity in self._by_group.pop(group, {}):
+                groups = self._by_entity[entity]
+                groups.pop(group, None)
+                if not len(groups):
+                    del self._by_entity[entity]
+
+            if not len(refs):
+                return
+
+            masks = {}
+            for key, mask in refs.items():
+                entity = self._intern_entity(key)
+                masks[entity] = mask
+                self._by_entity.setdefault(entity, {})[group] = mask
+            self._by_group[group] = masks
+
+    def _intern_group(self, group_id):
+        group = self._group_ids.get(group_id)
+        if group is None:
+            group = len(self._groups)
+            group_id = sys.intern(group_id)
+            self._groups.append(group_id)
+            self._group_ids[group_id] = group
+        return group
+
+    def _intern_entity(self, key):
+        key = self._entity_key(*key)
+        entity = self._entity_ids.get(key)
+        if entity is None:
+            entity = len(self._entities)
+            key = (sys.intern(key[0]), sys.intern(key[1]))
+            self._entities.append(key)
+            self._entity_ids[key] = entity
+            self._types_by_name.setdefault(key[0], set()).add(key[1])
+        return entity
+
+    def _types(self, name, type):
+        if type is not None:
+            return [type or ""]
+        return sorted(self._types_by_name.get(name or "", ()))
+
+    @staticmethod
+    def _entity_key(name, type):
+        return (name or "", type or "")
+
+    @staticmethod
+    def _roles(mask):
+        return [role for role in ROLES if mask & ROLE_BITS[role]]
@@ -0,0 +1,115 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Audits of the affiliates (uwnetid, google, email, radius) of many groups.
+
+    audit = AffiliateAudit(gws).run(stem="uw_it")
+    audit.groups_with("google", "active")
+    audit.write(sys.stdout)
+
+Groups are fetched concurrently as the ids are read, so the ids can come
+from a stem crawl or a long file, and only the affiliates and their
+senders are kept for each group, rather than the whole Group.  The
+summary tables are counted as each group completes.
+"""
+
+from collections import Counter
+
+
+class AffiliateAudit(object):
+    """
+    The affiliates of the audited groups, and counts of them by type and
+    status, by forward target and by sender type.
+    """
+    def __init__(self, gws, max_workers=8):
+        self.gws = gws
+        self.max_workers = max_workers
+        # group id: [GroupAffiliate], for the groups with affiliates
+        self.affiliates = {}
+        # (name, status): affiliates
+        self.counts = Counter()
+        # (name, forward): affiliates
+        self.forwards = Counter()
+        # (name, sender type): senders
+        self.senders = Counter()
+        self.groups = 0
+        self.errors = {}
+
+    def run(self, group_ids=None, stem=None, on_group=None):
+        """
+        Fetches the affiliates of group_ids, or of every group under stem,
+        and adds them.  Groups that can't be fetched are kept in errors.
+        :param on_group: called with (group_id, affiliates, exception) as
+            each group completes
+        """
+        from uw_gws.utilities import map_concurrent
+
+        if group_ids is None and stem is None:
+            raise ValueError("run needs group_ids or a stem")
+        if stem is not None:
+            group_ids = (g.name for g in self.gws.search_groups(
+                stem=stem, scope="all"))
+        for group_id, affiliates, ex in map_concurrent(
+                self.gws.get_group_affiliates, group_ids, self.max_workers):
+            if ex is not None:
+                self.errors[group_id] = ex
+            else:
+                self.add(group_id, affiliates)
+            if on_group is not None:
+                on_group(group_id, affiliates, ex)
+        return self
+
+    def add(self, group_id, affiliates):
+        self.groups += 1
+        if len(affiliates):
+            self.affiliates[group_id] = affiliates
+        for affiliate in affiliates:
+            self.counts[(affiliate.name, affiliate.status)] += 1
+            if affiliate.forward:
+                self.forwards[(affiliate.name, affiliate.forward)] += 1
+            for sender in affiliate.senders:
+                self.senders[(affiliate.name, sender.type)] += 1
+
+    def groups_with(self, name, status=None):
+        """
+        Returns the sorted ids of the groups with an affiliate of name, and
+        of status if given.
+        """
+        return sorted(
+            group_id for group_id, affiliates in self.affiliates.items()
+            if any(a.name == name and (status is None or a.status == status)
+                   for a in affiliates))
+
+    def tables(self):
+        """
+        Returns the summary tables as a dict of sorted lists of rows.
+        """
+        return {
+            "affiliates": _rows(self.counts),
+            "forwards": _rows(self.forwards),
+            "senders": _rows(self.senders),
+        }
+
+    def write(self, stream):
+        """
+        Writes the summary tables to stream as text.
+        """
+        tables = self.tables()
+        stream.write("{} groups, {} with affiliates, {} errors\n".format(
+            self.groups, len(self.affiliates), len(self.errors)))
+        for title, columns in (("affiliates", ("name", "status")),
+                               ("forwards", ("name", "forward")),
+                               ("senders", ("name", "sender type"))):
+            stream.write("\n{:10} {:40} {:>8}\n".format(
+                columns[0], columns[1], "count"))
+            for name, value, count in tables[title]:
+                stream.write("{:10} {:40} {:>8}\n".format(
+                    str(name), str(value), count))
+
+
+def _rows(counts):
+    # Sorts as strings, as a status or sender type can be None
+    return [key + (n,) for key, n in sorted(
+        counts.items(), key=lambda item: [str(k) for k in item[0]])]
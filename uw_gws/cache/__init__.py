@@ -0,0 +1,29 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Cache backends for GWS read requests.
+"""
+
+from uw_gws.cache.base import CacheBackend, CacheStats, cache_key
+from uw_gws.cache.memory import MemoryCache
+import importlib
+
+# Backends with platform or heavier dependencies (fcntl and mmap, sockets,
+# sqlite3), loaded by __getattr__ on first use
+_LAZY_BACKENDS = {
+    "MemcachedCache": "uw_gws.cache.memcached",
+    "SharedMemoryCache": "uw_gws.cache.shm",
+    "SQLiteCache": "uw_gws.cache.sqlite",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_BACKENDS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,189 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+The protocol implemented by GWS cache backends.
+"""
+
+from uuid import uuid4
+import threading
+import time
+
+
+class CacheStats(object):
+    """
+    Hit, miss, latency and byte counters for a cache backend.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.sets = 0
+            self.deletes = 0
+            # Values too large to store, and live entries evicted for space
+            self.rejected = 0
+            self.evictions = 0
+            self.errors = 0
+            self.bytes_read = 0
+            self.bytes_written = 0
+            self.get_calls = 0
+            self.get_time = 0.0
+            self.set_calls = 0
+            self.set_time = 0.0
+
+    def record_get(self, requested, found, elapsed):
+        with self._lock:
+            self.hits += len(found)
+            self.misses += requested - len(found)
+            self.bytes_read += sum(len(v) for v in found.values())
+            self.get_calls += 1
+            self.get_time += elapsed
+
+    def record_set(self, items, elapsed):
+        with self._lock:
+            self.sets += len(items)
+            self.bytes_written += sum(len(v) for v in items.values())
+            self.set_calls += 1
+            self.set_time += elapsed
+
+    def record_delete(self, count):
+        with self._lock:
+            self.deletes += count
+
+    def record_rejected(self, count=1):
+        with self._lock:
+            self.rejected += count
+
+    def record_eviction(self, count=1):
+        with self._lock:
+            self.evictions += count
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def json_data(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "avg_get_ms": (self.get_time * 1000 / self.get_calls
+                           if self.get_calls else 0.0),
+            "avg_set_ms": (self.set_time * 1000 / self.set_calls
+                           if self.set_calls else 0.0),
+        }
+
+
+class CacheBackend(object):
+    """
+    Base class for cache backends.  Keys are strings and values are the
+    serialized (bytes) response bodies.
+
+    Subclasses implement _get_many(), _set_many(), _delete_many(), clear()
+    and bytes_used().
+    """
+    def __init__(self, ttl=300):
+        """
+        :param ttl: default lifetime of an entry in seconds
+        """
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set(self, key, value, ttl=None):
+        return self.set_many({key: value}, ttl=ttl)
+
+    def delete(self, key):
+        return self.delete_many([key]) > 0
+
+    def get_many(self, keys):
+        """
+        Returns a dict of the keys found in the cache and their values.
+        """
+        keys = list(keys)
+        start = time.time()
+        found = self._get_many(keys) if len(keys) else {}
+        self.stats.record_get(len(keys), found, time.time() - start)
+        return found
+
+    def set_many(self, items, ttl=None):
+        """
+        Stores each key and value in the items dict.  Returns False if any
+        of the values could not be stored.
+        """
+        items = dict((k, self._value_bytes(v)) for k, v in items.items())
+        start = time.time()
+        stored = self._set_many(items, self.ttl if ttl is None else ttl)
+        self.stats.record_set(items, time.time() - start)
+        return stored
+
+    def delete_many(self, keys):
+        """
+        Removes the keys from the cache, returns the number removed.
+        """
+        count = self._delete_many(list(keys))
+        self.stats.record_delete(count)
+        return count
+
+    def clear(self):
+        raise NotImplementedError()
+
+    def bytes_used(self):
+        """
+        Returns the number of bytes of keys and values held by the backend.
+        """
+        raise NotImplementedError()
+
+    def _get_many(self, keys):
+        raise NotImplementedError()
+
+    def _set_many(self, items, ttl):
+        raise NotImplementedError()
+
+    def _delete_many(self, keys):
+        raise NotImplementedError()
+
+    @staticmethod
+    def _value_bytes(value):
+        return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def cache_key(endpoint, group_id=None, act_as=None, params=None):
+    """
+    Returns the cache key for a GWS read, e.g.
+    "effective_member|u_acadev_tester|javerage|view=count"
+    """
+    return "|".join([endpoint, group_id or "", act_as or "", params or ""])
+
+
+def generation_key(key):
+    """
+    Returns the key of the generation of a cache key's group, or of the
+    reads not of one group, such as searches.  Writes to a group replace
+    its generation, and that of searches, so that values cached by every
+    act_as user before the write are no longer current.
+    """
+    return cache_key("generation", key.split("|")[1])
+
+
+def new_generation():
+    return uuid4().hex.encode("ascii")
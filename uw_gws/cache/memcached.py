@@ -0,0 +1,152 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A cache backend that speaks the memcached text protocol, so it works with
+memcached or any server compatible with it.  Network errors are counted in
+the stats and treated as cache misses.
+"""
+
+from hashlib import sha1
+from uw_gws.cache.base import CacheBackend
+import logging
+import re
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 250
+RE_VALID_KEY = re.compile(r'^[\x21-\x7e]+$')
+
+# Expiration times greater than this are treated as unix timestamps
+MAX_RELATIVE_EXPIRATION = 60 * 60 * 24 * 30
+
+
+class MemcachedCache(CacheBackend):
+    def __init__(self, host="127.0.0.1", port=11211, ttl=300, timeout=1.0,
+                 prefix="uw_gws:"):
+        super(MemcachedCache, self).__init__(ttl=ttl)
+        self.address = (host, port)
+        self.timeout = timeout
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _get_many(self, keys):
+        server_keys = dict((self._server_key(k), k) for k in keys)
+        try:
+            self._send("get {}\r\n".format(" ".join(server_keys)).encode())
+            found = {}
+            while True:
+                line = self._readline()
+                if line == b"END":
+                    return found
+                _, key, flags, length = line.split(b" ")[:4]
+                value = self._read(int(length) + 2)[:-2]
+                found[server_keys[key.decode()]] = value
+        except (OSError, ValueError) as ex:
+            self._error(ex)
+            return {}
+
+    def _set_many(self, items, ttl):
+        # A ttl of 0 means "never expire" to memcached
+        exptime = max(int(ttl), 1)
+        if exptime > MAX_RELATIVE_EXPIRATION:
+            exptime = MAX_RELATIVE_EXPIRATION
+        try:
+            for key, value in items.items():
+                self._send(b"".join([
+                    "set {} 0 {} {}\r\n".format(
+                        self._server_key(key), exptime, len(value)).encode(),
+                    value, b"\r\n"]))
+            replies = [self._readline() for key in items]
+            return all(reply == b"STORED" for reply in replies)
+        except (OSError, ValueError) as ex:
+            self._error(ex)
+            return False
+
+    def _delete_many(self, keys):
+        try:
+            for key in keys:
+                self._send("delete {}\r\n".format(
+                    self._server_key(key)).encode())
+            return len([k for k in keys if self._readline() == b"DELETED"])
+        except (OSError, ValueError) as ex:
+            self._error(ex)
+            return 0
+
+    def clear(self):
+        try:
+            self._send(b"flush_all\r\n")
+            self._readline()
+        except (OSError, ValueError) as ex:
+            self._error(ex)
+
+    def bytes_used(self):
+        try:
+            self._send(b"stats\r\n")
+            used = 0
+            while True:
+                line = self._readline()
+                if line == b"END":
+                    return used
+                parts = line.split(b" ")
+                if len(parts) == 3 and parts[1] == b"bytes":
+                    used = int(parts[2])
+        except (OSError, ValueError) as ex:
+            self._error(ex)
+            return 0
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+        self._local.buffer = b""
+
+    def _server_key(self, key):
+        key = self.prefix + key
+        if len(key) > MAX_KEY_LENGTH or not RE_VALID_KEY.match(key):
+            key = self.prefix + sha1(key.encode("utf-8")).hexdigest()
+        return key
+
+    def _socket(self):
+        # One connection per thread
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.create_connection(self.address, self.timeout)
+            self._local.sock = sock
+            self._local.buffer = b""
+        return sock
+
+    def _send(self, data):
+        self._socket().sendall(data)
+
+    def _readline(self):
+        while b"\r\n" not in self._local.buffer:
+            self._fill()
+        line, self._local.buffer = self._local.buffer.split(b"\r\n", 1)
+        if line == b"ERROR" or line.startswith(
+                (b"SERVER_ERROR", b"CLIENT_ERROR")):
+            raise ValueError(line.decode("utf-8", "replace"))
+        return line
+
+    def _read(self, length):
+        while len(self._local.buffer) < length:
+            self._fill()
+        data = self._local.buffer[:length]
+        self._local.buffer = self._local.buffer[length:]
+        return data
+
+    def _fill(self):
+        chunk = self._local.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("memcached connection closed")
+        self._local.buffer += chunk
+
+    def _error(self, ex):
+        logger.warning("memcached {}:{}: {}".format(
+            self.address[0], self.address[1], ex))
+        self.stats.record_error()
+        self.close()
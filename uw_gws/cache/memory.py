@@ -0,0 +1,80 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+An in-process LRU cache backend.
+"""
+
+from collections import OrderedDict
+from uw_gws.cache.base import CacheBackend
+import threading
+import time
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300):
+        """
+        :param max_bytes: size at which least recently used entries are
+            evicted
+        """
+        super(MemoryCache, self).__init__(ttl=ttl)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _get_many(self, keys):
+        found = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] < now:
+                    self._remove(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[0]
+        return found
+
+    def _set_many(self, items, ttl):
+        stored = True
+        expires = time.time() + ttl
+        with self._lock:
+            for key, value in items.items():
+                self._remove(key)
+                size = len(key) + len(value)
+                if size > self.max_bytes:
+                    self.stats.record_rejected()
+                    stored = False
+                    continue
+                while self._bytes + size > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.stats.record_eviction()
+                self._entries[key] = (value, expires)
+                self._bytes += size
+        return stored
+
+    def _delete_many(self, keys):
+        with self._lock:
+            return len([key for key in keys if self._remove(key)])
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(key) + len(entry[0])
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def bytes_used(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
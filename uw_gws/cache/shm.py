@@ -0,0 +1,394 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A cache backend that keeps serialized GWS responses in a memory mapped
+file, shared by every process on the host that opens the same path.  Put
+the file on a tmpfs such as /dev/shm so that it is backed by memory; pages
+are only allocated as slots are written.
+
+The segment is divided into size classes, each a set of buckets of
+fixed-size slots, so that large member lists are cached without every slot
+being large.  A value is stored in the smallest class it fits, and a key
+always maps to the same bucket of each class.  Writers lock the key's
+bucket in every class, in class order, so there is a single writer per key
+and a key is held in one class at a time.  Readers don't lock: each slot
+carries a sequence number that is odd while a write is in progress, and a
+read is retried if the sequence number changed while the slot was being
+copied.
+
+When a bucket is full its least recently used slot is evicted.  LRU is
+kept per bucket (the cache is set associative, like a CPU cache), as an
+order across the segment would need a lock on every read; raise ways for
+more associativity.  Evictions of live entries, and values larger than the
+largest class, are counted in stats.
+"""
+
+from hashlib import blake2b
+from uw_gws.cache.base import CacheBackend
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GWSSHM02"
+
+# magic, ways, number of size classes, then (slot_size, buckets) per class
+FILE_HEADER = struct.Struct("<8sII")
+CLASS_HEADER = struct.Struct("<II")
+FILE_HEADER_SIZE = 256
+MAX_CLASSES = (FILE_HEADER_SIZE - FILE_HEADER.size) // CLASS_HEADER.size
+
+# seq, key hash, expires, last access, key length, value length
+SLOT_HEADER = struct.Struct("<IQddHI")
+
+READ_RETRIES = 5
+
+# Each default size class has slots this many times larger, and this many
+# times fewer buckets, than the one before
+CLASS_GROWTH = 16
+DEFAULT_CLASSES = 3
+
+# (pid, path): _Segment
+_segments = {}
+_segments_lock = threading.Lock()
+
+
+class _Segment(object):
+    """
+    The file descriptor, map and thread lock of a segment file, shared by
+    every SharedMemoryCache for the path in a process.  fcntl locks don't
+    exclude the threads of the process that holds them, and closing any
+    descriptor of a file releases all of the process's locks on it.
+    """
+    def __init__(self, path, ways, classes, size):
+        self.geometry = (ways, classes)
+        self.size = size
+        self.refs = 0
+        self.thread_lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._init_file(path)
+            self.map = mmap.mmap(self.fd, size)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def _init_file(self, path):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, FILE_HEADER_SIZE, 0)
+        try:
+            header = os.pread(self.fd, FILE_HEADER_SIZE, 0)
+            if len(header) < FILE_HEADER_SIZE or header[:8] != MAGIC:
+                ways, classes = self.geometry
+                os.ftruncate(self.fd, self.size)
+                os.pwrite(self.fd, FILE_HEADER.pack(
+                    MAGIC, ways, len(classes)) + b"".join(
+                        CLASS_HEADER.pack(*c) for c in classes), 0)
+            elif _read_geometry(header) != self.geometry:
+                raise ValueError(
+                    "Segment {} has a different geometry: {}".format(
+                        path, _read_geometry(header)))
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, FILE_HEADER_SIZE, 0)
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+def _read_geometry(header):
+    magic, ways, count = FILE_HEADER.unpack_from(header)
+    return (ways, tuple(
+        CLASS_HEADER.unpack_from(
+            header, FILE_HEADER.size + i * CLASS_HEADER.size)
+        for i in range(min(count, MAX_CLASSES))))
+
+
+class SharedMemoryCache(CacheBackend):
+    def __init__(self, path, buckets=256, ways=4, slot_size=65536, ttl=300,
+                 size_classes=None):
+        """
+        :param path: file backing the shared segment, e.g. /dev/shm/uw_gws
+        :param buckets: number of buckets of the smallest size class
+        :param ways: number of slots in each bucket
+        :param slot_size: size in bytes of each slot of the smallest size
+            class, including its header
+        :param ttl: default lifetime of an entry in seconds
+        :param size_classes: optional list of (slot_size, buckets), by
+            default slot_size and buckets and two classes with slots 16
+            and 256 times larger, and 16 and 256 times fewer buckets
+        """
+        if size_classes is None:
+            size_classes = [
+                (slot_size * CLASS_GROWTH ** i,
+                 max(buckets // CLASS_GROWTH ** i, 1))
+                for i in range(DEFAULT_CLASSES)]
+        classes = tuple(sorted((int(size), int(count))
+                               for size, count in size_classes))
+        if not len(classes) or len(classes) > MAX_CLASSES:
+            raise ValueError("From 1 to {} size classes are supported".format(
+                MAX_CLASSES))
+        if classes[0][0] <= SLOT_HEADER.size:
+            raise ValueError("slot_size is too small: {}".format(
+                classes[0][0]))
+
+        super(SharedMemoryCache, self).__init__(ttl=ttl)
+        self.path = path
+        self.ways = ways
+        self.size_classes = classes
+        self._bases = []
+        offset = FILE_HEADER_SIZE
+        for size, count in classes:
+            self._bases.append(offset)
+            offset += size * count * ways
+        self.size = offset
+
+        key = (os.getpid(), os.path.realpath(path))
+        with _segments_lock:
+            segment = _segments.get(key)
+            if segment is None:
+                segment = _Segment(path, ways, classes, self.size)
+                _segments[key] = segment
+            elif segment.geometry != (ways, classes):
+                raise ValueError(
+                    "Segment {} has a different geometry: {}".format(
+                        path, segment.geometry))
+            segment.refs += 1
+        self._segment_key = key
+        self._segment = segment
+        self._map = segment.map
+        self._warned = False
+
+    def close(self):
+        with _segments_lock:
+            segment, self._segment = self._segment, None
+            if segment is None:
+                return
+            segment.refs -= 1
+            if segment.refs == 0:
+                _segments.pop(self._segment_key, None)
+                segment.close()
+
+    @property
+    def max_value_size(self):
+        return self.size_classes[-1][0] - SLOT_HEADER.size
+
+    def _get_many(self, keys):
+        found = {}
+        for key in keys:
+            value = self._get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def _set_many(self, items, ttl):
+        stored = [self._set(key, value, ttl) for key, value in items.items()]
+        return all(stored)
+
+    def _delete_many(self, keys):
+        return len([key for key in keys if self._delete(key)])
+
+    def _get(self, key):
+        key = self._key_bytes(key)
+        key_hash = self._hash(key)
+        now = time.time()
+        for size_class in range(len(self.size_classes)):
+            for offset in self._bucket_slots(size_class, key_hash):
+                entry = self._read_slot(offset)
+                if entry is None:
+                    continue
+                slot_hash, expires, slot_key, value = entry
+                if slot_hash == key_hash and slot_key == key:
+                    if expires < now:
+                        return None
+                    self._touch(offset, now)
+                    return value
+        return None
+
+    def _set(self, key, value, ttl):
+        # Returns False if the value doesn't fit in the largest class
+        key = self._key_bytes(key)
+        key_hash = self._hash(key)
+        target = self._size_class(len(key) + len(value))
+        if target is None:
+            self.stats.record_rejected()
+            if not self._warned:
+                self._warned = True
+                logger.warning(
+                    "{}: values over {} bytes are not cached".format(
+                        self.path, self.max_value_size))
+            # The previous value is no longer current
+            self._delete(key)
+            return False
+
+        now = time.time()
+        expires = now + ttl
+        with self._key_lock(key_hash):
+            for size_class in range(len(self.size_classes)):
+                if size_class != target:
+                    self._clear_key(size_class, key_hash, key)
+            offset, evicted = self._find_slot(target, key_hash, key, now)
+            if evicted:
+                self.stats.record_eviction()
+            seq = self._seq(offset) + 1
+            self._set_seq(offset, seq)
+            start = offset + SLOT_HEADER.size
+            self._map[start:start + len(key)] = key
+            self._map[start + len(key):start + len(key) + len(value)] = value
+            SLOT_HEADER.pack_into(self._map, offset, seq, key_hash, expires,
+                                  now, len(key), len(value))
+            self._set_seq(offset, seq + 1)
+        return True
+
+    def _delete(self, key):
+        key = self._key_bytes(key)
+        key_hash = self._hash(key)
+        with self._key_lock(key_hash):
+            cleared = [self._clear_key(size_class, key_hash, key)
+                       for size_class in range(len(self.size_classes))]
+        return any(cleared)
+
+    def clear(self):
+        for size_class, (size, count) in enumerate(self.size_classes):
+            for bucket in range(count):
+                with self._lock([(size_class, bucket)]):
+                    for way in range(self.ways):
+                        self._clear_slot(self._slot_offset(
+                            size_class, bucket, way))
+
+    def bytes_used(self):
+        used = 0
+        for size_class, (size, count) in enumerate(self.size_classes):
+            for bucket in range(count):
+                for way in range(self.ways):
+                    header = SLOT_HEADER.unpack_from(
+                        self._map, self._slot_offset(size_class, bucket, way))
+                    used += header[4] + header[5]
+        return used
+
+    def _size_class(self, length):
+        # Returns the smallest class with slots that fit length bytes
+        for size_class, (size, count) in enumerate(self.size_classes):
+            if length <= size - SLOT_HEADER.size:
+                return size_class
+        return None
+
+    def _clear_key(self, size_class, key_hash, key):
+        # Called with the key locked
+        for offset in self._bucket_slots(size_class, key_hash):
+            entry = self._read_slot(offset)
+            if entry and entry[0] == key_hash and entry[2] == key:
+                self._clear_slot(offset)
+                return True
+        return False
+
+    def _find_slot(self, size_class, key_hash, key, now):
+        # Same key, then an empty or expired slot, then the LRU slot.
+        # Returns the offset and whether a live entry is evicted.
+        candidate = None
+        candidate_atime = None
+        for offset in self._bucket_slots(size_class, key_hash):
+            (seq, slot_hash, expires, atime, key_len,
+             value_len) = SLOT_HEADER.unpack_from(self._map, offset)
+            if slot_hash == key_hash and self._slot_key(
+                    offset, key_len) == key:
+                return offset, False
+            if key_len == 0 or expires < now:
+                atime = -1.0
+            if candidate is None or atime < candidate_atime:
+                candidate = offset
+                candidate_atime = atime
+        return candidate, candidate_atime >= 0
+
+    def _read_slot(self, offset):
+        for attempt in range(READ_RETRIES):
+            (seq, key_hash, expires, atime, key_len,
+             value_len) = SLOT_HEADER.unpack_from(self._map, offset)
+            if seq % 2:
+                continue
+            if key_len == 0:
+                return None
+            start = offset + SLOT_HEADER.size
+            data = self._map[start:start + key_len + value_len]
+            if self._seq(offset) == seq:
+                return key_hash, expires, data[:key_len], data[key_len:]
+        return None
+
+    def _clear_slot(self, offset):
+        seq = self._seq(offset) + 1
+        self._set_seq(offset, seq)
+        SLOT_HEADER.pack_into(self._map, offset, seq, 0, 0.0, 0.0, 0, 0)
+        self._set_seq(offset, seq + 1)
+
+    def _touch(self, offset, now):
+        # Unlocked; a lost update only makes the LRU order approximate
+        struct.pack_into("<d", self._map, offset + 20, now)
+
+    def _slot_key(self, offset, key_len):
+        start = offset + SLOT_HEADER.size
+        return self._map[start:start + key_len]
+
+    def _seq(self, offset):
+        return struct.unpack_from("<I", self._map, offset)[0]
+
+    def _set_seq(self, offset, seq):
+        struct.pack_into("<I", self._map, offset, seq & 0xffffffff)
+
+    def _bucket(self, size_class, key_hash):
+        return key_hash % self.size_classes[size_class][1]
+
+    def _slot_offset(self, size_class, bucket, way):
+        return self._bases[size_class] + (
+            bucket * self.ways + way) * self.size_classes[size_class][0]
+
+    def _bucket_slots(self, size_class, key_hash):
+        bucket = self._bucket(size_class, key_hash)
+        return [self._slot_offset(size_class, bucket, way)
+                for way in range(self.ways)]
+
+    def _key_lock(self, key_hash):
+        return self._lock([(size_class, self._bucket(size_class, key_hash))
+                           for size_class in range(len(self.size_classes))])
+
+    def _lock(self, buckets):
+        # Locks (size class, bucket) pairs, in class order
+        return _BucketLock(self._segment.thread_lock, self._segment.fd, [
+            (self._slot_offset(size_class, bucket, 0),
+             self.ways * self.size_classes[size_class][0])
+            for size_class, bucket in buckets])
+
+    @staticmethod
+    def _key_bytes(key):
+        return key.encode("utf-8") if isinstance(key, str) else key
+
+    @staticmethod
+    def _hash(key):
+        # Stable across processes, unlike hash()
+        return int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+
+
+class _BucketLock(object):
+    def __init__(self, thread_lock, fd, ranges):
+        """
+        :param ranges: (start, length) byte ranges, locked in order
+        """
+        self.thread_lock = thread_lock
+        self.fd = fd
+        self.ranges = ranges
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        for start, length in self.ranges:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, length, start)
+        return self
+
+    def __exit__(self, *args):
+        for start, length in reversed(self.ranges):
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, length, start)
+        self.thread_lock.release()
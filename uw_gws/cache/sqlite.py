@@ -0,0 +1,93 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A cache backend stored in an SQLite database file, which can be shared by
+the processes on a host and survives restarts.
+"""
+
+from uw_gws.cache.base import CacheBackend
+import sqlite3
+import threading
+import time
+
+# SQLite's default limit on host parameters in a statement
+MAX_PARAMS = 999
+
+
+class SQLiteCache(CacheBackend):
+    def __init__(self, path, ttl=300):
+        super(SQLiteCache, self).__init__(ttl=ttl)
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS gws_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires REAL NOT NULL)")
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def _get_many(self, keys):
+        found = {}
+        now = time.time()
+        conn = self._connection()
+        for chunk in self._chunks(keys):
+            rows = conn.execute(
+                "SELECT key, value FROM gws_cache WHERE expires >= ? AND "
+                "key IN ({})".format(",".join("?" * len(chunk))),
+                [now] + chunk)
+            for key, value in rows:
+                found[key] = bytes(value)
+        return found
+
+    def _set_many(self, items, ttl):
+        expires = time.time() + ttl
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO gws_cache (key, value, expires) "
+                "VALUES (?, ?, ?)",
+                [(k, sqlite3.Binary(v), expires) for k, v in items.items()])
+        return True
+
+    def _delete_many(self, keys):
+        count = 0
+        with self._connection() as conn:
+            for chunk in self._chunks(keys):
+                count += conn.execute(
+                    "DELETE FROM gws_cache WHERE key IN ({})".format(
+                        ",".join("?" * len(chunk))), chunk).rowcount
+        return count
+
+    def purge_expired(self):
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM gws_cache WHERE expires < ?",
+                                [time.time()]).rowcount
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM gws_cache")
+
+    def bytes_used(self):
+        row = self._connection().execute(
+            "SELECT SUM(LENGTH(key) + LENGTH(value)) FROM gws_cache"
+        ).fetchone()
+        return row[0] or 0
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _chunks(keys):
+        return [keys[i:i + MAX_PARAMS] for i in range(
+            0, len(keys), MAX_PARAMS)]
@@ -0,0 +1,367 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Command line interface for bulk work with the Groups Web Service.
+
+    uw-gws --config gws.cfg export --stem uw_it -o groups.jsonl --resume
+    uw-gws --config gws.cfg import groups.jsonl --checkpoint import.done
+    uw-gws --config gws.cfg sync groups.jsonl --dry-run
+    uw-gws --config gws.cfg affiliates --stem uw_it -o affiliates.jsonl
+
+Records are JSON lines of the form
+    {"id": group_id, "group": Group.json_data(), "members": [...]}
+"""
+
+from commonconf.backends import use_configparser_backend
+from restclients_core.exceptions import DataFailureException
+from uw_gws import GWS
+from uw_gws.audit import AffiliateAudit
+from uw_gws.deadline import deadline
+from uw_gws.scheduler import BULK, priority
+from uw_gws.models import GroupMember
+from uw_gws.utilities import map_concurrent
+import argparse
+import json
+import os
+import sys
+import time
+
+
+class Progress(object):
+    """
+    Counts completed items and reports progress and throughput to stderr.
+    """
+    def __init__(self, interval=5, stream=None):
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self.start = time.time()
+        self.last_report = self.start
+        self.done = 0
+        self.skipped = 0
+        self.errors = 0
+        self.members = 0
+
+    def update(self, members=0, error=False):
+        self.done += 1
+        self.members += members
+        if error:
+            self.errors += 1
+        now = time.time()
+        if self.interval and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.stream.write("{} groups, {} members, {} errors, {}\n".format(
+                self.done, self.members, self.errors, self._rate(now)))
+            self.stream.flush()
+
+    def summary(self, verb):
+        now = time.time()
+        self.stream.write(
+            "{} {} groups ({} members, {} skipped, {} errors) in {:.1f}s, "
+            "{}\n".format(verb, self.done - self.errors, self.members,
+                          self.skipped, self.errors, now - self.start,
+                          self._rate(now)))
+        self.stream.flush()
+
+    def _rate(self, now):
+        elapsed = max(now - self.start, 1e-6)
+        return "{:.1f} groups/s, {:.1f} members/s".format(
+            self.done / elapsed, self.members / elapsed)
+
+
+def read_lines(path):
+    """
+    Yields the non-blank lines of path, or of stdin if path is '-'.
+    """
+    stream = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in stream:
+            line = line.strip()
+            if len(line) and not line.startswith("#"):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def read_records(path):
+    for line in read_lines(path):
+        yield json.loads(line)
+
+
+def completed_ids(path):
+    """
+    Returns the ids recorded in an output or checkpoint file.  A partial
+    last line, left by an interrupted run, is truncated.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+
+    ids = set()
+    for line in data[:end].decode("utf-8").splitlines():
+        line = line.strip()
+        if line.startswith("{"):
+            ids.add(json.loads(line).get("id"))
+        elif len(line):
+            ids.add(line)
+    return ids
+
+
+def group_ids(gws, args):
+    if args.stem:
+        return (g.name for g in gws.search_groups(stem=args.stem,
+                                                  scope="all"))
+    return read_lines(args.ids)
+
+
+def export_group(gws, group_id, members):
+    record = {"id": group_id,
+              "group": gws.get_group_by_id(group_id).json_data()}
+    if members == "direct":
+        record["members"] = [m.json_data() for m in gws.get_members(group_id)]
+    elif members == "effective":
+        record["members"] = [
+            m.json_data() for m in gws.get_effective_members(group_id)]
+    return record
+
+
+def direct_members(record):
+    # Effective exports carry indirect members, which can't be written
+    return [GroupMember(name=m.get("id"), type=m.get("type"))
+            for m in record.get("members", [])
+            if m.get("mtype") in (None, GroupMember.DIRECT_MTYPE)]
+
+
+def member_keys(members):
+    return set((m.name, m.type) for m in members)
+
+
+def group_fields(gws, group):
+    return gws.group_fields(group.json_data(is_put_req=True))
+
+
+def import_record(gws, record):
+    group = gws.group_from_json(record["group"])
+    if gws.group_exists(record["id"]):
+        gws.update_group(group)
+        action = "updated"
+    else:
+        gws.create_group(group)
+        action = "created"
+
+    result = {"id": record["id"], "action": action}
+    if "members" in record:
+        result["not_found"] = gws.update_members(
+            record["id"], direct_members(record))
+    return result
+
+
+def sync_record(gws, record, dry_run=False):
+    group_id = record["id"]
+    desired = gws.group_from_json(record["group"])
+    actions = []
+    try:
+        current = gws.get_group_by_id(group_id)
+    except DataFailureException as ex:
+        if ex.status != 404:
+            raise
+        current = None
+
+    if current is None:
+        actions.append("create")
+        if not dry_run:
+            gws.create_group(desired)
+    elif group_fields(gws, current) != group_fields(gws, desired):
+        actions.append("update")
+        if not dry_run:
+            gws.update_group(desired)
+
+    result = {"id": group_id}
+    if "members" in record:
+        members = direct_members(record)
+        current_members = [] if current is None else gws.get_members(
+            group_id)
+        if member_keys(members) != member_keys(current_members):
+            actions.append("members")
+            if not dry_run:
+                result["not_found"] = gws.update_members(group_id, members)
+
+    result["actions"] = actions
+    return result
+
+
+def run_export(gws, args):
+    done = set()
+    mode = "w"
+    if args.resume:
+        done = completed_ids(args.output)
+        mode = "a"
+
+    progress = Progress(args.progress)
+    progress.skipped = len(done)
+    out = sys.stdout if args.output == "-" else open(args.output, mode)
+    try:
+        ids = (i for i in group_ids(gws, args) if i not in done)
+        for group_id, record, ex in map_concurrent(
+                lambda i: export_group(gws, i, args.members), ids,
+                args.workers):
+            if ex is not None:
+                sys.stderr.write("{}: {}\n".format(group_id, ex))
+                progress.update(error=True)
+                continue
+            out.write(json.dumps(record) + "\n")
+            progress.update(members=len(record.get("members", [])))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    progress.summary("Exported")
+    return 1 if progress.errors else 0
+
+
+def run_records(gws, args, func, verb):
+    done = completed_ids(args.checkpoint) if args.checkpoint else set()
+    records = (r for r in read_records(args.input) if r["id"] not in done)
+    if args.preflight:
+        # Checks every record before the first write
+        records = list(records)
+        report = gws.preflight(
+            members=dict((r["id"], direct_members(r)) for r in records),
+            check_exists=True, max_workers=args.workers)
+        if not report.ok:
+            sys.stderr.write(report.summary() + "\n")
+            return 1
+
+    progress = Progress(args.progress)
+    progress.skipped = len(done)
+    checkpoint = open(args.checkpoint, "a") if args.checkpoint else None
+    try:
+        for record, result, ex in map_concurrent(
+                func, records, args.workers):
+            if ex is not None:
+                sys.stderr.write("{}: {}\n".format(record["id"], ex))
+                progress.update(error=True)
+                continue
+            sys.stdout.write(json.dumps(result) + "\n")
+            if checkpoint is not None:
+                checkpoint.write(record["id"] + "\n")
+                checkpoint.flush()
+            progress.update(members=len(record.get("members", [])))
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    progress.summary(verb)
+    return 1 if progress.errors else 0
+
+
+def run_import(gws, args):
+    return run_records(
+        gws, args, lambda record: import_record(gws, record), "Imported")
+
+
+def run_sync(gws, args):
+    return run_records(
+        gws, args, lambda record: sync_record(gws, record, args.dry_run),
+        "Checked" if args.dry_run else "Synced")
+
+
+def run_affiliates(gws, args):
+    progress = Progress(args.progress)
+
+    def on_group(group_id, affiliates, ex):
+        if ex is not None:
+            sys.stderr.write("{}: {}\n".format(group_id, ex))
+        progress.update(error=ex is not None)
+
+    audit = AffiliateAudit(gws, args.workers).run(
+        group_ids(gws, args), on_group=on_group)
+    if args.output:
+        with open(args.output, "w") as out:
+            for group_id in sorted(audit.affiliates):
+                out.write(json.dumps({"id": group_id, "affiliates": [
+                    a.json_data() for a in audit.affiliates[group_id]]}) +
+                    "\n")
+    audit.write(sys.stdout)
+    progress.summary("Audited")
+    return 1 if progress.errors else 0
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="uw-gws", description="Bulk Groups Web Service operations")
+    parser.add_argument("--config", help="settings file (configparser)")
+    parser.add_argument("--section", default="GWS",
+                        help="settings file section, default GWS")
+    parser.add_argument("--act-as", default=None, help="netid to act as")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="concurrent requests, default 8")
+    parser.add_argument("--progress", type=float, default=5,
+                        help="seconds between progress reports, 0 for none")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="seconds to stop after, unfinished groups are "
+                        "reported as errors and can be resumed")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    export = subparsers.add_parser(
+        "export", help="export groups and members as JSON lines")
+    source = export.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ids", help="file of group ids, - for stdin")
+    source.add_argument("--stem", help="export every group under a stem")
+    export.add_argument("--members", default="direct",
+                        choices=["none", "direct", "effective"])
+    export.add_argument("-o", "--output", default="-",
+                        help="output file, default stdout")
+    export.add_argument("--resume", action="store_true",
+                        help="skip groups already in the output file")
+    export.set_defaults(func=run_export)
+
+    for name, func, text in [
+            ("import", run_import, "create or update groups from an export"),
+            ("sync", run_sync, "apply only the differences from an export")]:
+        command = subparsers.add_parser(name, help=text)
+        command.add_argument("input", help="JSON lines file, - for stdin")
+        command.add_argument("--checkpoint",
+                             help="file of completed ids, for resuming")
+        command.add_argument(
+            "--preflight", action="store_true",
+            help="check every group id and member, and look up group "
+            "members, before writing any")
+        if name == "sync":
+            command.add_argument("--dry-run", action="store_true")
+        command.set_defaults(func=func)
+
+    affiliates = subparsers.add_parser(
+        "affiliates", help="count affiliates by type and status, forward "
+        "target and sender type")
+    source = affiliates.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ids", help="file of group ids, - for stdin")
+    source.add_argument("--stem", help="audit every group under a stem")
+    affiliates.add_argument(
+        "-o", "--output", help="JSON lines file of each group's affiliates")
+    affiliates.set_defaults(func=run_affiliates)
+
+    return parser
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.command == "export" and args.resume and args.output == "-":
+        parser.error("--resume requires --output")
+    if args.config:
+        use_configparser_backend(args.config, args.section)
+
+    gws = GWS(act_as=args.act_as, log_errors=True)
+    with deadline(args.deadline), priority(BULK):
+        return args.func(gws, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Pluggable JSON codecs used to decode GWS responses and encode PUT bodies.
+
+The codec is selected with the RESTCLIENTS_GWS_JSON_CODEC setting, one of
+'auto' (default), 'orjson', 'ujson' or 'json'.  'auto' picks the fastest
+installed library.  A codec whose library is not installed falls back to
+the standard json module.
+
+Every codec's dumps() returns compact UTF-8 encoded bytes, as orjson does,
+so request bodies are the same type whichever library is installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec(object):
+    """
+    Codec backed by the standard library json module.
+    """
+    name = "json"
+
+    def is_available(self):
+        return True
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def is_available(self):
+        return orjson is not None
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def is_available(self):
+        return ujson is not None
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False,
+                           escape_forward_slashes=False).encode("utf-8")
+
+
+CODECS = {
+    JSONCodec.name: JSONCodec(),
+    OrjsonCodec.name: OrjsonCodec(),
+    UjsonCodec.name: UjsonCodec(),
+}
+
+# Order of preference for the 'auto' setting
+PREFERRED = (OrjsonCodec.name, UjsonCodec.name, JSONCodec.name)
+
+
+def available_codecs():
+    """
+    Returns the names of the codecs that can be used in this environment.
+    """
+    return [name for name in PREFERRED if CODECS[name].is_available()]
+
+
+def get_codec(name=None):
+    """
+    Returns the codec identified by name, or the fastest available codec
+    if name is None or 'auto'.
+    """
+    if name is None or name == "auto":
+        return CODECS[available_codecs()[0]]
+
+    codec = CODECS.get(name.lower())
+    if codec is None:
+        raise ValueError("Unknown JSON codec: {}".format(name))
+
+    return codec if codec.is_available() else CODECS[JSONCodec.name]
@@ -0,0 +1,162 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compressed transfer of GWS responses.  Compression is opt-in with the
+RESTCLIENTS_GWS_COMPRESSION setting; brotli ('br') is offered only when
+the brotli package is installed.
+"""
+
+import threading
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PREFERRED = ("br", "gzip", "deflate")
+
+
+def available_encodings():
+    return [e for e in PREFERRED if e != "br" or brotli is not None]
+
+
+def accept_encoding(setting):
+    """
+    Returns the Accept-Encoding header value for a COMPRESSION setting,
+    'auto' or a comma separated list of encodings, or None if compression
+    is off.
+    """
+    if not setting:
+        return None
+
+    available = available_encodings()
+    if setting.strip().lower() == "auto":
+        wanted = available
+    else:
+        wanted = [e.strip().lower() for e in setting.split(",")]
+        for encoding in wanted:
+            if encoding not in PREFERRED:
+                raise ValueError(
+                    "Unknown content encoding: {}".format(encoding))
+        wanted = [e for e in wanted if e in available]
+    return ", ".join(wanted) if len(wanted) else None
+
+
+class StreamDecoder(object):
+    """
+    Incrementally decodes a response body in one content encoding.
+    """
+    def __init__(self, encoding):
+        encoding = (encoding or "identity").strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._decoder = zlib.decompressobj()
+        elif encoding == "br" and brotli is not None:
+            self._decoder = brotli.Decompressor()
+        elif encoding == "identity":
+            self._decoder = None
+        else:
+            raise ValueError("Unsupported content encoding: {}".format(
+                encoding))
+        self.encoding = encoding
+
+    def decompress(self, chunk):
+        if self._decoder is None:
+            return chunk
+        if self.encoding == "br":
+            return self._decoder.process(chunk)
+        return self._decoder.decompress(chunk)
+
+    def flush(self):
+        if self._decoder is None or self.encoding == "br":
+            return b""
+        return self._decoder.flush()
+
+
+def iter_decompress(chunks, encoding):
+    """
+    Yields the decoded data of an iterable of encoded chunks, such as a
+    streamed response's stream().
+    """
+    decoder = StreamDecoder(encoding)
+    for chunk in chunks:
+        data = decoder.decompress(chunk)
+        if len(data):
+            yield data
+    data = decoder.flush()
+    if len(data):
+        yield data
+
+
+def decompress(data, encoding):
+    decoder = StreamDecoder(encoding)
+    return decoder.decompress(data) + decoder.flush()
+
+
+class TransferStats(object):
+    """
+    Counts response bytes on the wire and after decoding, and the time
+    spent decompressing.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.compressed = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.decode_time = 0.0
+
+    def record(self, wire_bytes, decoded_bytes, seconds, compressed):
+        with self._lock:
+            self.responses += 1
+            self.compressed += 1 if compressed else 0
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+            self.decode_time += seconds
+
+    @property
+    def ratio(self):
+        # Decoded bytes per wire byte
+        return self.decoded_bytes / self.wire_bytes if (
+            self.wire_bytes) else None
+
+    def json_data(self):
+        return {
+            "responses": self.responses,
+            "compressed": self.compressed,
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "ratio": self.ratio,
+            "decode_ms": self.decode_time * 1000,
+        }
+
+
+def decode_response(response, stats=None, accept_encoding=None):
+    """
+    Returns the decoded body of a response, recording the transfer in stats.
+    The body is decompressed only if the request sent accept_encoding and
+    urllib3 left the body encoded (decode_content=False), as GWSLiveDAO
+    does for such requests.
+    """
+    data = response.data
+    encoding = None
+    if accept_encoding and getattr(response, "decode_content", None) is False:
+        for name, value in (getattr(response, "headers", None) or {}).items():
+            if name.lower() == "content-encoding":
+                encoding = value
+
+    start = time.time()
+    if encoding is not None and data:
+        data = decompress(data, encoding)
+    if stats is not None:
+        stats.record(len(response.data or b""), len(data or b""),
+                     time.time() - start, encoding is not None)
+    return data
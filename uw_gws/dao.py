@@ -5,9 +5,17 @@
 """
 Contains UW GWS DAO implementations.
 """
-from restclients_core.dao import DAO
+from restclients_core.dao import DAO, LiveDAO
+from restclients_core.exceptions import DataFailureException
 from os.path import abspath, dirname
+from urllib3 import Timeout
+from uw_gws.deadline import check_deadline, remaining
+from uw_gws.exceptions import DeadlineExceeded
 import os
+import threading
+
+_shared_dao = None
+_shared_dao_lock = threading.Lock()
 
 
 class GWS_DAO(DAO):
@@ -17,3 +25,80 @@ class GWS_DAO(DAO):
     def service_mock_paths(self):
         path = [abspath(os.path.join(dirname(__file__), "resources"))]
         return path
+
+    def _get_live_implementation(self):
+        return GWSLiveDAO(self.service_name(), self)
+
+    def _load_resource(self, method, url, headers, body):
+        check_deadline(url)
+        return super(GWS_DAO, self)._load_resource(method, url, headers, body)
+
+
+def shared_dao():
+    """
+    Returns the GWS_DAO used by GWS clients created without one.  The DAO
+    holds no per-client state, and live connection pools are kept per
+    service, so all clients in the process share one pool.
+    """
+    global _shared_dao
+    if _shared_dao is None:
+        with _shared_dao_lock:
+            if _shared_dao is None:
+                _shared_dao = GWS_DAO()
+    return _shared_dao
+
+
+class GWSLiveDAO(LiveDAO):
+    """
+    Limits request timeouts to the time left before the deadline, and
+    leaves compressed response bodies encoded when the client negotiated
+    the encoding, so the client can measure and decode them itself.
+    LiveDAO.load makes the requests, with the pool from get_pool().
+
+    The connection pool, sized by the POOL_SIZE setting, is created once
+    per process and shared by all threads and clients.
+    """
+    _pool_lock = threading.Lock()
+
+    def get_pool(self):
+        return _RequestPool(self.shared_pool())
+
+    def shared_pool(self):
+        # LiveDAO.get_pool can create a pool for each thread racing it
+        service = self.dao.service_name()
+        pool = LiveDAO.pools.get(service)
+        if pool is None:
+            with self._pool_lock:
+                pool = LiveDAO.pools.get(service)
+                if pool is None:
+                    pool = self.create_pool()
+                    LiveDAO.pools[service] = pool
+        return pool
+
+    def load(self, method, url, headers, body):
+        try:
+            return super(GWSLiveDAO, self).load(method, url, headers, body)
+        except DataFailureException as ex:
+            # LiveDAO.load reports urllib3 errors, timeouts among them,
+            # with status 0
+            if ex.status == 0 and remaining() == 0.0:
+                raise DeadlineExceeded(url)
+            raise
+
+
+class _RequestPool(object):
+    """
+    The shared pool as LiveDAO.load sees it for one request.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.timeout = pool.timeout
+        left = remaining()
+        if left is not None:
+            self.timeout = Timeout(
+                connect=min(pool.timeout.connect_timeout, left),
+                read=min(pool.timeout.read_timeout, left))
+
+    def urlopen(self, method, url, headers=None, **kwargs):
+        kwargs["decode_content"] = "Accept-Encoding" not in (headers or {})
+        return self.pool.urlopen(method, url, headers=headers, **kwargs)
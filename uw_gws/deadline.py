@@ -0,0 +1,81 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Context-scoped deadlines for GWS requests.
+
+    with deadline(5):
+        for netid, groups in gws.groups_for_members(netids):
+            if groups is INCOMPLETE:
+                ...
+
+Every request made in the block, including those made by the worker
+threads of batch operations, is given only the time left.  Requests that
+can't be made in time raise DeadlineExceeded.
+
+The GWS API has no paged history or chunked member writes: history is
+one request, and member changes are one request each.  The operations
+that make several requests (groups_for_members, get_member_counts,
+AclIndex.crawl, Reconciler.apply) check the deadline before each one, and
+report what they didn't complete.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from uw_gws.exceptions import DeadlineExceeded
+import time
+
+_deadline = ContextVar("uw_gws_deadline", default=None)
+
+
+class Incomplete(object):
+    """
+    Marks a batch result that was not completed before the deadline.
+    """
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "INCOMPLETE"
+
+
+INCOMPLETE = Incomplete()
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Limits the requests made in the block to seconds from now.  A nested
+    deadline can only shorten the enclosing one.  None sets no deadline.
+    """
+    if seconds is None:
+        yield
+        return
+
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(
+        current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    Returns the seconds left before the deadline, or None if there is none.
+    """
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return max(expires - time.monotonic(), 0.0)
+
+
+def check_deadline(url=None):
+    """
+    Raises DeadlineExceeded if the deadline has passed.
+    """
+    if remaining() == 0.0:
+        raise DeadlineExceeded(url)
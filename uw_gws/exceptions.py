@@ -6,7 +6,22 @@
 Contains the custom exceptions used by the GWS client.
 """
 
+from restclients_core.exceptions import DataFailureException
+
 
 class InvalidGroupID(Exception):
     """Exception for invalid group id."""
     pass
+
+
+class DeadlineExceeded(DataFailureException):
+    """Exception for a request not made or completed before the deadline."""
+    def __init__(self, url=None):
+        super(DeadlineExceeded, self).__init__(url, 0, "Deadline exceeded")
+
+
+class PreflightFailed(Exception):
+    """Exception for a batch with group ids or members that failed checks."""
+    def __init__(self, report):
+        super(PreflightFailed, self).__init__(report.summary())
+        self.report = report
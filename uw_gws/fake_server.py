@@ -0,0 +1,443 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A local stand-in for the Groups Web Service, for load and integration
+testing.  It serves the /group_sws/v3 endpoints from in-memory state that
+is seeded from the mock resources, applies writes to that state, and can
+add latency, jitter, errors and throttling to every response.
+
+    python -m uw_gws.fake_server --port 8080 --latency 0.05 --error-rate 0.01
+
+Point a client at it with the settings
+    RESTCLIENTS_GWS_DAO_CLASS='Live'
+    RESTCLIENTS_GWS_HOST='http://127.0.0.1:8080'
+"""
+
+from fnmatch import fnmatch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os.path import abspath, dirname
+from urllib.parse import urlparse, parse_qs, unquote
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+
+API = "/group_sws/v3"
+RE_GROUP_PATH = re.compile(
+    r'^/group/(?P<group_id>[^/]+)(?:/(?P<endpoint>member|effective_member|'
+    r'history)(?:/(?P<members>[^/]+))?)?/?$')
+RESOURCE_PATH = abspath(os.path.join(
+    dirname(__file__), "resources", "gws", "file", "group_sws", "v3"))
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class FakeGWSState(object):
+    """
+    Groups, memberships and history held in memory.
+    """
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.groups = {}
+        self.members = {}
+        self.effective = {}
+        self.history = {}
+        self.etags = {}
+
+    @classmethod
+    def from_resources(cls, path=RESOURCE_PATH):
+        state = cls()
+        group_path = os.path.join(path, "group")
+        for group_id in sorted(os.listdir(group_path)):
+            def load(*parts):
+                file_path = os.path.join(group_path, group_id, *parts)
+                if os.path.isfile(file_path):
+                    with open(file_path) as f:
+                        return json.load(f).get("data")
+
+            group = load("index.html")
+            if group is None:
+                continue
+            state.put_group(group_id, group, record=False)
+            state.members[group_id] = load("member", "index.html") or []
+            effective = load("effective_member", "index.html")
+            if effective is not None:
+                state.effective[group_id] = effective
+            state.history[group_id] = list(reversed(load("history") or []))
+        return state
+
+    def put_group(self, group_id, data, record=True):
+        with self.lock:
+            created = group_id not in self.groups
+            group = dict(data)
+            group["id"] = group_id
+            group.setdefault("regid", "{:032x}".format(
+                random.getrandbits(128)))
+            group.setdefault("affiliates", [])
+            group["lastModified"] = _now_ms()
+            self.groups[group_id] = group
+            self.members.setdefault(group_id, [])
+            self.history.setdefault(group_id, [])
+            self.etags[group_id] = self.etags.get(group_id, 0) + 1
+            if record:
+                self.record(group_id, "group", "{}: '{}'".format(
+                    "created" if created else "modified", group_id))
+            return group, created
+
+    def delete_group(self, group_id):
+        with self.lock:
+            for store in (self.groups, self.members, self.effective,
+                          self.history, self.etags):
+                store.pop(group_id, None)
+
+    def etag(self, group_id):
+        return '"{}"'.format(self.etags.get(group_id, 0))
+
+    def set_members(self, group_id, members):
+        with self.lock:
+            old = set(m["id"] for m in self.members[group_id])
+            new = set(m["id"] for m in members)
+            self.members[group_id] = [
+                {"id": m["id"], "type": m.get("type", "uwnetid"),
+                 "mtype": "direct", "source": None} for m in members]
+            self.member_changes(group_id, new - old, old - new)
+
+    def add_members(self, group_id, names):
+        with self.lock:
+            current = set(m["id"] for m in self.members[group_id])
+            added = [n for n in names if n not in current]
+            self.members[group_id].extend([
+                {"id": n, "type": "uwnetid", "mtype": "direct",
+                 "source": None} for n in added])
+            self.member_changes(group_id, added, [])
+
+    def delete_members(self, group_id, names):
+        with self.lock:
+            names = set(names)
+            removed = [m["id"] for m in self.members[group_id]
+                       if m["id"] in names]
+            self.members[group_id] = [
+                m for m in self.members[group_id] if m["id"] not in names]
+            self.member_changes(group_id, [], removed)
+
+    def member_changes(self, group_id, added, removed):
+        self.effective.pop(group_id, None)
+        self.groups[group_id]["lastMemberModified"] = _now_ms()
+        for name in sorted(added):
+            self.record(group_id, "membership", "add member: '{}'".format(
+                name))
+        for name in sorted(removed):
+            self.record(group_id, "membership",
+                        "delete member: '{}'".format(name))
+
+    def record(self, group_id, activity, description):
+        self.history[group_id].append({
+            "timestamp": _now_ms(), "actAs": "", "activity": activity,
+            "description": description})
+
+    def effective_members(self, group_id, seen=None):
+        with self.lock:
+            if group_id in self.effective:
+                return self.effective[group_id]
+
+            # Expand nested groups
+            seen = seen if seen is not None else set([group_id])
+            result = {}
+            for member in self.members.get(group_id, []):
+                if member["type"] == "group" and member["id"] in self.groups:
+                    if member["id"] in seen:
+                        continue
+                    seen.add(member["id"])
+                    for nested in self.effective_members(member["id"], seen):
+                        result.setdefault(nested["id"], dict(
+                            nested, mtype="indirect", source=member["id"]))
+                else:
+                    result[member["id"]] = member
+            return list(result.values())
+
+    def search(self, params):
+        def matches(group_id, group):
+            if "stem" in params:
+                stem = params["stem"]
+                if group_id != stem and not group_id.startswith(stem + "_"):
+                    return False
+            if "name" in params and not fnmatch(group_id, params["name"]):
+                return False
+            if "member" in params:
+                members = (self.effective_members(group_id)
+                           if params.get("type") == "effective"
+                           else self.members[group_id])
+                if params["member"] not in [m["id"] for m in members]:
+                    return False
+            if "owner" in params and params["owner"] not in [
+                    a["id"] for a in group.get("admins", [])]:
+                return False
+            return True
+
+        with self.lock:
+            return [{"id": group_id, "regid": group.get("regid"),
+                     "displayName": group.get("displayName"),
+                     "url": "{}/group/{}".format(API, group_id)}
+                    for group_id, group in sorted(self.groups.items())
+                    if matches(group_id, group)]
+
+
+class Behavior(object):
+    """
+    Latency, jitter, error rate and throttling applied to responses.
+    """
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0,
+                 max_rps=None):
+        self._lock = threading.Lock()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+
+    @property
+    def max_rps(self):
+        return self._max_rps
+
+    @max_rps.setter
+    def max_rps(self, value):
+        # Start with a full bucket
+        with self._lock:
+            self._max_rps = value
+            self._tokens = float(value or 0)
+            self._updated = time.time()
+
+    def delay(self):
+        return max(0.0, self.latency + random.uniform(
+            -self.jitter, self.jitter))
+
+    def is_error(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    def is_throttled(self):
+        if not self.max_rps:
+            return False
+        with self._lock:
+            now = time.time()
+            self._tokens = min(float(self.max_rps), self._tokens + (
+                now - self._updated) * self.max_rps)
+            self._updated = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+
+class FakeGWSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_method("GET")
+
+    def do_PUT(self):
+        self.handle_method("PUT")
+
+    def do_DELETE(self):
+        self.handle_method("DELETE")
+
+    def handle_method(self, method):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server.count(method)
+
+        behavior = server.behavior
+        time.sleep(behavior.delay())
+        if behavior.is_throttled():
+            return self.respond(429, {"errors": [{"status": 429}]})
+        if behavior.is_error():
+            return self.respond(500, {"errors": [{"status": 500}]})
+
+        url = urlparse(self.path)
+        if not url.path.startswith(API):
+            return self.respond(404, {})
+        path = url.path[len(API):]
+        params = dict((k, v[0]) for k, v in parse_qs(url.query).items())
+
+        try:
+            if path == "/search" and method == "GET":
+                return self.respond(200, {"data": server.state.search(
+                    params)})
+            match = RE_GROUP_PATH.match(path)
+            if match is None:
+                return self.respond(404, {})
+            return self.handle_group(
+                method, unquote(match.group("group_id")),
+                match.group("endpoint"), match.group("members"), params,
+                json.loads(body) if body else {})
+        except ValueError:
+            return self.respond(400, {"errors": [{"status": 400}]})
+
+    def handle_group(self, method, group_id, endpoint, members, params,
+                     body):
+        state = self.server.state
+        with state.lock:
+            exists = group_id in state.groups
+            if endpoint is None and method == "PUT":
+                # An update (any If-Match) needs the group to exist
+                if_match = self.headers.get("If-Match")
+                if if_match is not None and (not exists or if_match not in (
+                        "*", state.etag(group_id))):
+                    return self.respond(412, {"errors": [{"status": 412}]})
+                group, created = state.put_group(group_id, body["data"])
+                return self.respond(201 if created else 200, {
+                    "data": group}, {"ETag": state.etag(group_id)})
+
+            if not exists:
+                return self.respond(404, {"errors": [{"status": 404}]})
+
+            if endpoint is None:
+                if method == "DELETE":
+                    state.delete_group(group_id)
+                    return self.respond(200, {})
+                return self.respond(200, {"data": state.groups[group_id]},
+                                    {"ETag": state.etag(group_id)})
+
+            if endpoint == "history":
+                return self.respond(200, {"data": self.history(
+                    group_id, params)})
+
+            if endpoint == "effective_member":
+                found = state.effective_members(group_id)
+                if members:
+                    return self.member_check(found, members)
+                if params.get("view") == "count":
+                    return self.respond(200, {"data": {"count": len(found)}})
+                return self.respond(200, {"data": found})
+
+            names = unquote(members).split(",") if members else []
+            if method == "GET":
+                if members:
+                    return self.member_check(state.members[group_id],
+                                             members)
+                return self.respond(200, {"data": state.members[group_id]})
+            if method == "DELETE":
+                state.delete_members(group_id, names)
+                return self.respond(200, {})
+            if members:
+                state.add_members(group_id, names)
+                return self.respond(200, {})
+            state.set_members(group_id, body.get("data", []))
+            return self.respond(200, {"errors": [
+                {"status": 200, "notFound": []}]})
+
+    def history(self, group_id, params):
+        start = int(params.get("start", 0))
+        changes = [
+            h for h in self.server.state.history[group_id]
+            if h["timestamp"] >= start and (
+                "activity" not in params or
+                h["activity"] == params["activity"]) and (
+                "id" not in params or
+                "'{}'".format(params["id"]) in h["description"])]
+        return list(reversed(changes))
+
+    def member_check(self, found, name):
+        name = unquote(name)
+        if name in [m["id"] for m in found]:
+            return self.respond(200, {"data": [{"id": name}]})
+        return self.respond(404, {"errors": [{"status": 404}]})
+
+    def respond(self, status, data, headers={}):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if len(body) >= self.server.gzip_min_size and (
+                "gzip" in self.headers.get("Accept-Encoding", "")):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out or gave up on the request
+            self.close_connection = True
+
+
+class FakeGWSServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, state=None,
+                 gzip_min_size=512, **behavior):
+        """
+        :param state: a FakeGWSState, defaults to one seeded from the
+            mock resources
+        :param gzip_min_size: smallest response body gzipped for clients
+            that accept it
+        :param behavior: latency, jitter, error_rate and max_rps, see
+            Behavior
+        """
+        ThreadingHTTPServer.__init__(self, (host, port), FakeGWSHandler)
+        self.state = state if state is not None else (
+            FakeGWSState.from_resources())
+        self.behavior = Behavior(**behavior)
+        self.gzip_min_size = gzip_min_size
+        self.requests = {}
+        self._count_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://{}:{}".format(*self.server_address[:2])
+
+    def count(self, method):
+        with self._count_lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake GWS server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random seconds added or removed from latency")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests that return 500")
+    parser.add_argument("--max-rps", type=float, default=None,
+                        help="requests per second before returning 429")
+    args = parser.parse_args(argv)
+    server = FakeGWSServer(args.host, args.port, latency=args.latency,
+                           jitter=args.jitter, error_rate=args.error_rate,
+                           max_rps=args.max_rps)
+    print("Serving {}{}".format(server.url, API))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Point-in-time group membership, reconstructed from membership history.
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime
+import json
+import os
+import threading
+import time
+
+
+def _epoch_ms(timestamp):
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp() * 1000)
+    return int(timestamp * 1000)
+
+
+class MembershipTimeline(object):
+    """
+    Answers "who was in group X at time T?" by replaying membership history
+    from the nearest known snapshot of the group's direct membership.
+
+    The first query for a group starts from the current get_members()
+    snapshot and replays history backward.  While replaying, a checkpoint
+    snapshot is kept every checkpoint_interval seconds, so later queries
+    replay only the window between T and the nearest checkpoint.
+    """
+    def __init__(self, gws, checkpoint_interval=86400, max_checkpoints=1000,
+                 path=None):
+        """
+        :param gws: the GWS client used for members and history
+        :param checkpoint_interval: seconds between checkpoint snapshots
+        :param max_checkpoints: checkpoints kept per group
+        :param path: optional JSON file the checkpoint index is saved to
+        """
+        self.gws = gws
+        self.checkpoint_interval = checkpoint_interval * 1000
+        self.max_checkpoints = max_checkpoints
+        self.path = path
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def membership_at(self, group_id, timestamp):
+        """
+        Returns the set of direct member ids of the group at timestamp, a
+        datetime or epoch seconds.
+        """
+        target = _epoch_ms(timestamp)
+        before, after = self._nearest(group_id, target)
+
+        if before is not None and (after is None or (
+                target - before[0] < after[0] - target)):
+            return self._replay_forward(group_id, before, target)
+
+        if after is None:
+            after = self.snapshot(group_id)
+        return self._replay_backward(group_id, after, target)
+
+    def snapshot(self, group_id):
+        """
+        Records the current membership as a checkpoint and returns it.
+        """
+        now = int(time.time() * 1000)
+        members = frozenset(m.name for m in self.gws.get_members(group_id))
+        self._add_checkpoint(group_id, now, members)
+        return (now, members)
+
+    def checkpoints(self, group_id):
+        """
+        Returns the checkpoint timestamps (epoch ms) held for the group.
+        """
+        with self._lock:
+            return [ts for ts, members in self._checkpoints.get(
+                group_id, [])]
+
+    def _history(self, group_id, start_ms):
+        return self.gws.get_group_history(
+            group_id, activity="membership", start=start_ms // 1000)
+
+    def _replay_backward(self, group_id, checkpoint, target):
+        checkpoint_ts, members = checkpoint
+        members = set(members)
+        events = [h for h in self._history(group_id, target)
+                  if target < h.timestamp <= checkpoint_ts]
+        next_checkpoint = checkpoint_ts - self.checkpoint_interval
+
+        # Undo the changes made after target, latest first
+        for event in reversed(events):
+            while event.timestamp <= next_checkpoint:
+                self._add_checkpoint(group_id, next_checkpoint,
+                                     frozenset(members))
+                next_checkpoint -= self.checkpoint_interval
+            self._undo(members, event)
+
+        unchanged = frozenset(members)
+        while next_checkpoint > target:
+            self._add_checkpoint(group_id, next_checkpoint, unchanged)
+            next_checkpoint -= self.checkpoint_interval
+        return members
+
+    def _replay_forward(self, group_id, checkpoint, target):
+        checkpoint_ts, members = checkpoint
+        members = set(members)
+        for event in self._history(group_id, checkpoint_ts):
+            if checkpoint_ts < event.timestamp <= target:
+                self._apply(members, event)
+        return members
+
+    @staticmethod
+    def _apply(members, event):
+        if event.is_add_member():
+            members.add(event.member_uwnetid)
+        elif event.is_delete_member():
+            members.discard(event.member_uwnetid)
+
+    @staticmethod
+    def _undo(members, event):
+        if event.is_add_member():
+            members.discard(event.member_uwnetid)
+        elif event.is_delete_member():
+            members.add(event.member_uwnetid)
+
+    def _nearest(self, group_id, target):
+        with self._lock:
+            checkpoints = self._checkpoints.get(group_id, [])
+            index = bisect_left(checkpoints, (target,))
+            before = after = None
+            if index < len(checkpoints):
+                after = checkpoints[index]
+                if after[0] == target:
+                    return after, after
+            if index > 0:
+                before = checkpoints[index - 1]
+            return before, after
+
+    def _add_checkpoint(self, group_id, timestamp, members):
+        with self._lock:
+            checkpoints = self._checkpoints.setdefault(group_id, [])
+            index = bisect_left(checkpoints, (timestamp,))
+            if (index < len(checkpoints) and
+                    checkpoints[index][0] == timestamp):
+                return
+            insort(checkpoints, (timestamp, members))
+            if len(checkpoints) > self.max_checkpoints:
+                # Keep the most recent checkpoints
+                del checkpoints[0]
+
+    def save(self, path=None):
+        path = path or self.path
+        with self._lock:
+            data = dict((group_id, [[ts, sorted(members)] for ts, members
+                                    in checkpoints])
+                        for group_id, checkpoints in self._checkpoints.items())
+        tmp_path = "{}.tmp".format(path)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        with open(path or self.path) as f:
+            data = json.load(f)
+        with self._lock:
+            self._checkpoints = dict(
+                (group_id, [(ts, frozenset(members))
+                            for ts, members in checkpoints])
+                for group_id, checkpoints in data.items())
@@ -0,0 +1,146 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Cache invalidation driven by group history, so cached group data can have
+long TTLs and still reflect changes made by other systems.
+"""
+
+from restclients_core.exceptions import DataFailureException
+from uw_gws.cache.base import cache_key, generation_key, new_generation
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryInvalidator(object):
+    """
+    Polls get_group_history for the watched groups with a moving start
+    cursor, and ends the cached reads of each group with changes in
+    ACTIVITIES, for every act_as user, and the cached searches, as a write
+    through GWS does.  GWS logs description and display name changes
+    under activity "group".
+
+    The cursor is the latest timestamp seen and the changes seen at it, as
+    several changes can share a millisecond.  History isn't cached.
+
+    Other objects, such as a uw_gws.refresh.Refresher, can be notified
+    through the on_change callback.
+    """
+    ACTIVITIES = ("acl", "group", "membership")
+
+    def __init__(self, gws, cache=None, group_ids=[], since=None,
+                 on_change=None):
+        """
+        :param gws: the GWS client used for polling
+        :param cache: the cache backend to invalidate, defaults to gws.cache
+        :param since: epoch seconds to start watching from, defaults to now
+        :param on_change: called with (group_id, [GroupHistory]) for each
+            group with changes
+        """
+        self.gws = gws
+        self.cache = cache if cache is not None else gws.cache
+        self.on_change = on_change
+        self._since = int((time.time() if since is None else since) * 1000)
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._stopped = threading.Event()
+        for group_id in group_ids:
+            self.watch(group_id)
+
+    def watch(self, group_id, since=None):
+        with self._lock:
+            self._cursors.setdefault(group_id, (
+                self._since if since is None else int(since * 1000),
+                frozenset()))
+
+    def unwatch(self, group_id):
+        with self._lock:
+            self._cursors.pop(group_id, None)
+
+    @property
+    def watched(self):
+        return sorted(self._cursors)
+
+    def cursor(self, group_id):
+        """
+        Returns the latest history timestamp (epoch ms) seen.
+        """
+        return self._cursors[group_id][0]
+
+    def poll(self):
+        """
+        Polls every watched group once, returns the number of changes
+        applied.
+        """
+        changed = 0
+        for group_id in self.watched:
+            changed += self.poll_group(group_id)
+        return changed
+
+    def poll_group(self, group_id):
+        with self._lock:
+            cursor = self._cursors.get(group_id)
+        if cursor is None:
+            return 0
+        timestamp, seen = cursor
+
+        try:
+            history = self.gws.get_group_history(
+                group_id, start=timestamp // 1000)
+        except DataFailureException as ex:
+            logger.warning("history {}: {}".format(group_id, ex))
+            return 0
+
+        new = [h for h in history if h.timestamp > timestamp or (
+            h.timestamp == timestamp and h.description not in seen)]
+        if not len(new):
+            return 0
+
+        latest = max(h.timestamp for h in new)
+        if latest == timestamp:
+            seen = seen.union(h.description for h in new)
+        else:
+            seen = frozenset(h.description for h in history
+                             if h.timestamp == latest)
+        with self._lock:
+            if group_id in self._cursors:
+                self._cursors[group_id] = (latest, seen)
+
+        changes = [h for h in new if h.activity in self.ACTIVITIES]
+        if not len(changes):
+            return 0
+
+        if self.cache is not None:
+            self.cache.set_many({
+                generation_key(cache_key("group", group_id)):
+                    new_generation(),
+                generation_key(cache_key("search")): new_generation()})
+        if self.on_change is not None:
+            self.on_change(group_id, changes)
+        return len(changes)
+
+    def start(self, interval=60):
+        """
+        Runs poll() every interval seconds in a daemon thread.
+        """
+        def run():
+            while not self._stopped.wait(interval):
+                try:
+                    self.poll()
+                except Exception as ex:
+                    logger.error("poll: {}".format(ex))
+
+        self._stopped.clear()
+        self._timer = threading.Thread(target=run, daemon=True)
+        self._timer.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
@@ -0,0 +1,197 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Load test harness that drives a GWS client at a target concurrency and
+reports latency percentiles per method.
+
+    python -m uw_gws.loadtest --concurrency 32 --requests 5000 \\
+        --latency 0.02 --jitter 0.01 --error-rate 0.01
+
+By default a FakeGWSServer is started and the client is pointed at it;
+pass --host to test against another server.
+"""
+
+from commonconf import override_settings
+from commonconf.backends import use_configparser_backend
+from restclients_core.dao import LiveDAO
+from uw_gws import GWS
+from uw_gws.fake_server import FakeGWSServer
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import math
+import random
+import threading
+import time
+
+DEFAULT_MIX = (
+    ("get_group_by_id", 3),
+    ("get_members", 2),
+    ("get_effective_members", 2),
+    ("get_effective_member_count", 1),
+    ("is_effective_member", 4),
+    ("search_groups", 1),
+)
+
+
+def percentile(values, pct):
+    """
+    Returns the nearest-rank percentile of a sorted list.
+    """
+    if not len(values):
+        return None
+    rank = int(math.ceil(pct / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+class LoadReport(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.elapsed = 0.0
+        self.transfer = None
+
+    def record(self, method, seconds, error=None):
+        with self._lock:
+            self.latencies.setdefault(method, []).append(seconds)
+            if error is not None:
+                self.errors[method] = self.errors.get(method, 0) + 1
+
+    @property
+    def total(self):
+        return sum(len(v) for v in self.latencies.values())
+
+    def json_data(self):
+        data = {}
+        for method, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            data[method] = {
+                "requests": len(values),
+                "errors": self.errors.get(method, 0),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return data
+
+    def __str__(self):
+        lines = ["{:28} {:>8} {:>7} {:>9} {:>9} {:>9} {:>9}".format(
+            "method", "requests", "errors", "p50 ms", "p95 ms", "p99 ms",
+            "max ms")]
+        for method, row in self.json_data().items():
+            lines.append(
+                "{:28} {:>8} {:>7} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                    method, row["requests"], row["errors"], row["p50_ms"],
+                    row["p95_ms"], row["p99_ms"], row["max_ms"]))
+        lines.append("{} requests in {:.1f}s, {:.1f} requests/s".format(
+            self.total, self.elapsed, self.total / max(self.elapsed, 1e-6)))
+        if self.transfer is not None:
+            lines.append(
+                "{wire_bytes} bytes on the wire, {decoded_bytes} decoded, "
+                "{decode_ms:.1f}ms decoding".format(**self.transfer))
+        return "\n".join(lines)
+
+
+def build_calls(group_ids, netids, mix=DEFAULT_MIX):
+    """
+    Returns a list of (method name, args) choices weighted by mix.
+    """
+    calls = []
+    for method, weight in mix:
+        if method == "is_effective_member":
+            choices = [(method, (g, n)) for g in group_ids for n in netids]
+        elif method == "search_groups":
+            choices = [(method, (n,)) for n in netids]
+        else:
+            choices = [(method, (g,)) for g in group_ids]
+        calls.extend(choices * weight)
+    return calls
+
+
+def run_load(gws, calls, concurrency=16, requests=1000, seed=None):
+    """
+    Makes requests calls, chosen at random from calls, with concurrency
+    worker threads.  Returns a LoadReport.
+    """
+    report = LoadReport()
+    rand = random.Random(seed)
+    plan = [rand.choice(calls) for i in range(requests)]
+
+    def call(item):
+        method, args = item
+        start = time.time()
+        try:
+            if method == "search_groups":
+                gws.search_groups(member=args[0])
+            else:
+                getattr(gws, method)(*args)
+            report.record(method, time.time() - start)
+        except Exception as ex:
+            report.record(method, time.time() - start, ex)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, plan))
+    report.elapsed = time.time() - start
+    return report
+
+
+def live_settings(host, pool_size, compression=None):
+    # Live connection pools are shared per service, drop any stale one
+    LiveDAO.pools.pop("gws", None)
+    return override_settings(RESTCLIENTS_GWS_DAO_CLASS="Live",
+                             RESTCLIENTS_GWS_HOST=host,
+                             RESTCLIENTS_GWS_POOL_SIZE=pool_size,
+                             RESTCLIENTS_GWS_COMPRESSION=compression)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GWS load test")
+    parser.add_argument("--config", help="settings file (configparser)")
+    parser.add_argument("--host", help="GWS host, default a fake server")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--groups", default="u_acadev_tester,"
+                        "u_acadev_unittest,course_2012aut-train102a")
+    parser.add_argument("--netids", default="javerage,eight,seven,nobody")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--compression", default=None,
+                        help="Accept-Encoding to negotiate, e.g. gzip")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        use_configparser_backend(args.config, "GWS")
+
+    server = None
+    host = args.host
+    if host is None:
+        server = FakeGWSServer(
+            latency=args.latency, jitter=args.jitter,
+            error_rate=args.error_rate, max_rps=args.max_rps).start()
+        host = server.url
+
+    try:
+        with live_settings(host, args.concurrency, args.compression):
+            calls = build_calls(args.groups.split(","),
+                                args.netids.split(","))
+            gws = GWS()
+            report = run_load(gws, calls, args.concurrency, args.requests,
+                              args.seed)
+            report.transfer = gws.transfer_stats.json_data()
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compact in-memory storage of the memberships of many groups.
+
+    store = MembershipStore()
+    store.crawl(gws, group_ids)
+    store.is_member("u_acadev_unittest", "javerage")
+    store.intersection("u_acadev_unittest", "u_acadev_tester").names()
+
+Members are interned to integers through a SymbolTable, which can be
+shared between stores, and each group is kept as a sorted array of member
+ids with a parallel array of (mtype, source) ids.  A member then costs
+8 bytes per group it is in, rather than a GroupMember object and its
+strings.  Sorted arrays are used rather than bitmaps so that small groups
+stay small however many members the table holds.
+"""
+
+from array import array
+from bisect import bisect_left
+import sys
+import threading
+
+
+class SymbolTable(object):
+    """
+    Interns hashable keys, tuples of strings here, to consecutive ints.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._keys = []
+
+    def intern(self, key):
+        id = self._ids.get(key)
+        if id is None:
+            key = tuple(sys.intern(k) if isinstance(k, str) else k
+                        for k in key)
+            with self._lock:
+                id = self._ids.get(key)
+                if id is None:
+                    id = len(self._keys)
+                    self._keys.append(key)
+                    self._ids[key] = id
+        return id
+
+    def get(self, key):
+        """
+        Returns the id of key, None if it hasn't been interned.
+        """
+        return self._ids.get(key)
+
+    def key(self, id):
+        return self._keys[id]
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class MemberSet(object):
+    """
+    An immutable set of (name, type) members, stored as a sorted array of
+    symbol ids.  Supports in, len, iteration, &, |, - and ==.
+    """
+    def __init__(self, ids, symbols):
+        """
+        :param ids: sorted array of distinct symbol ids
+        :param symbols: the SymbolTable the ids are from
+        """
+        self.ids = ids
+        self.symbols = symbols
+
+    def names(self, type="uwnetid"):
+        """
+        Returns the sorted names of the members of type, or of any type if
+        type is None.
+        """
+        return sorted(name for name, t in self if type is None or t == type)
+
+    def to_members(self):
+        """
+        Returns the members as a list of GroupMember objects.
+        """
+        from uw_gws.models import GroupMember
+        return [GroupMember(name=name, type=type) for name, type in self]
+
+    def __contains__(self, member):
+        """
+        :param member: a (name, type) tuple, or a uwnetid
+        """
+        if isinstance(member, str):
+            member = (member, "uwnetid")
+        return _contains(self.ids, self.symbols.get(member))
+
+    def __iter__(self):
+        key = self.symbols.key
+        return (key(id) for id in self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __eq__(self, other):
+        return (isinstance(other, MemberSet) and
+                self.symbols is other.symbols and self.ids == other.ids)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __and__(self, other):
+        small, large = sorted((self.ids, self._other_ids(other)), key=len)
+        return self._from(set(large).intersection(small))
+
+    def __or__(self, other):
+        return self._from(set(self.ids).union(self._other_ids(other)))
+
+    def __sub__(self, other):
+        return self._from(set(self.ids).difference(self._other_ids(other)))
+
+    def _other_ids(self, other):
+        if other.symbols is not self.symbols:
+            raise ValueError("Member sets use different symbol tables")
+        return other.ids
+
+    def _from(self, ids):
+        return MemberSet(array("I", sorted(ids)), self.symbols)
+
+
+class _Membership(object):
+    __slots__ = ("ids", "attrs")
+
+    def __init__(self, ids, attrs):
+        self.ids = ids
+        self.attrs = attrs
+
+
+class MembershipStore(object):
+    """
+    The memberships of many groups, interned through a SymbolTable.  Group
+    memberships are replaced whole, so reads don't wait on updates.
+    """
+    def __init__(self, symbols=None):
+        """
+        :param symbols: optional SymbolTable shared with other stores
+        """
+        self.symbols = SymbolTable() if symbols is None else symbols
+        self._groups = {}
+
+    def update(self, group_id, members):
+        """
+        Replaces the membership of a group from a list of GroupMember.
+        """
+        self._replace(group_id, (
+            (m.name, m.type, m.mtype, m.source) for m in members))
+
+    def update_json(self, group_id, data):
+        """
+        Replaces the membership of a group from the GWS JSON member list.
+        """
+        self._replace(group_id, (
+            (d.get("id"), d.get("type"), d.get("mtype"), d.get("source"))
+            for d in data))
+
+    def remove(self, group_id):
+        self._groups.pop(group_id, None)
+
+    def crawl(self, gws, group_ids, effective=True, max_workers=8):
+        """
+        Fetches the memberships of group_ids concurrently and stores them.
+        Returns a dict of the group ids that couldn't be fetched and their
+        exceptions.
+        """
+        from uw_gws.utilities import map_concurrent
+
+        fetch = gws.get_effective_members if effective else gws.get_members
+        errors = {}
+        for group_id, members, ex in map_concurrent(
+                fetch, group_ids, max_workers):
+            if ex is not None:
+                errors[group_id] = ex
+            else:
+                self.update(group_id, members)
+        return errors
+
+    def is_member(self, group_id, name, type="uwnetid"):
+        """
+        Returns True if the member is in the group.  Raises KeyError if the
+        group isn't in the store.
+        """
+        return _contains(self._groups[group_id].ids,
+                         self.symbols.get((name, type)))
+
+    def members(self, group_id):
+        """
+        Returns the members of the group as a list of GroupMember objects,
+        as returned by GWS.get_members or GWS.get_effective_members.
+        """
+        from uw_gws.models import GroupMember
+
+        membership = self._groups[group_id]
+        key = self.symbols.key
+        members = []
+        for id, attr in zip(membership.ids, membership.attrs):
+            name, type = key(id)
+            mtype, source = key(attr)
+            member = GroupMember(name=name, type=type)
+            if mtype:
+                member.mtype = mtype
+            if source:
+                member.source = source
+            members.append(member)
+        return members
+
+    def member_set(self, group_id):
+        return MemberSet(self._groups[group_id].ids, self.symbols)
+
+    def union(self, *group_ids):
+        return self._combine(group_ids, MemberSet.__or__)
+
+    def intersection(self, *group_ids):
+        return self._combine(group_ids, MemberSet.__and__)
+
+    def difference(self, group_id, *group_ids):
+        """
+        Returns the members of group_id that are in none of group_ids.
+        """
+        result = self.member_set(group_id)
+        for other in group_ids:
+            result = result - self.member_set(other)
+        return result
+
+    def groups_for(self, name, type="uwnetid"):
+        """
+        Returns the sorted ids of the stored groups the member is in.
+        """
+        id = self.symbols.get((name, type))
+        return sorted(group_id for group_id, membership in list(
+            self._groups.items()) if _contains(membership.ids, id))
+
+    def group_ids(self):
+        return sorted(self._groups)
+
+    def nbytes(self):
+        """
+        Returns the bytes used by the member arrays, not counting the
+        symbol table.
+        """
+        return sum(sys.getsizeof(m.ids) + sys.getsizeof(m.attrs)
+                   for m in list(self._groups.values()))
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __contains__(self, group_id):
+        return group_id in self._groups
+
+    def _combine(self, group_ids, op):
+        result = self.member_set(group_ids[0])
+        for group_id in group_ids[1:]:
+            result = op(result, self.member_set(group_id))
+        return result
+
+    def _replace(self, group_id, members):
+        intern = self.symbols.intern
+        pairs = {}
+        for name, type, mtype, source in members:
+            id = intern((name, type))
+            if id not in pairs:
+                pairs[id] = intern((mtype, source))
+        ids = sorted(pairs)
+        self._groups[sys.intern(group_id)] = _Membership(
+            array("I", ids), array("I", (pairs[id] for id in ids)))
+
+
+def _contains(ids, id):
+    if id is None:
+        return False
+    i = bisect_left(ids, id)
+    return i < len(ids) and ids[i] == id
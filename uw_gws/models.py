@@ -126,8 +126,8 @@ class CourseGroup(Group):
         super(CourseGroup, self).__init__(*args, **kwargs)
         self.instructors = []
 
-    def json_data(self):
-        data = super(CourseGroup, self).json_data()
+    def json_data(self, is_put_req=False):
+        data = super(CourseGroup, self).json_data(is_put_req=is_put_req)
         data["course"] = {
             "quarter": self.quarter[:3],
             "year": int(self.year),
@@ -135,7 +135,8 @@ class CourseGroup(Group):
             "number": int(self.course_number),
             "section": self.section_id.lower(),
             "sln": self.sln,
-            "instructors": [i.json_data() for i in self.instructors],
+            "instructors": [i.json_data(is_put_req=is_put_req)
+                            for i in self.instructors],
         }
         return data
 
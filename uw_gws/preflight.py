@@ -0,0 +1,208 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Pre-flight checks of the group ids and member identifiers of a bulk job,
+so that a run with bad input fails before any write is sent rather than
+at its first InvalidGroupID.
+
+    report = gws.preflight(group_ids, members={"u_myapp_staff": netids},
+                           check_exists=True)
+    report.raise_for_problems()
+
+Identifiers are checked locally, in one pass, against the patterns for
+their member type.  With check_exists, group ids and group members are
+also looked up, concurrently and once each, through the client's cache,
+except the groups of the batch itself.  GWS has no lookup for netids,
+ePPNs or hostnames, so those are only checked locally.
+"""
+
+from uw_gws import GWS
+from uw_gws.exceptions import PreflightFailed
+import re
+
+RE_UWNETID = re.compile(r'^[a-z][a-z0-9_\.-]{0,127}$', re.I)
+RE_EPPN = re.compile(
+    r'^[^@\s,/]+@([a-z0-9]([a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,}$', re.I)
+RE_DNS = re.compile(
+    r'^(\*\.)?([a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$', re.I)
+# Set and UWWI names aren't checked beyond being usable in a member URL
+RE_NAME = re.compile(r'^[^\s,/]+$')
+
+MEMBER_PATTERNS = {
+    "uwnetid": RE_UWNETID,
+    "eppn": RE_EPPN,
+    "group": GWS.RE_GROUP_ID,
+    "dns": RE_DNS,
+    "set": RE_NAME,
+    "uwwi": RE_NAME,
+}
+
+
+class Problem(object):
+    """
+    A group id or member identifier that failed a check.
+    """
+    INVALID = "invalid"
+    NOT_FOUND = "not found"
+    UNCHECKED = "unchecked"
+
+    def __init__(self, kind, name, type, group_id=None, reason=None):
+        """
+        :param type: "group" for group ids, otherwise the member type
+        :param group_id: the group the member was to be written to, None
+            for group ids
+        """
+        self.kind = kind
+        self.name = name
+        self.type = type
+        self.group_id = group_id
+        self.reason = reason
+
+    def json_data(self):
+        return {"kind": self.kind, "name": self.name, "type": self.type,
+                "group_id": self.group_id, "reason": self.reason}
+
+    def __str__(self):
+        where = " in {}".format(self.group_id) if self.group_id else ""
+        reason = ": {}".format(self.reason) if self.reason else ""
+        return "{} {} {}{}{}".format(self.kind, self.type, self.name, where,
+                                     reason)
+
+
+class PreflightReport(object):
+    """
+    The problems found in a batch, and the number of group ids, members
+    and lookups checked.  Invalid identifiers are in input order, followed
+    by the lookup results.
+    """
+    def __init__(self):
+        self.problems = []
+        self.group_ids = 0
+        self.members = 0
+        self.lookups = 0
+
+    @property
+    def ok(self):
+        return not len(self.problems)
+
+    def counts(self):
+        counts = {}
+        for problem in self.problems:
+            counts[problem.kind] = counts.get(problem.kind, 0) + 1
+        return counts
+
+    def invalid_group_ids(self):
+        """
+        Returns the invalid group ids, in input order.
+        """
+        return list(dict.fromkeys(
+            p.name for p in self.problems if p.type == "group" and
+            p.kind == Problem.INVALID and p.group_id is None))
+
+    def summary(self):
+        """
+        Returns the report as text, a count line then one line per problem.
+        """
+        lines = ["{} group ids, {} members, {} lookups: {}".format(
+            self.group_ids, self.members, self.lookups, ", ".join(
+                "{} {}".format(n, kind) for kind, n in sorted(
+                    self.counts().items())) or "ok")]
+        lines.extend(str(p) for p in self.problems)
+        return "\n".join(lines)
+
+    def json_data(self):
+        return {"group_ids": self.group_ids, "members": self.members,
+                "lookups": self.lookups,
+                "problems": [p.json_data() for p in self.problems]}
+
+    def raise_for_problems(self):
+        """
+        Raises PreflightFailed if any check failed.
+        """
+        if not self.ok:
+            raise PreflightFailed(self)
+
+
+def _member_key(member):
+    # Members as passed to add_members, update_members or in exports, None
+    # for anything else
+    if isinstance(member, str):
+        return (member, "uwnetid")
+    if isinstance(member, dict):
+        return (member.get("id"), member.get("type"))
+    if isinstance(member, tuple):
+        return member if len(member) == 2 else None
+    if hasattr(member, "name") and hasattr(member, "type"):
+        return (member.name, member.type)
+    return None
+
+
+def preflight(gws, group_ids=(), members=None, check_exists=False,
+              max_workers=8):
+    """
+    Checks a batch and returns a PreflightReport.
+
+    :param group_ids: ids of groups that must exist
+    :param members: optional dict of group id to its members, as uwnetids,
+        (name, type) tuples, GroupMember objects or member JSON.  These
+        group ids are checked locally, as they may be created by the job,
+        and group members with these ids are taken to exist.
+    :param check_exists: look up group_ids and group type members
+    """
+    from uw_gws.utilities import map_concurrent
+
+    report = PreflightReport()
+    match_group = GWS.RE_GROUP_ID.match
+    lookups = {}
+
+    def check_group_id(group_id, lookup):
+        report.group_ids += 1
+        if not isinstance(group_id, str) or not match_group(group_id):
+            report.problems.append(Problem(Problem.INVALID, group_id,
+                                           "group"))
+        elif lookup:
+            lookups.setdefault(group_id, []).append(None)
+
+    for group_id in group_ids:
+        check_group_id(group_id, check_exists)
+
+    members = members or {}
+    for group_id, group_members in members.items():
+        check_group_id(group_id, False)
+        for member in group_members:
+            report.members += 1
+            key = _member_key(member)
+            if key is None:
+                report.problems.append(Problem(
+                    Problem.INVALID, repr(member), "member", group_id,
+                    "not a member identifier"))
+                continue
+            name, type = key
+            pattern = MEMBER_PATTERNS.get(type)
+            if pattern is None:
+                report.problems.append(Problem(
+                    Problem.INVALID, name, type, group_id,
+                    "unknown member type"))
+            elif not isinstance(name, str) or not pattern.match(name):
+                report.problems.append(Problem(Problem.INVALID, name, type,
+                                               group_id))
+            elif check_exists and type == "group" and name not in members:
+                lookups.setdefault(name, []).append(group_id)
+
+    report.lookups = len(lookups)
+    found = []
+    for name, exists, ex in map_concurrent(
+            gws.group_exists, list(lookups), max_workers):
+        if ex is not None:
+            kind, reason = Problem.UNCHECKED, str(ex)
+        elif not exists:
+            kind, reason = Problem.NOT_FOUND, None
+        else:
+            continue
+        for group_id in lookups[name]:
+            found.append(Problem(kind, name, "group", group_id, reason))
+    report.problems.extend(sorted(
+        found, key=lambda p: (p.name, p.group_id or "")))
+    return report
@@ -0,0 +1,268 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Reconciles groups in GWS with a declared desired state.
+
+    reconciler = Reconciler(GWS(), stem="u_myapp", max_writes=4)
+    plan = reconciler.plan(groups, members={"u_myapp_staff": ["javerage"]})
+    print(plan.diff())
+    errors = reconciler.apply(plan)
+"""
+
+from restclients_core.exceptions import DataFailureException
+from uw_gws import uncached
+from uw_gws.deadline import check_deadline
+from uw_gws.models import GroupEntity, GroupMember
+from uw_gws.utilities import map_concurrent
+import json
+
+
+class Operation(object):
+    """
+    A single planned change to a group.
+    """
+    CREATE = "create"
+    UPDATE = "update"
+    MEMBERS = "members"
+    DELETE = "delete"
+
+    def __init__(self, action, group_id, group=None, changes=None, add=None,
+                 remove=None, members=None):
+        """
+        :param group: the desired Group, for creates and updates
+        :param changes: the names of the group fields that differ
+        :param add: member (name, type) keys to add
+        :param remove: member (name, type) keys to remove
+        :param members: the desired GroupMember list, for member changes
+        """
+        self.action = action
+        self.group_id = group_id
+        self.group = group
+        self.changes = changes or []
+        self.add = sorted(add or [])
+        self.remove = sorted(remove or [])
+        self.members = members
+
+    def json_data(self):
+        data = {"action": self.action, "id": self.group_id}
+        if self.action == self.UPDATE:
+            data["changes"] = self.changes
+        elif self.action == self.MEMBERS:
+            data["add"] = [name for name, type in self.add]
+            data["remove"] = [name for name, type in self.remove]
+        return data
+
+    def __str__(self):
+        if self.action == self.CREATE:
+            return "+ {}".format(self.group_id)
+        if self.action == self.DELETE:
+            return "- {}".format(self.group_id)
+        if self.action == self.UPDATE:
+            return "~ {}: {}".format(self.group_id, ", ".join(self.changes))
+        return "~ {} members: {}".format(self.group_id, " ".join(
+            ["+" + name for name, type in self.add] +
+            ["-" + name for name, type in self.remove]))
+
+
+class Plan(object):
+    """
+    The operations needed to reach the desired state, in the order they are
+    applied for each group.
+    """
+    def __init__(self, operations=None):
+        self.operations = operations or []
+
+    def by_group(self):
+        groups = {}
+        for operation in self.operations:
+            groups.setdefault(operation.group_id, []).append(operation)
+        return groups
+
+    def counts(self):
+        counts = {}
+        for operation in self.operations:
+            counts[operation.action] = counts.get(operation.action, 0) + 1
+        return counts
+
+    def diff(self):
+        """
+        Returns the plan as text, one line per operation, for dry runs.
+        """
+        return "\n".join(str(op) for op in self.operations)
+
+    def json_data(self):
+        return [op.json_data() for op in self.operations]
+
+    def __iter__(self):
+        return iter(self.operations)
+
+    def __len__(self):
+        return len(self.operations)
+
+
+def _member_key(member):
+    if isinstance(member, GroupEntity):
+        return (member.name, member.type)
+    return (member, GroupEntity.UWNETID_TYPE)
+
+
+class Reconciler(object):
+    """
+    Plans and applies the changes that bring GWS groups and their direct
+    memberships to a desired state.  Current state is fetched concurrently,
+    from GWS rather than the client's cache, and each group's changes are
+    made with the fewest API calls.
+    """
+    # Member deltas larger than this are written with one update_members
+    # call rather than in the request path of add_members/delete_members,
+    # which also can't carry member types other than uwnetid
+    MAX_PATH_MEMBERS = 50
+
+    def __init__(self, gws, stem=None, max_workers=8, max_writes=4):
+        """
+        :param gws: the GWS client, whose act_as user makes the changes
+        :param stem: if set, groups under the stem that are not desired
+            are deleted
+        :param max_workers: concurrent requests while fetching state
+        :param max_writes: concurrent groups being written
+        """
+        self.gws = gws
+        self.stem = stem
+        self.max_workers = max_workers
+        self.max_writes = max_writes
+
+    def plan(self, groups, members=None):
+        """
+        Returns a Plan for the desired groups.
+
+        :param groups: the desired Group objects
+        :param members: optional dict of group id to the desired direct
+            members, GroupMember objects or uwnetids.  Groups not in the
+            dict keep their current members.
+        """
+        members = members or {}
+        desired = dict((group.name, group) for group in groups)
+
+        def fetch(group_id):
+            return self._current(group_id, group_id in members)
+
+        operations = []
+        with uncached():
+            for group_id, current, ex in map_concurrent(
+                    fetch, list(desired), self.max_workers):
+                if ex is not None:
+                    raise ex
+                operations.extend(self._group_operations(
+                    desired[group_id], current, members.get(group_id)))
+
+            if self.stem is not None:
+                for ref in self.gws.search_groups(stem=self.stem,
+                                                  scope="all"):
+                    if ref.name != self.stem and ref.name not in desired:
+                        operations.append(Operation(Operation.DELETE,
+                                                    ref.name))
+
+        # Keep the plan in a stable order for diffs
+        operations.sort(key=lambda op: op.group_id)
+        return Plan(operations)
+
+    def apply(self, plan):
+        """
+        Applies the plan, writing up to max_writes groups at once.  Returns
+        a dict of the group ids that failed and their exceptions.
+
+        GWS needs a group's parent stem to exist, so groups are written one
+        level of the hierarchy at a time: creates and updates from the top
+        down, then deletes from the bottom up.
+        """
+        errors = {}
+        groups = plan.by_group()
+        for level in self._levels(groups):
+            for group_id, result, ex in map_concurrent(
+                    lambda group_id: self._apply_group(groups[group_id]),
+                    level, self.max_writes):
+                if ex is not None:
+                    errors[group_id] = ex
+        return errors
+
+    def _levels(self, groups):
+        # Lists of group ids written together, in order
+        writes = {}
+        deletes = {}
+        for group_id, operations in groups.items():
+            levels = deletes if any(
+                op.action == Operation.DELETE for op in operations) else writes
+            levels.setdefault(group_id.count("_"), []).append(group_id)
+        return ([writes[depth] for depth in sorted(writes)] +
+                [deletes[depth] for depth in sorted(deletes, reverse=True)])
+
+    def _current(self, group_id, with_members):
+        try:
+            group = self.gws.get_group_by_id(group_id)
+        except DataFailureException as ex:
+            if ex.status != 404:
+                raise
+            return None, []
+
+        current = self.gws.get_members(group_id) if with_members else []
+        return group, current
+
+    def _group_operations(self, group, current, members):
+        current_group, current_members = current
+        operations = []
+        if current_group is None:
+            operations.append(Operation(Operation.CREATE, group.name, group))
+        else:
+            wanted = self.gws.group_fields(group.json_data(is_put_req=True))
+            found = self.gws.group_fields(
+                current_group.json_data(is_put_req=True))
+            changes = sorted(k for k in set(wanted) | set(found)
+                             if json.dumps(wanted.get(k), sort_keys=True) !=
+                             json.dumps(found.get(k), sort_keys=True))
+            if len(changes):
+                operations.append(Operation(
+                    Operation.UPDATE, group.name, group, changes))
+
+        if members is not None:
+            keys = set(_member_key(m) for m in members)
+            current_keys = set(_member_key(m) for m in current_members)
+            if keys != current_keys:
+                operations.append(Operation(
+                    Operation.MEMBERS, group.name, add=keys - current_keys,
+                    remove=current_keys - keys,
+                    members=[GroupMember(name=name, type=type)
+                             for name, type in sorted(keys)]))
+        return operations
+
+    def _apply_group(self, operations):
+        for operation in operations:
+            # A group's later operations aren't started after the deadline
+            check_deadline(operation.group_id)
+            if operation.action == Operation.CREATE:
+                self.gws.create_group(operation.group)
+            elif operation.action == Operation.UPDATE:
+                self.gws.update_group(operation.group)
+            elif operation.action == Operation.DELETE:
+                self.gws.delete_group(operation.group_id)
+            else:
+                self._apply_members(operation)
+
+    def _apply_members(self, operation):
+        add = [name for name, type in operation.add]
+        remove = [name for name, type in operation.remove]
+        path_members = len(add) + len(remove) <= self.MAX_PATH_MEMBERS and (
+            all(type == GroupEntity.UWNETID_TYPE
+                for name, type in operation.add + operation.remove))
+        if len(add) and len(remove) or not path_members:
+            not_found = self.gws.update_members(
+                operation.group_id, operation.members)
+            if len(not_found):
+                raise DataFailureException(
+                    operation.group_id, 404,
+                    "members not found: {}".format(", ".join(not_found)))
+        elif len(add):
+            self.gws.add_members(operation.group_id, add)
+        else:
+            self.gws.delete_members(operation.group_id, remove)
@@ -0,0 +1,338 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Stale-while-revalidate serving of group documents and effective members.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from uw_gws import acting_as, uncached
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# The Refresher making the current fetch, so that a client serving through
+# it makes the request
+_fetching = ContextVar("uw_gws_refresher_fetching", default=None)
+
+
+class _Entry(object):
+    def __init__(self, value, fetched):
+        self.value = value
+        self.fetched = fetched
+        self.score = 0.0
+        self.last_access = fetched
+        self.refreshing = False
+
+
+class _Fetch(object):
+    """
+    A request for a key, shared by the misses made while it runs.  Its
+    result is stored only if it is still the key's current fetch:
+    invalidate() replaces it, as does a later fetch.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Refresher(object):
+    """
+    Serves get_group_by_id and get_effective_members results from memory.
+
+    Access frequency is tracked per group.  Hot groups are re-fetched in
+    the background before their ttl expires, and an expired entry is served
+    immediately while a background refresh runs.  Entries older than
+    max_stale are never served; they are fetched on the request path.
+
+    Entries are kept per act_as user.  Concurrent misses for an entry
+    make one request, and a fetch running when the group is invalidated
+    doesn't store its result.
+
+    Returned objects are shared between callers and must not be modified.
+    If a uw_gws.membership.MembershipStore is passed, effective member
+    lists are kept interned in it instead, and are built for each call.
+    GWS.start_refresher() serves a client's reads through a Refresher.
+    """
+    METHODS = ("get_group_by_id", "get_effective_members")
+
+    def __init__(self, gws, ttl=300, max_stale=3600, refresh_ahead=0.75,
+                 hot_threshold=3, half_life=300, max_concurrent=4,
+                 max_per_minute=60, max_entries=10000, store=None):
+        """
+        :param gws: the GWS client used for fetches
+        :param ttl: seconds an entry is considered fresh
+        :param max_stale: seconds after which an entry is no longer served
+        :param refresh_ahead: fraction of ttl after which hot entries are
+            refreshed
+        :param hot_threshold: decayed access count at which a group is hot
+        :param half_life: seconds for the access count to decay by half
+        :param max_concurrent: limit on concurrent background refreshes
+        :param max_per_minute: limit on background refreshes per minute
+        :param max_entries: entries kept before the coldest are dropped
+        :param store: optional MembershipStore for effective members.  The
+            store is keyed by group id alone, so it holds the members read
+            as the client's own act_as, and members read for another
+            act_as user are kept in their entries.
+        """
+        self.gws = gws
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_ahead = refresh_ahead
+        self.hot_threshold = hot_threshold
+        self.half_life = half_life
+        self.max_concurrent = max_concurrent
+        self.max_per_minute = max_per_minute
+        self.max_entries = max_entries
+        self.store = store
+
+        self._entries = {}
+        # key: _Fetch in progress
+        self._fetches = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent)
+        self._futures = set()
+        self._tokens = float(max_per_minute)
+        self._tokens_updated = time.time()
+        self._timer = None
+        self._stopped = threading.Event()
+        self.stats = dict((name, 0) for name in (
+            "hits", "stale_hits", "misses", "shared_misses", "refreshes",
+            "refresh_errors", "throttled"))
+
+    @property
+    def fetching(self):
+        """
+        True in the fetches made by this refresher.
+        """
+        return _fetching.get() is self
+
+    def get_group_by_id(self, group_id, act_as=None):
+        return self.get("get_group_by_id", group_id, act_as)
+
+    def get_effective_members(self, group_id, act_as=None):
+        return self.get("get_effective_members", group_id, act_as)
+
+    def get(self, method, group_id, act_as=None):
+        """
+        :param act_as: the user to fetch as, by default the client's act_as
+        """
+        if method not in self.METHODS:
+            raise ValueError("Unsupported method: {}".format(method))
+
+        if act_as is None:
+            act_as = self.gws.act_as
+        key = (method, group_id, act_as)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._record_access(entry, now)
+                age = now - entry.fetched
+                if age < self.ttl:
+                    self.stats["hits"] += 1
+                    if (self._is_hot(entry) and
+                            age >= self.ttl * self.refresh_ahead):
+                        self._schedule(key, entry, now)
+                    return self._value(key, entry)
+                if age < self.max_stale:
+                    self.stats["stale_hits"] += 1
+                    self._schedule(key, entry, now)
+                    return self._value(key, entry)
+            self.stats["misses"] += 1
+            fetch = self._fetches.get(key)
+            if fetch is None:
+                fetch = self._fetches[key] = _Fetch()
+                shared = False
+            else:
+                self.stats["shared_misses"] += 1
+                shared = True
+
+        if not shared:
+            try:
+                fetch.value = self._fetch(key)
+            except Exception as ex:
+                fetch.error = ex
+            self._finish(key, fetch)
+        fetch.done.wait()
+        if fetch.error is not None:
+            raise fetch.error
+        return fetch.value
+
+    def refresh_due(self):
+        """
+        Schedules a refresh of every hot entry that is due, returns the
+        number scheduled.
+        """
+        now = time.time()
+        scheduled = 0
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if (self._is_hot(entry, now) and now - entry.fetched >=
+                        self.ttl * self.refresh_ahead):
+                    scheduled += int(self._schedule(key, entry, now))
+        return scheduled
+
+    def start(self, interval=30):
+        """
+        Runs refresh_due() every interval seconds in a daemon thread.
+        """
+        def run():
+            while not self._stopped.wait(interval):
+                try:
+                    self.refresh_due()
+                except Exception as ex:
+                    logger.error("refresh_due: {}".format(ex))
+
+        self._stopped.clear()
+        self._timer = threading.Thread(target=run, daemon=True)
+        self._timer.start()
+
+    def stop(self, wait_for_refreshes=True):
+        if getattr(self.gws, "refresher", None) is self:
+            self.gws.refresher = None
+        self._stopped.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self._executor.shutdown(wait=wait_for_refreshes)
+
+    def wait(self, timeout=None):
+        """
+        Waits for the background refreshes in progress.
+        """
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+    def invalidate(self, group_id):
+        """
+        Drops the entries of the group for every act_as user.  Fetches of
+        them in progress are not stored.
+        """
+        with self._lock:
+            for key in [k for k in set(self._entries) | set(self._fetches)
+                        if k[1] == group_id]:
+                self._fetches.pop(key, None)
+                self._discard(key)
+
+    def _record_access(self, entry, now):
+        entry.score = self._decayed_score(entry, now) + 1
+        entry.last_access = now
+
+    def _decayed_score(self, entry, now):
+        return entry.score * 0.5 ** (
+            (now - entry.last_access) / float(self.half_life))
+
+    def _is_hot(self, entry, now=None):
+        score = entry.score if now is None else self._decayed_score(
+            entry, now)
+        return score >= self.hot_threshold
+
+    def _schedule(self, key, entry, now):
+        # Called with the lock held
+        if (entry.refreshing or key in self._fetches or
+                len(self._futures) >= self.max_concurrent):
+            return False
+
+        self._tokens = min(
+            float(self.max_per_minute),
+            self._tokens + (now - self._tokens_updated) *
+            self.max_per_minute / 60.0)
+        self._tokens_updated = now
+        if self._tokens < 1:
+            self.stats["throttled"] += 1
+            return False
+
+        self._tokens -= 1
+        entry.refreshing = True
+        fetch = self._fetches[key] = _Fetch()
+        future = self._executor.submit(self._refresh, key, fetch)
+        self._futures.add(future)
+        future.add_done_callback(self._done)
+        return True
+
+    def _done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _refresh(self, key, fetch):
+        try:
+            fetch.value = self._fetch(key)
+        except Exception as ex:
+            logger.warning("refresh {} {}: {}".format(key[0], key[1], ex))
+            fetch.error = ex
+        with self._lock:
+            if fetch.error is None:
+                self.stats["refreshes"] += 1
+            else:
+                self.stats["refresh_errors"] += 1
+        self._finish(key, fetch)
+
+    def _fetch(self, key):
+        method, group_id, act_as = key
+        token = _fetching.set(self)
+        try:
+            # Refreshes read from GWS, not from the client's cache
+            with acting_as(act_as), uncached():
+                return getattr(self.gws, method)(group_id)
+        finally:
+            _fetching.reset(token)
+
+    def _finish(self, key, fetch):
+        # Stores the result if the fetch is still current for the key
+        with self._lock:
+            if self._fetches.get(key) is fetch:
+                del self._fetches[key]
+                if fetch.error is None:
+                    self._store(key, fetch.value, time.time())
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refreshing = False
+        fetch.done.set()
+
+    def _value(self, key, entry):
+        if self._in_store(key):
+            return self.store.members(key[1])
+        return entry.value
+
+    def _in_store(self, key):
+        return (self.store is not None and
+                key[0] == "get_effective_members" and
+                key[2] == self.gws.act_as)
+
+    def _discard(self, key):
+        # Called with the lock held
+        if self._entries.pop(key, None) is not None and self._in_store(key):
+            self.store.remove(key[1])
+
+    def _store(self, key, value, now):
+        # Called with the lock held
+        entry = self._entries.get(key)
+        if entry is None and len(self._entries) >= self.max_entries:
+            self._evict(now)
+
+        if self._in_store(key):
+            self.store.update(key[1], value)
+            value = None
+
+        if entry is None:
+            entry = _Entry(value, now)
+            entry.score = 1
+            self._entries[key] = entry
+        else:
+            entry.value = value
+            entry.fetched = now
+
+    def _evict(self, now):
+        # Drop the coldest tenth of the entries
+        ranked = sorted(self._entries.items(),
+                        key=lambda item: self._decayed_score(item[1], now))
+        for key, entry in ranked[:max(1, len(ranked) // 10)]:
+            if not entry.refreshing:
+                self._discard(key)
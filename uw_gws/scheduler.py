@@ -0,0 +1,158 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Priority scheduling of GWS requests that share a connection pool.
+
+    scheduler = RequestScheduler(max_concurrent=10)
+    gws = GWS(scheduler=scheduler)
+
+    with priority(BULK):
+        export(gws)
+
+Membership checks run as INTERACTIVE and other requests as DEFAULT, unless
+a priority() block says otherwise.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from uw_gws.deadline import remaining
+from uw_gws.exceptions import DeadlineExceeded
+import threading
+import time
+
+INTERACTIVE = "interactive"
+DEFAULT = "default"
+BULK = "bulk"
+CLASSES = (INTERACTIVE, DEFAULT, BULK)
+DEFAULT_SHARES = {INTERACTIVE: 0.5, DEFAULT: 0.3, BULK: 0.2}
+
+_priority = ContextVar("uw_gws_priority", default=None)
+
+
+@contextmanager
+def priority(name):
+    """
+    Runs the GWS requests made in the block, and by batch operations
+    started in it, in the named priority class.
+    """
+    if name not in CLASSES:
+        raise ValueError("Unknown priority class: {}".format(name))
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default=DEFAULT):
+    return _priority.get() or default
+
+
+class RequestScheduler(object):
+    """
+    Admits requests up to max_concurrent at once, each priority class with
+    its own FIFO queue and share of the slots.  Idle slots can be used by
+    any class.  When the pool is saturated, a freed slot goes first to a
+    waiting class below its share, then to the highest priority class
+    waiting, so lower priority work gives way as its requests complete.
+    In-flight requests are never interrupted.
+    """
+    def __init__(self, max_concurrent=10, shares=None, limits=None):
+        """
+        :param max_concurrent: requests in flight, usually the pool size
+        :param shares: dict of class name to the fraction of slots it is
+            guaranteed, default DEFAULT_SHARES
+        :param limits: optional dict of class name to the most requests
+            it may have in flight, to keep slots free for other classes
+        """
+        shares = shares or DEFAULT_SHARES
+        limits = limits or {}
+        self.max_concurrent = max_concurrent
+        self.reserved = dict((c, int(shares.get(c, 0) * max_concurrent))
+                             for c in CLASSES)
+        self.limits = dict((c, limits.get(c, max_concurrent))
+                           for c in CLASSES)
+        self._cond = threading.Condition()
+        self._tickets = count()
+        self._queues = dict((c, []) for c in CLASSES)
+        self._running = dict((c, 0) for c in CLASSES)
+        self._stats = dict((c, {"requests": 0, "wait_time": 0.0,
+                                "max_wait": 0.0}) for c in CLASSES)
+
+    @contextmanager
+    def slot(self, default=DEFAULT):
+        """
+        Holds a request slot for the block, in the current priority class.
+        Raises DeadlineExceeded if the deadline passes while queued.
+        """
+        name = current_priority(default)
+        self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def acquire(self, name):
+        start = time.monotonic()
+        with self._cond:
+            ticket = next(self._tickets)
+            queue = self._queues[name]
+            queue.append(ticket)
+            try:
+                while not self._can_start(name, ticket):
+                    left = remaining()
+                    if left == 0.0:
+                        raise DeadlineExceeded()
+                    self._cond.wait(left)
+            finally:
+                queue.remove(ticket)
+                # The next in line may be able to start as well
+                self._cond.notify_all()
+
+            self._running[name] += 1
+            waited = time.monotonic() - start
+            stats = self._stats[name]
+            stats["requests"] += 1
+            stats["wait_time"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def release(self, name):
+        with self._cond:
+            self._running[name] -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Returns a dict of class name to its queue depth, requests running,
+        requests admitted and wait times.
+        """
+        with self._cond:
+            data = {}
+            for name in CLASSES:
+                stats = self._stats[name]
+                data[name] = {
+                    "queued": len(self._queues[name]),
+                    "running": self._running[name],
+                    "reserved": self.reserved[name],
+                    "requests": stats["requests"],
+                    "avg_wait_ms": (stats["wait_time"] / stats["requests"]
+                                    * 1000) if stats["requests"] else 0.0,
+                    "max_wait_ms": stats["max_wait"] * 1000,
+                }
+            return data
+
+    def _can_start(self, name, ticket):
+        if (self._queues[name][0] != ticket or
+                sum(self._running.values()) >= self.max_concurrent):
+            return False
+        waiting = [c for c in CLASSES if len(self._queues[c]) and (
+            self._running[c] < self.limits[c])]
+        return name in waiting and min(waiting, key=self._rank) == name
+
+    def _rank(self, name):
+        # Classes below their share first, then by priority
+        return (self._running[name] >= self.reserved[name],
+                CLASSES.index(name))
@@ -0,0 +1,13 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from uw_gws.models import GroupHistory
+
+
+def history(description, timestamp, activity="membership"):
+    """
+    Returns a GroupHistory change, at timestamp in epoch milliseconds.
+    """
+    return GroupHistory(data={"activity": activity,
+                              "description": description,
+                              "timestamp": timestamp})
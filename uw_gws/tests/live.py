@@ -0,0 +1,32 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from restclients_core.dao import LiveDAO
+from uw_gws.fake_server import FakeGWSServer
+from uw_gws.loadtest import live_settings
+
+
+class LiveGWSTestCase(TestCase):
+    """
+    Runs each test against its own FakeGWSServer through the live DAO.
+    """
+    server_options = {}
+    pool_size = 4
+
+    def setUp(self):
+        self.server = FakeGWSServer(**self.server_options).start()
+        self.addCleanup(self.close_pool)
+        self.addCleanup(self.server.stop)
+        settings = self.live_settings()
+        settings.__enter__()
+        self.addCleanup(settings.__exit__, None, None, None)
+
+    def live_settings(self, compression=None):
+        return live_settings(self.server.url, self.pool_size, compression)
+
+    def close_pool(self):
+        # Closes the pool's connections to this test's server
+        pool = LiveDAO.pools.pop("gws", None)
+        if pool is not None:
+            pool.close()
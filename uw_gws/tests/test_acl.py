@@ -0,0 +1,107 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.acl import AclIndex
+from uw_gws.models import Group, GroupEntity
+from uw_gws.utilities import fdao_gws_override
+import json
+import os
+import tempfile
+
+
+def entity(name, type=GroupEntity.UWNETID_TYPE):
+    return GroupEntity(name=name, type=type)
+
+
+@fdao_gws_override
+class AclIndexTest(TestCase):
+    def test_crawl(self):
+        gws = GWS()
+        index = AclIndex()
+        errors = index.crawl(gws, group_ids=[
+            "u_acadev_tester", "course_2012aut-train102a", "u_nonexistent"])
+        self.assertEqual(list(errors.keys()), ["u_nonexistent"])
+        self.assertEqual(len(index), 2)
+        self.assertIn("u_acadev_tester", index)
+
+        group = gws.get_group_by_id("u_acadev_tester")
+        for admin in group.admins:
+            self.assertIn("admins", index.lookup(admin.name, admin.type)[
+                "u_acadev_tester"])
+        self.assertEqual(
+            index.entities("u_acadev_tester"),
+            AclIndex.from_groups([group]).entities("u_acadev_tester"))
+
+        course = gws.get_group_by_id("course_2012aut-train102a")
+        instructor = course.instructors[0]
+        self.assertEqual(
+            index.groups_for(instructor.name, role="instructors"),
+            ["course_2012aut-train102a"])
+
+        # Groups are listed by group_ids or a stem search
+        self.assertRaises(ValueError, index.crawl, gws)
+
+    def test_lookup(self):
+        one = Group(name="u_test_one")
+        one.admins = [entity("javerage")]
+        one.readers = [entity("javerage"), entity("u_test_readers", "group")]
+        two = Group(name="u_test_two")
+        two.updaters = [entity("javerage"), entity("bill")]
+
+        index = AclIndex.from_groups([one, two])
+        self.assertEqual(index.lookup("javerage"), {
+            "u_test_one": ["admins", "readers"],
+            "u_test_two": ["updaters"]})
+        self.assertEqual(index.lookup("javerage", "group"), {})
+        self.assertEqual(index.groups_for("javerage", role="admins"),
+                         ["u_test_one"])
+        self.assertEqual(index.groups_for("u_test_readers", "group"),
+                         ["u_test_one"])
+        self.assertEqual(index.lookup("nobody"), {})
+
+        # A fresh fetch replaces the group's references
+        one.admins = [entity("bill")]
+        one.readers = []
+        index.update(one)
+        self.assertEqual(index.lookup("javerage"), {
+            "u_test_two": ["updaters"]})
+        self.assertEqual(index.groups_for("bill"),
+                         ["u_test_one", "u_test_two"])
+        self.assertEqual(index.lookup("u_test_readers"), {})
+
+        index.remove("u_test_two")
+        self.assertEqual(index.lookup("javerage"), {})
+        self.assertEqual(len(index), 1)
+        self.assertNotIn("u_test_two", index)
+
+    def test_missing_name_and_type(self):
+        index = AclIndex()
+        index.update_json({"id": "u_test_one", "admins": [
+            {"id": None, "type": "uwnetid"}, {"id": "javerage"}]})
+        index.update_json({"id": "u_test_two", "admins": [
+            {"id": None, "type": "uwnetid"}]})
+        self.assertEqual(len(index._entities), 2)
+        self.assertEqual(index.groups_for(None), ["u_test_one", "u_test_two"])
+        self.assertEqual(index.groups_for(None, "uwnetid"),
+                         ["u_test_one", "u_test_two"])
+        self.assertEqual(index.lookup("javerage"), {
+            "u_test_one": ["admins"]})
+        self.assertEqual(index.groups_for("javerage", ""), ["u_test_one"])
+        self.assertEqual(index.entities("u_test_one"), {
+            ("", "uwnetid"): ["admins"], ("javerage", ""): ["admins"]})
+
+    def test_from_export(self):
+        group = GWS().get_group_by_id("u_acadev_tester")
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps({"id": group.name,
+                                "group": group.json_data()}) + "\n")
+        try:
+            index = AclIndex.from_export(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(
+            index.entities(group.name),
+            AclIndex.from_groups([group]).entities(group.name))
@@ -0,0 +1,62 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException
+from uw_gws import GWS
+from uw_gws.audit import AffiliateAudit
+from uw_gws.models import GroupAffiliate, GroupEntity
+from uw_gws.utilities import fdao_gws_override
+import io
+
+
+@fdao_gws_override
+class AffiliateAuditTest(TestCase):
+    def test_get_group_affiliates(self):
+        gws = GWS()
+        affiliates = gws.get_group_affiliates("u_acadev_tester")
+        self.assertEqual([a.json_data() for a in affiliates], [
+            a.json_data() for a in gws.get_group_by_id(
+                "u_acadev_tester").affiliates])
+        self.assertTrue(affiliates[0].is_active())
+        self.assertEqual(gws.get_group_affiliates("u_acadev_unittest"), [])
+
+    def test_run(self):
+        audit = AffiliateAudit(GWS(), max_workers=2).run([
+            "u_acadev_tester", "u_acadev_unittest",
+            "course_2012aut-train102a", "u_acadev_nonexistent"])
+        self.assertEqual(audit.groups, 3)
+        self.assertEqual(list(audit.affiliates), ["u_acadev_tester"])
+        self.assertEqual(list(audit.errors), ["u_acadev_nonexistent"])
+        self.assertIsInstance(audit.errors["u_acadev_nonexistent"],
+                              DataFailureException)
+        self.assertEqual(audit.groups_with("google", "active"),
+                         ["u_acadev_tester"])
+        self.assertEqual(audit.groups_with("email"), [])
+
+        # Groups are listed by group_ids or a stem search
+        self.assertRaises(ValueError, AffiliateAudit(GWS()).run)
+
+    def test_tables(self):
+        email = GroupAffiliate(name="email", status="active",
+                               forward="list@uw.edu")
+        email.senders = [GroupEntity(name="javerage", type="uwnetid"),
+                         GroupEntity(name="u_acadev_x", type="group")]
+        audit = AffiliateAudit(GWS())
+        audit.add("u_acadev_a", [email, GroupAffiliate(
+            name="google", status="inactive")])
+        audit.add("u_acadev_b", [GroupAffiliate(
+            name="email", status="active", forward="list@uw.edu")])
+        audit.add("u_acadev_c", [GroupAffiliate(name="radius")])
+        self.assertEqual(audit.tables(), {
+            "affiliates": [("email", "active", 2),
+                           ("google", "inactive", 1),
+                           ("radius", "", 1)],
+            "forwards": [("email", "list@uw.edu", 2)],
+            "senders": [("email", "group", 1), ("email", "uwnetid", 1)]})
+
+        stream = io.StringIO()
+        audit.write(stream)
+        self.assertIn("3 groups, 3 with affiliates, 0 errors",
+                      stream.getvalue())
+        self.assertIn("list@uw.edu", stream.getvalue())
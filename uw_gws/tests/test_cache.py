@@ -0,0 +1,414 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.cache import (
+    MemcachedCache, MemoryCache, SharedMemoryCache, SQLiteCache, cache_key)
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import fdao_gws_override
+import mock
+import os
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+class StandInMemcachedHandler(socketserver.StreamRequestHandler):
+    """
+    Implements the subset of the memcached text protocol used by
+    MemcachedCache.
+    """
+    def handle(self):
+        store = self.server.store
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.strip().decode().split(" ")
+            command = parts[0]
+            if command == "get":
+                for key in parts[1:]:
+                    entry = store.get(key)
+                    if entry and entry[1] >= time.time():
+                        self.wfile.write("VALUE {} 0 {}\r\n".format(
+                            key, len(entry[0])).encode())
+                        self.wfile.write(entry[0] + b"\r\n")
+                self.wfile.write(b"END\r\n")
+            elif command == "set":
+                value = self.rfile.read(int(parts[4]) + 2)[:-2]
+                store[parts[1]] = (value, time.time() + int(parts[3]))
+                self.wfile.write(b"STORED\r\n")
+            elif command == "delete":
+                self.wfile.write(b"DELETED\r\n" if store.pop(
+                    parts[1], None) else b"NOT_FOUND\r\n")
+            elif command == "flush_all":
+                store.clear()
+                self.wfile.write(b"OK\r\n")
+            elif command == "stats":
+                self.wfile.write("STAT bytes {}\r\nEND\r\n".format(
+                    sum(len(k) + len(v[0]) for k, v in store.items())
+                ).encode())
+            else:
+                self.wfile.write(b"ERROR\r\n")
+
+
+class StandInMemcachedServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        socketserver.ThreadingTCPServer.__init__(
+            self, ("127.0.0.1", 0), StandInMemcachedHandler)
+        self.store = {}
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class CacheBackendTests(object):
+    def get_backend(self):
+        raise NotImplementedError()
+
+    def test_get_set_delete(self):
+        cache = self.get_backend()
+        self.assertIsNone(cache.get("a"))
+        self.assertTrue(cache.set("a", b"1"))
+        self.assertTrue(cache.set_many({"b": "2", "c": b"3"}))
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertEqual(cache.get_many(["a", "b", "c", "d"]),
+                         {"a": b"1", "b": b"2", "c": b"3"})
+
+        self.assertTrue(cache.set("a", b"11"))
+        self.assertEqual(cache.get("a"), b"11")
+        self.assertGreater(cache.bytes_used(), 0)
+
+        self.assertTrue(cache.delete("a"))
+        self.assertFalse(cache.delete("a"))
+        self.assertEqual(cache.delete_many(["b", "c", "d"]), 2)
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {})
+
+        cache.set("e", b"5")
+        cache.clear()
+        self.assertIsNone(cache.get("e"))
+
+        stats = cache.stats.json_data()
+        self.assertEqual(stats["hits"], 5)
+        self.assertEqual(stats["misses"], 6)
+        self.assertEqual(stats["sets"], 5)
+        self.assertEqual(stats["deletes"], 3)
+        self.assertEqual(stats["bytes_read"], 6)
+        self.assertEqual(stats["errors"], 0)
+
+    def test_ttl(self):
+        cache = self.get_backend()
+        cache.set("a", b"1", ttl=-5)
+        self.assertIsNone(cache.get("a"))
+
+    def test_keys(self):
+        cache = self.get_backend()
+        key = cache_key("effective_member", "u_acadev_tester", "javerage",
+                        "view=count")
+        long_key = cache_key("search", None, None, "stem=" + "x" * 300)
+        cache.set_many({key: b"1", long_key: b"2"})
+        self.assertEqual(cache.get(key), b"1")
+        self.assertEqual(cache.get(long_key), b"2")
+
+
+class MemoryCacheTest(CacheBackendTests, TestCase):
+    def get_backend(self):
+        return MemoryCache()
+
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_bytes=6)
+        cache.set_many({"a": b"1", "b": b"2"})
+        cache.get("a")
+        cache.set("c", b"33")
+        self.assertEqual(cache.get_many(["a", "b", "c"]),
+                         {"a": b"1", "c": b"33"})
+        self.assertEqual(cache.bytes_used(), 5)
+        self.assertFalse(cache.set("d", b"x" * 10))
+        self.assertEqual(len(cache), 2)
+
+
+class SQLiteCacheTest(CacheBackendTests, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get_backend(self):
+        return SQLiteCache(os.path.join(self.tmpdir.name, "gws.db"))
+
+    def test_shared_file(self):
+        cache = self.get_backend()
+        cache.set_many({"a": b"1", "b": b"2"})
+        cache.set("c", b"3", ttl=-1)
+        self.assertEqual(self.get_backend().get("a"), b"1")
+        self.assertEqual(cache.purge_expired(), 1)
+        cache.close()
+
+
+class MemcachedCacheTest(CacheBackendTests, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInMemcachedServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.store.clear()
+
+    def get_backend(self):
+        cache = MemcachedCache(port=self.server.server_address[1])
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_ttl(self):
+        # memcached's shortest lifetime is one second
+        cache = self.get_backend()
+        cache.set("a", b"1", ttl=-5)
+        self.assertEqual(cache.get("a"), b"1")
+        with mock.patch("time.time", return_value=time.time() + 2):
+            self.assertIsNone(cache.get("a"))
+
+    def test_unavailable(self):
+        cache = MemcachedCache(port=self.server.server_address[1] + 1)
+        self.addCleanup(cache.close)
+        cache.address = ("127.0.0.1", 1)
+        self.assertFalse(cache.set("a", b"1"))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.delete_many(["a"]), 0)
+        self.assertEqual(cache.stats.errors, 3)
+
+
+class SharedMemoryCacheTest(CacheBackendTests, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "gws_cache")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get_backend(self):
+        return SharedMemoryCache(self.path, buckets=4, slot_size=512)
+
+    def test_size_classes(self):
+        cache = SharedMemoryCache(self.path, buckets=4,
+                                  size_classes=[(512, 4), (2048, 1)])
+        self.assertEqual(cache.size_classes, ((512, 4), (2048, 1)))
+        cache.set("big", b"x" * 1024)
+        self.assertEqual(cache.get("big"), b"x" * 1024)
+        cache.set("big", b"small")
+        self.assertEqual(cache.get("big"), b"small")
+        self.assertEqual(cache.bytes_used(), 8)
+
+        with mock.patch("uw_gws.cache.shm.logger") as mock_logger:
+            self.assertFalse(cache.set("big", b"x" * 2048))
+            self.assertFalse(cache.set("big", b"x" * 2048))
+        self.assertEqual(mock_logger.warning.call_count, 1)
+        self.assertEqual(cache.stats.rejected, 2)
+        self.assertIsNone(cache.get("big"))
+        cache.close()
+
+    def test_default_size_classes(self):
+        # Slots 16 and 256 times larger, with fewer buckets
+        cache = self.get_backend()
+        self.assertEqual(cache.size_classes,
+                         ((512, 4), (8192, 1), (131072, 1)))
+        cache.set("big", b"x" * 100000)
+        self.assertEqual(len(cache.get("big")), 100000)
+        cache.close()
+
+    def test_lru_eviction(self):
+        cache = SharedMemoryCache(self.path, buckets=1, ways=2,
+                                  slot_size=256)
+        with mock.patch("uw_gws.cache.shm.time.time") as mock_time:
+            mock_time.return_value = 100.0
+            cache.set("a", b"1")
+            mock_time.return_value = 101.0
+            cache.set("b", b"2")
+            mock_time.return_value = 102.0
+            cache.get("a")
+            mock_time.return_value = 103.0
+            cache.set("c", b"3")
+
+            self.assertEqual(cache.get("a"), b"1")
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("c"), b"3")
+        self.assertEqual(cache.stats.evictions, 1)
+        cache.close()
+
+    def test_shared_segment(self):
+        writer = self.get_backend()
+        reader = self.get_backend()
+        writer.set("group", b"data")
+        self.assertEqual(reader.get("group"), b"data")
+
+        pid = os.fork()
+        if pid == 0:
+            self.get_backend().set("child", b"written")
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(reader.get("child"), b"written")
+
+        self.assertRaises(ValueError, SharedMemoryCache, self.path,
+                          buckets=8, slot_size=512)
+        self.assertRaises(ValueError, SharedMemoryCache, self.path,
+                          slot_size=8)
+        writer.close()
+        self.assertEqual(reader.get("group"), b"data")
+        reader.set("group", b"new")
+        self.assertEqual(reader.get("group"), b"new")
+        reader.close()
+
+    def test_segment_per_process(self):
+        first = self.get_backend()
+        second = self.get_backend()
+        # One descriptor, and so one set of locks, per path in a process
+        self.assertIs(first._segment, second._segment)
+        self.assertEqual(first._segment.refs, 2)
+        first.close()
+        first.close()
+        self.assertEqual(second._segment.refs, 1)
+        second.close()
+        self.assertIsNone(second._segment)
+        third = self.get_backend()
+        self.assertEqual(third._segment.refs, 1)
+        third.close()
+
+
+@fdao_gws_override
+class GWSCacheTest(TestCase):
+    def test_lazy_backends(self):
+        # Backends with platform dependencies are loaded on first use, and
+        # writes by a client without a cache don't load the cache package
+        code = ("import sys, uw_gws.cache; print(' '.join(m for m in"
+                " ('uw_gws.cache.shm', 'uw_gws.cache.memcached',"
+                " 'uw_gws.cache.sqlite', 'mmap', 'sqlite3')"
+                " if m in sys.modules))")
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.decode().strip(), "")
+        code = ("import sys, uw_gws; uw_gws.GWS()._invalidate("
+                "'/group_sws/v3/group/u_acadev_tester/member/a1');"
+                " print('uw_gws.cache' in sys.modules)")
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.decode().strip(), "False")
+
+        import uw_gws.cache
+        self.assertIs(uw_gws.cache.SharedMemoryCache, SharedMemoryCache)
+        self.assertRaises(AttributeError, getattr, uw_gws.cache, "Missing")
+
+    def test_cache_key(self):
+        gws = GWS(act_as="javerage")
+        self.assertEqual(
+            gws._cache_key("/group_sws/v3/group/u_acadev_tester"),
+            "group|u_acadev_tester|javerage|")
+        self.assertEqual(
+            gws._cache_key("/group_sws/v3/group/u_acadev_tester/"
+                           "effective_member?view=count"),
+            "effective_member|u_acadev_tester|javerage|view=count")
+        self.assertEqual(
+            gws._cache_key("/group_sws/v3/search?stem=cal_sea"),
+            "search||javerage|stem=cal_sea")
+
+    def test_cached_reads(self):
+        cache = MemoryCache()
+        gws = GWS(cache=cache)
+        with mock.patch.object(
+                gws.DAO, "getURL", wraps=gws.DAO.getURL) as mock_get:
+            group = gws.get_group_by_id("u_acadev_tester")
+            members = gws.get_effective_members("u_acadev_unittest")
+            self.assertTrue(gws.is_effective_member(
+                "u_acadev_unittest", "javerage"))
+            self.assertFalse(gws.is_effective_member(
+                "u_acadev_unittest", "not_member"))
+            self.assertEqual(mock_get.call_count, 4)
+
+            self.assertEqual(
+                gws.get_group_by_id("u_acadev_tester").json_data(),
+                group.json_data())
+            self.assertEqual(
+                gws.get_effective_members("u_acadev_unittest"), members)
+            self.assertTrue(gws.is_effective_member(
+                "u_acadev_unittest", "javerage"))
+            self.assertFalse(gws.is_effective_member(
+                "u_acadev_unittest", "not_member"))
+            self.assertEqual(mock_get.call_count, 4)
+            # Each read also gets the generation of its group
+            self.assertEqual(cache.stats.hits, 10)
+
+            # act_as is part of the key
+            gws.act_as = "javerage"
+            gws.get_group_by_id("u_acadev_tester")
+            self.assertEqual(mock_get.call_count, 5)
+
+
+class GWSCacheWriteTest(LiveGWSTestCase):
+    def member_names(self, gws, group_id):
+        return sorted(m.name for m in gws.get_members(group_id))
+
+    def test_writes_end_cached_reads(self):
+        cache = MemoryCache()
+        gws = GWS(cache=cache)
+        other = GWS(cache=cache, act_as="javerage")
+        self.assertEqual(self.member_names(gws, "u_acadev_unittest"),
+                         ["eight", "javerage"])
+        self.assertEqual(self.member_names(other, "u_acadev_unittest"),
+                         ["eight", "javerage"])
+        self.assertFalse(gws.is_effective_member("u_acadev_unittest", "a1"))
+        self.assertEqual(
+            gws.get_member_counts(["u_acadev_unittest"]),
+            {"u_acadev_unittest": 2})
+        group = gws.get_group_by_id("u_acadev_tester")
+        self.assertEqual(self.member_names(gws, "u_acadev_tester"),
+                         ["eight", "javerage", "nine", "seven", "six"])
+
+        # Reads by every act_as user see the write
+        gws.add_members("u_acadev_unittest", ["a1"])
+        self.assertEqual(self.member_names(gws, "u_acadev_unittest"),
+                         ["a1", "eight", "javerage"])
+        self.assertEqual(self.member_names(other, "u_acadev_unittest"),
+                         ["a1", "eight", "javerage"])
+        self.assertTrue(gws.is_effective_member("u_acadev_unittest", "a1"))
+        self.assertEqual(
+            gws.get_member_counts(["u_acadev_unittest"]),
+            {"u_acadev_unittest": 3})
+
+        gws.delete_members("u_acadev_unittest", ["a1"])
+        self.assertEqual(self.member_names(other, "u_acadev_unittest"),
+                         ["eight", "javerage"])
+
+        # Other groups are still cached
+        with mock.patch.object(gws.DAO, "getURL") as mock_get:
+            self.assertEqual(self.member_names(gws, "u_acadev_tester"),
+                             ["eight", "javerage", "nine", "seven", "six"])
+        self.assertEqual(mock_get.call_count, 0)
+
+        group.display_name = "Changed"
+        gws.update_group(group)
+        self.assertEqual(
+            other.get_group_by_id("u_acadev_tester").display_name, "Changed")
+
+    def test_write_during_fetch(self):
+        cache = MemoryCache()
+        gws = GWS(cache=cache)
+        get_url = gws.DAO.getURL
+
+        def write_then_get(*args):
+            # The fetch returns the state before a write made during it
+            response = get_url(*args)
+            GWS(cache=cache).add_members("u_acadev_unittest", ["a1"])
+            return response
+
+        with mock.patch.object(gws.DAO, "getURL",
+                               side_effect=write_then_get):
+            self.assertEqual(self.member_names(gws, "u_acadev_unittest"),
+                             ["eight", "javerage"])
+        self.assertEqual(self.member_names(gws, "u_acadev_unittest"),
+                         ["a1", "eight", "javerage"])
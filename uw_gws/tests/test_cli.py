@@ -0,0 +1,182 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.cli import main, completed_ids
+from uw_gws.utilities import fdao_gws_override
+import io
+import json
+import mock
+import os
+import tempfile
+
+
+@fdao_gws_override
+class CLITest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.ids = self.path("ids.txt")
+        with open(self.ids, "w") as f:
+            f.write("u_acadev_tester\n\n# comment\nu_acadev_unittest\n"
+                    "u_acadev_nonexistent\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def run_main(self, argv):
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout, \
+                mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            code = main(argv)
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def read_output(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_export(self):
+        output = self.path("out.jsonl")
+        code, stdout, stderr = self.run_main([
+            "--workers", "2", "export", "--ids", self.ids,
+            "--members", "effective", "-o", output])
+        self.assertEqual(code, 1)
+        self.assertIn("u_acadev_nonexistent", stderr)
+        self.assertIn("Exported 2 groups (8 members, 0 skipped, 1 errors)",
+                      stderr)
+
+        records = sorted(self.read_output(output), key=lambda r: r["id"])
+        self.assertEqual([r["id"] for r in records],
+                         ["u_acadev_tester", "u_acadev_unittest"])
+        self.assertEqual(records[0]["group"]["displayName"],
+                         "Friends and Partners of ACA")
+        self.assertEqual(len(records[1]["members"]), 3)
+
+        code, stdout, stderr = self.run_main([
+            "export", "--ids", self.ids, "--members", "none"])
+        self.assertEqual(len(stdout.splitlines()), 2)
+        self.assertNotIn("members", json.loads(stdout.splitlines()[0]))
+
+    def test_export_resume(self):
+        output = self.path("out.jsonl")
+        with open(output, "w") as f:
+            f.write('{"id": "u_acadev_tester", "group": {}}\n{"id": "u_ac')
+
+        code, stdout, stderr = self.run_main([
+            "export", "--ids", self.ids, "-o", output, "--resume"])
+        self.assertIn("1 skipped", stderr)
+        self.assertEqual([r["id"] for r in self.read_output(output)],
+                         ["u_acadev_tester", "u_acadev_unittest"])
+        self.assertEqual(completed_ids(output),
+                         set(["u_acadev_tester", "u_acadev_unittest"]))
+
+        self.assertRaises(SystemExit, self.run_main, [
+            "export", "--ids", self.ids, "--resume"])
+
+    def test_export_stem(self):
+        code, stdout, stderr = self.run_main([
+            "export", "--stem", "cal_sea", "--members", "none"])
+        self.assertIn("0 skipped, 5 errors", stderr)
+
+    def export(self):
+        output = self.path("export.jsonl")
+        self.run_main(["export", "--ids", self.ids, "-o", output])
+        return output
+
+    @mock.patch.object(GWS, "update_members", return_value=[])
+    @mock.patch.object(GWS, "create_group")
+    @mock.patch.object(GWS, "update_group")
+    @mock.patch.object(GWS, "group_exists")
+    def test_import(self, mock_exists, mock_update, mock_create,
+                    mock_members):
+        output = self.export()
+        mock_exists.side_effect = [True, False]
+        checkpoint = self.path("import.done")
+
+        code, stdout, stderr = self.run_main([
+            "--workers", "1", "import", output, "--checkpoint", checkpoint])
+        self.assertEqual(code, 0)
+        results = [json.loads(line) for line in stdout.splitlines()]
+        self.assertEqual([r["action"] for r in results],
+                         ["updated", "created"])
+        self.assertEqual(mock_update.call_count, 1)
+        self.assertEqual(mock_create.call_count, 1)
+        self.assertEqual(mock_members.call_count, 2)
+        self.assertEqual(completed_ids(checkpoint),
+                         set(["u_acadev_tester", "u_acadev_unittest"]))
+
+        code, stdout, stderr = self.run_main([
+            "import", output, "--checkpoint", checkpoint])
+        self.assertEqual(stdout, "")
+        self.assertIn("Imported 0 groups (0 members, 2 skipped", stderr)
+
+    @mock.patch.object(GWS, "update_members", return_value=[])
+    @mock.patch.object(GWS, "update_group")
+    def test_sync(self, mock_update, mock_members):
+        output = self.export()
+        records = self.read_output(output)
+        records[0]["group"]["displayName"] = "Changed"
+        records[1]["members"].pop()
+        with open(output, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+        code, stdout, stderr = self.run_main(["sync", output, "--dry-run"])
+        results = dict((r["id"], r["actions"]) for r in [
+            json.loads(line) for line in stdout.splitlines()])
+        self.assertEqual(results[records[0]["id"]], ["update"])
+        self.assertEqual(results[records[1]["id"]], ["members"])
+        self.assertIn("Checked 2 groups", stderr)
+        self.assertEqual(mock_update.call_count, 0)
+
+        code, stdout, stderr = self.run_main(["sync", output])
+        self.assertEqual(mock_update.call_count, 1)
+        self.assertEqual(mock_members.call_count, 1)
+
+    def test_sync_acl_order(self):
+        output = self.export()
+        record = dict((r["id"], r) for r in self.read_output(output))[
+            "u_acadev_tester"]
+        record["group"]["admins"].reverse()
+        with open(output, "w") as f:
+            f.write(json.dumps(record) + "\n")
+
+        code, stdout, stderr = self.run_main(["sync", output, "--dry-run"])
+        self.assertEqual(json.loads(stdout), {
+            "id": "u_acadev_tester", "actions": []})
+
+    @mock.patch.object(GWS, "update_members", return_value=[])
+    @mock.patch.object(GWS, "update_group")
+    def test_preflight(self, mock_update, mock_members):
+        output = self.export()
+        records = self.read_output(output)
+        records[1]["members"].append({"id": "u_acadev_nonexistent",
+                                      "type": "group"})
+        # Indirect members aren't written, so aren't checked
+        records[1]["members"].append({"id": "u_acadev_gone", "type": "group",
+                                      "mtype": "indirect"})
+        with open(output, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+        code, stdout, stderr = self.run_main(["sync", output, "--preflight"])
+        self.assertEqual(code, 1)
+        self.assertIn("not found group u_acadev_nonexistent", stderr)
+        self.assertNotIn("u_acadev_gone", stderr)
+        self.assertEqual(stdout, "")
+        self.assertEqual(mock_update.call_count, 0)
+        self.assertEqual(mock_members.call_count, 0)
+
+    def test_affiliates(self):
+        output = self.path("affiliates.jsonl")
+        code, stdout, stderr = self.run_main([
+            "affiliates", "--ids", self.ids, "-o", output])
+        self.assertEqual(code, 1)
+        self.assertIn("Audited 2 groups", stderr)
+        self.assertIn("2 groups, 1 with affiliates, 1 errors", stdout)
+        self.assertEqual(self.read_output(output), [
+            {"id": "u_acadev_tester", "affiliates": [{
+                "name": "google", "status": "active", "forward": None,
+                "sender": []}]}])
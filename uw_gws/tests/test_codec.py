@@ -0,0 +1,63 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from commonconf import override_settings
+from uw_gws import GWS
+from uw_gws.codec import (
+    JSONCodec, available_codecs, get_codec, orjson, ujson)
+from uw_gws.utilities import fdao_gws_override
+
+
+@fdao_gws_override
+class GWSCodecTest(TestCase):
+    def test_get_codec(self):
+        self.assertEqual(get_codec("json").name, "json")
+        self.assertEqual(get_codec("auto").name, available_codecs()[0])
+        self.assertEqual(get_codec(None).name, available_codecs()[0])
+        self.assertIn("json", available_codecs())
+        self.assertRaises(ValueError, get_codec, "pickle")
+
+        if orjson is None:
+            self.assertEqual(get_codec("orjson").name, "json")
+        if ujson is None:
+            self.assertEqual(get_codec("ujson").name, "json")
+
+    def test_codec_setting(self):
+        with override_settings(RESTCLIENTS_GWS_JSON_CODEC="json"):
+            self.assertIsInstance(GWS().codec, JSONCodec)
+            self.assertEqual(GWS().codec.name, "json")
+
+    def test_conformance(self):
+        def snapshot():
+            gws = GWS()
+            return {
+                "group": gws.get_group_by_id("u_acadev_tester").json_data(),
+                "course": gws.get_group_by_id(
+                    "course_2012aut-train102a").json_data(),
+                "members": [m.json_data() for m in gws.get_members(
+                    "u_acadev_unittest")],
+                "effective": [m.json_data() for m in
+                              gws.get_effective_members("u_acadev_unittest")],
+                "count": gws.get_effective_member_count("u_acadev_unittest"),
+                "search": [g.json_data() for g in gws.search_groups(
+                    member="javerage")],
+                "history": [h.json_data() for h in gws.get_group_history(
+                    "u_acadev_tester")],
+            }
+
+        with override_settings(RESTCLIENTS_GWS_JSON_CODEC="json"):
+            expected = snapshot()
+
+        for name in available_codecs():
+            with override_settings(RESTCLIENTS_GWS_JSON_CODEC=name):
+                self.assertEqual(snapshot(), expected, name)
+
+    def test_round_trip(self):
+        body = {"data": [{"id": "jäverage", "type": "uwnetid"}]}
+        for name in available_codecs():
+            codec = get_codec(name)
+            self.assertEqual(codec.loads(codec.dumps(body)), body, name)
+            # The same type and bytes from every codec
+            self.assertEqual(codec.dumps(body), get_codec("json").dumps(
+                body), name)
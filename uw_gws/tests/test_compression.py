@@ -0,0 +1,115 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase, skipIf
+from commonconf import override_settings
+from restclients_core.models import MockHTTP
+from uw_gws import GWS
+from uw_gws.compression import (
+    StreamDecoder, TransferStats, accept_encoding, brotli, decode_response,
+    decompress, iter_decompress)
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import fdao_gws_override
+import gzip
+import json
+import zlib
+
+DATA = json.dumps({"data": [{"id": "member{}".format(i), "type": "uwnetid"}
+                            for i in range(500)]}).encode("utf-8")
+
+
+def chunks(data, size=100):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class CompressionTest(TestCase):
+    def test_accept_encoding(self):
+        self.assertIsNone(accept_encoding(None))
+        self.assertIsNone(accept_encoding(""))
+        self.assertEqual(accept_encoding("gzip"), "gzip")
+        self.assertEqual(accept_encoding("GZIP, deflate"), "gzip, deflate")
+        self.assertRaises(ValueError, accept_encoding, "zstd")
+        if brotli is None:
+            self.assertEqual(accept_encoding("auto"), "gzip, deflate")
+            self.assertIsNone(accept_encoding("br"))
+        else:
+            self.assertEqual(accept_encoding("auto"), "br, gzip, deflate")
+
+    def test_stream_decoder(self):
+        for encoding, encoded in [("gzip", gzip.compress(DATA)),
+                                  ("deflate", zlib.compress(DATA)),
+                                  ("identity", DATA)]:
+            self.assertEqual(b"".join(iter_decompress(
+                chunks(encoded), encoding)), DATA)
+            self.assertEqual(decompress(encoded, encoding), DATA)
+        self.assertRaises(ValueError, StreamDecoder, "zstd")
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli(self):
+        encoded = brotli.compress(DATA)
+        self.assertEqual(b"".join(iter_decompress(chunks(encoded), "br")),
+                         DATA)
+
+    def test_decode_response(self):
+        response = MockHTTP()
+        response.data = gzip.compress(DATA)
+        response.headers = {"Content-Encoding": "gzip"}
+        response.decode_content = False
+        stats = TransferStats()
+        self.assertEqual(decode_response(response, stats, "gzip"), DATA)
+
+        response = MockHTTP()
+        response.data = DATA
+        self.assertEqual(decode_response(response, stats, "gzip"), DATA)
+
+        # Bodies are decoded only if the client asked for the encoding and
+        # urllib3 left the body encoded
+        response = MockHTTP()
+        response.data = gzip.compress(DATA)
+        response.headers = {"Content-Encoding": "gzip"}
+        self.assertEqual(decode_response(response, None, "gzip"),
+                         response.data)
+        response.decode_content = False
+        self.assertEqual(decode_response(response), response.data)
+        data = stats.json_data()
+        self.assertEqual(data["responses"], 2)
+        self.assertEqual(data["compressed"], 1)
+        self.assertEqual(data["decoded_bytes"], 2 * len(DATA))
+        self.assertEqual(data["wire_bytes"], len(DATA) + len(
+            gzip.compress(DATA)))
+        self.assertGreater(stats.ratio, 1)
+
+    @fdao_gws_override
+    def test_setting(self):
+        self.assertNotIn("Accept-Encoding", GWS()._headers())
+        with override_settings(RESTCLIENTS_GWS_COMPRESSION="gzip"):
+            gws = GWS()
+            self.assertEqual(gws._headers()["Accept-Encoding"], "gzip")
+            self.assertEqual(len(gws.get_members("u_acadev_unittest")), 2)
+            self.assertEqual(gws.transfer_stats.responses, 1)
+            self.assertEqual(gws.transfer_stats.compressed, 0)
+
+
+class CompressedTransferTest(LiveGWSTestCase):
+    server_options = {"gzip_min_size": 100}
+
+    def read(self, compression):
+        with self.live_settings(compression):
+            gws = GWS()
+            self.assertEqual(gws._headers().get("Accept-Encoding"),
+                             compression)
+            result = (
+                gws.get_effective_members("u_acadev_unittest"),
+                gws.get_group_by_id("u_acadev_tester").json_data(),
+                gws.is_direct_member("u_acadev_unittest", "seven"))
+            return result, gws.transfer_stats
+
+    def test_compressed_reads(self):
+        expected, plain = self.read(None)
+        result, stats = self.read("gzip")
+        self.assertEqual(result, expected)
+        self.assertEqual(plain.compressed, 0)
+        self.assertEqual(stats.responses, 3)
+        self.assertEqual(stats.compressed, 2)
+        self.assertEqual(stats.decoded_bytes, plain.decoded_bytes)
+        self.assertLess(stats.wire_bytes, plain.wire_bytes)
@@ -0,0 +1,111 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.deadline import INCOMPLETE, check_deadline, deadline, remaining
+from uw_gws.exceptions import DeadlineExceeded
+from uw_gws.reconcile import Reconciler
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import fdao_gws_override, map_concurrent
+import mock
+import time
+
+
+class DeadlineTest(TestCase):
+    def test_deadline(self):
+        self.assertIsNone(remaining())
+        with deadline(10):
+            self.assertGreater(remaining(), 9)
+            with deadline(1):
+                self.assertLessEqual(remaining(), 1)
+                with deadline(5):
+                    self.assertLessEqual(remaining(), 1)
+            self.assertGreater(remaining(), 9)
+            with deadline(None):
+                self.assertGreater(remaining(), 9)
+        self.assertIsNone(remaining())
+
+        with deadline(0):
+            self.assertEqual(remaining(), 0)
+            self.assertRaises(DeadlineExceeded, check_deadline, "/url")
+        check_deadline()
+        self.assertFalse(INCOMPLETE)
+
+    def test_map_concurrent(self):
+        def func(item):
+            self.assertIsNotNone(remaining())
+            if item % 2:
+                time.sleep(1)
+            return item
+
+        start = time.time()
+        with deadline(0.2):
+            results = list(map_concurrent(func, range(10), max_workers=2))
+        self.assertLess(time.time() - start, 0.9)
+        self.assertEqual(sorted(item for item, result, ex in results),
+                         list(range(10)))
+        completed = [item for item, result, ex in results if ex is None]
+        self.assertIn(0, completed)
+        self.assertNotIn(1, completed)
+        for item, result, ex in results:
+            if item not in completed:
+                self.assertIsInstance(ex, DeadlineExceeded)
+
+    @fdao_gws_override
+    def test_requests(self):
+        gws = GWS()
+        with deadline(0):
+            self.assertRaises(DeadlineExceeded, gws.get_members,
+                              "u_acadev_unittest")
+            self.assertEqual(list(gws.groups_for_members(["javerage"])),
+                             [("javerage", INCOMPLETE)])
+        self.assertEqual(len(gws.get_members("u_acadev_unittest")), 2)
+
+    @fdao_gws_override
+    def test_partial_results(self):
+        gws = GWS()
+        search_groups = gws.search_groups
+
+        def search(member, **kwargs):
+            if member == "slow":
+                time.sleep(1)
+            return search_groups(member="javerage", **kwargs)
+
+        with mock.patch.object(gws, "search_groups", side_effect=search):
+            with deadline(0.3):
+                results = dict(gws.groups_for_members(
+                    ["javerage", "slow"], max_workers=1))
+        self.assertEqual(len(results["javerage"]), 7)
+        self.assertIs(results["slow"], INCOMPLETE)
+
+    @fdao_gws_override
+    def test_reconcile(self):
+        gws = GWS()
+        group = gws.get_group_by_id("u_acadev_tester")
+        group.display_name = "Changed"
+        reconciler = Reconciler(gws)
+        plan = reconciler.plan([group], members={
+            "u_acadev_tester": ["javerage"]})
+        self.assertEqual(len(plan), 2)
+        with mock.patch.object(gws, "update_group") as update_group:
+            with deadline(0):
+                errors = reconciler.apply(plan)
+        self.assertEqual(list(errors), ["u_acadev_tester"])
+        self.assertIsInstance(errors["u_acadev_tester"], DeadlineExceeded)
+        self.assertFalse(update_group.called)
+
+
+class LiveDeadlineTest(LiveGWSTestCase):
+    server_options = {"latency": 0.5}
+
+    def test_timeouts(self):
+        start = time.time()
+        self.assertRaises(DeadlineExceeded, GWS(timeout=0.1).get_members,
+                          "u_acadev_unittest")
+        with deadline(0.1):
+            self.assertRaises(DeadlineExceeded, GWS(timeout=5).get_members,
+                              "u_acadev_unittest")
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(len(GWS(timeout=5).get_members(
+            "u_acadev_unittest")), 2)
@@ -0,0 +1,225 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from restclients_core.dao import LiveDAO
+from restclients_core.exceptions import DataFailureException
+from uw_gws import GWS, acting_as
+from uw_gws.dao import GWSLiveDAO
+from uw_gws.loadtest import build_calls, percentile, run_load
+from uw_gws.models import Group, GroupEntity, GroupMember
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import map_concurrent
+import mock
+import time
+
+
+class FakeGWSServerTest(LiveGWSTestCase):
+    def test_reads(self):
+        gws = GWS()
+        group = gws.get_group_by_id("u_acadev_tester")
+        self.assertEqual(group.display_name, "Friends and Partners of ACA")
+        self.assertEqual(len(gws.get_members("u_acadev_unittest")), 2)
+        self.assertEqual(len(gws.get_effective_members(
+            "u_acadev_unittest")), 3)
+        self.assertEqual(gws.get_effective_member_count(
+            "u_acadev_unittest"), 3)
+        self.assertTrue(gws.is_effective_member(
+            "u_acadev_unittest", "seven"))
+        self.assertFalse(gws.is_direct_member("u_acadev_unittest", "seven"))
+        self.assertEqual(len(gws.get_group_history("u_acadev_tester")), 5)
+        self.assertEqual(len(gws.get_group_history(
+            "u_acadev_tester", activity="membership")), 2)
+        self.assertEqual([g.name for g in gws.search_groups(
+            stem="u_acadev")], ["u_acadev_tester", "u_acadev_unittest"])
+        self.assertEqual(len(gws.search_groups(member="seven",
+                                               type="effective")), 2)
+        self.assertEqual(len(gws.search_groups(member="seven")), 1)
+        self.assertRaises(DataFailureException, gws.get_group_by_id,
+                          "u_acadev_nonexistent")
+        self.assertEqual(self.server.requests["GET"], 12)
+
+    def test_writes(self):
+        gws = GWS()
+        group = Group(name="u_acadev_new", display_name="New")
+        group.admins = [GroupEntity(name="javerage", type="uwnetid")]
+        self.assertEqual(gws.create_group(group).name, "u_acadev_new")
+
+        self.assertTrue(gws.add_members("u_acadev_new", ["a1", "a2"]))
+        self.assertEqual(gws.update_members("u_acadev_new", [
+            GroupMember(name="a2", type="uwnetid"),
+            GroupMember(name="u_acadev_unittest", type="group")]), [])
+        members = gws.get_effective_members("u_acadev_new")
+        self.assertEqual(sorted(m.name for m in members), [
+            "a2", "eight", "javerage", "seven"])
+        self.assertEqual([m.mtype for m in members if m.name == "seven"],
+                         ["indirect"])
+
+        self.assertTrue(gws.delete_members("u_acadev_new", ["a2"]))
+        history = gws.get_group_history("u_acadev_new",
+                                        activity="membership")
+        self.assertEqual([(h.member_action, h.member_uwnetid)
+                          for h in history],
+                         [("add member", "a1"), ("add member", "a2"),
+                          ("add member", "u_acadev_unittest"),
+                          ("delete member", "a1"),
+                          ("delete member", "a2")])
+
+        self.assertTrue(gws.delete_group("u_acadev_new"))
+        self.assertRaises(DataFailureException, gws.get_group_by_id,
+                          "u_acadev_new")
+
+    def test_conditional_update(self):
+        gws = GWS()
+        group = gws.get_group_by_id("u_acadev_tester")
+        self.assertEqual(gws.update_group(group), group)
+        self.assertEqual(self.server.requests.get("PUT", 0), 0)
+
+        group.display_name = "ACA Tester"
+        self.assertEqual(gws.update_group(group).display_name, "ACA Tester")
+        self.assertEqual(self.server.requests["PUT"], 1)
+
+        # Another client's change makes the ETag held here stale
+        other = GWS()
+        changed = other.get_group_by_id("u_acadev_tester")
+        changed.description = "Changed"
+        other.update_group(changed)
+
+        group.display_name = "Stale"
+        with self.assertRaises(DataFailureException) as cm:
+            gws.update_group(group)
+        self.assertEqual(cm.exception.status, 412)
+        self.assertEqual(gws.get_group_by_id(
+            "u_acadev_tester").display_name, "ACA Tester")
+        group = gws.get_group_by_id("u_acadev_tester")
+        group.display_name = "Fresh"
+        self.assertEqual(gws.update_group(group).display_name, "Fresh")
+
+        # Updates don't create groups
+        group.name = "u_acadev_missing"
+        with self.assertRaises(DataFailureException) as cm:
+            gws.update_group(group)
+        self.assertEqual(cm.exception.status, 412)
+        self.assertFalse(gws.group_exists("u_acadev_missing"))
+
+    def test_shared_group_state(self):
+        gws = GWS()
+        with acting_as("javerage"):
+            group = gws.get_group_by_id("u_acadev_tester")
+
+        # Another user's read doesn't make the update a no-op
+        with acting_as("bill"):
+            self.assertIsNot(gws.update_group(group), group)
+        self.assertEqual(self.server.requests["PUT"], 1)
+
+        # Nor does a read made before another user's change
+        with acting_as("javerage"):
+            gws.get_group_by_id("u_acadev_tester")
+        with acting_as("bill"):
+            changed = gws.get_group_by_id("u_acadev_tester")
+            changed.description = "Changed"
+            gws.update_group(changed)
+        with acting_as("javerage"):
+            gws.update_group(group)
+        self.assertEqual(self.server.requests["PUT"], 3)
+        self.assertEqual(gws.get_group_by_id("u_acadev_tester").description,
+                         group.description)
+
+        gws.MAX_GROUP_STATES = 1
+        gws.get_group_by_id("u_acadev_unittest")
+        self.assertEqual(list(gws._group_state),
+                         [(None, "u_acadev_unittest")])
+
+    def test_sparse_group(self):
+        # Reads don't serialize the group, so missing fields don't fail
+        self.server.state.put_group(
+            "u_acadev_sparse", {"displayName": "Sparse"}, record=False)
+        gws = GWS()
+        group = gws.get_group_by_id("u_acadev_sparse")
+        self.assertEqual(group.display_name, "Sparse")
+
+        # A state that can't be fingerprinted doesn't skip the update
+        group.authnfactor = 1
+        gws.update_group(group)
+        self.assertEqual(self.server.requests["PUT"], 1)
+
+    def test_behavior(self):
+        gws = GWS()
+        self.server.behavior.error_rate = 1.0
+        with self.assertRaises(DataFailureException) as cm:
+            gws.get_group_by_id("u_acadev_tester")
+        self.assertEqual(cm.exception.status, 500)
+
+        self.server.behavior.error_rate = 0.0
+        self.server.behavior.max_rps = 1
+        gws.get_group_by_id("u_acadev_tester")
+        with self.assertRaises(DataFailureException) as cm:
+            gws.get_group_by_id("u_acadev_tester")
+        self.assertEqual(cm.exception.status, 429)
+
+        self.server.behavior.max_rps = None
+        self.server.behavior.latency = 0.05
+        start = time.time()
+        gws.get_group_by_id("u_acadev_tester")
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_shared_client(self):
+        gws = GWS()
+        pools = []
+        create_pool = GWSLiveDAO.create_pool
+
+        def slow_create_pool(dao):
+            time.sleep(0.05)
+            pools.append(create_pool(dao))
+            return pools[-1]
+
+        def check(netid):
+            with acting_as(netid):
+                return gws.is_effective_member("u_acadev_unittest", netid)
+
+        # Threads share one client and one pool of 4 connections
+        with mock.patch.object(GWSLiveDAO, "create_pool", slow_create_pool):
+            results = dict((netid, result) for netid, result, ex in
+                           map_concurrent(check, ["seven", "nobody"] * 20,
+                                          max_workers=20))
+        self.assertEqual(results, {"seven": True, "nobody": False})
+        self.assertEqual(len(pools), 1)
+        self.assertIs(LiveDAO.pools["gws"], pools[0])
+
+    def test_run_load(self):
+        calls = build_calls(["u_acadev_tester", "u_acadev_unittest"],
+                            ["javerage", "nobody"])
+        self.server.behavior.error_rate = 0.1
+        report = run_load(GWS(), calls, concurrency=4, requests=100, seed=1)
+        self.assertEqual(report.total, 100)
+        data = report.json_data()
+        self.assertGreater(sum(r["errors"] for r in data.values()), 0)
+        for row in data.values():
+            self.assertLessEqual(row["p50_ms"], row["p95_ms"])
+            self.assertLessEqual(row["p95_ms"], row["p99_ms"])
+        self.assertIn("requests/s", str(report))
+
+    def test_build_calls(self):
+        calls = build_calls(["u_acadev_tester"], ["javerage", "nobody"],
+                            mix=[("search_groups", 2),
+                                 ("is_effective_member", 1)])
+        self.assertEqual(sorted(calls), [
+            ("is_effective_member", ("u_acadev_tester", "javerage")),
+            ("is_effective_member", ("u_acadev_tester", "nobody")),
+            ("search_groups", ("javerage",)),
+            ("search_groups", ("javerage",)),
+            ("search_groups", ("nobody",)),
+            ("search_groups", ("nobody",))])
+
+        # Searches are for the netids passed
+        with mock.patch.object(GWS, "search_groups",
+                               return_value=[]) as mock_search:
+            run_load(GWS(), [("search_groups", ("nobody",))], requests=3)
+        self.assertEqual(mock_search.call_args_list,
+                         [mock.call(member="nobody")] * 3)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 95), 5)
+        self.assertIsNone(percentile([], 50))
@@ -3,14 +3,19 @@
 
 from unittest import TestCase
 from restclients_core.exceptions import DataFailureException
-from uw_gws import GWS
+from uw_gws import GWS, acting_as
+from uw_gws.cache import MemoryCache
+from uw_gws.dao import GWS_DAO
 from uw_gws.models import (
     Group, CourseGroup, GroupEntity, GroupMember, GroupAffiliate,
     GroupHistory)
-from uw_gws.utilities import fdao_gws_override
+from uw_gws.utilities import fdao_gws_override, map_concurrent
 from uw_gws.exceptions import InvalidGroupID
 from datetime import datetime, timedelta, timezone
 import mock
+import subprocess
+import sys
+import threading
 
 
 @fdao_gws_override
@@ -22,6 +27,33 @@ class GWSGroupTest(TestCase):
         gws = GWS(log_errors=True)
         self.assertIsNotNone(gws.logger)
 
+        # Clients share one DAO unless passed their own
+        self.assertIs(GWS().DAO, GWS().DAO)
+        dao = GWS_DAO()
+        gws = GWS(dao=dao)
+        self.assertIs(gws.DAO, dao)
+        self.assertEqual(len(gws.get_members("u_acadev_unittest")), 2)
+
+    def test_lazy_imports(self):
+        # Importing uw_gws and creating a client don't load the DAO,
+        # models or settings
+        code = ("import sys, uw_gws; uw_gws.GWS(); print(' '.join(m for m in"
+                " ('restclients_core.dao', 'urllib3', 'commonconf',"
+                " 'uw_gws.models') if m in sys.modules))")
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.decode().strip(), "")
+
+        # The names importable before are loaded on first use
+        import uw_gws
+        from uw_gws import (
+            GWS_DAO, Group, CourseGroup, GroupReference, GroupEntity,
+            GroupMember, GroupAffiliate, GroupHistory, DataFailureException,
+            InvalidGroupID)
+        from uw_gws.models import Group as ModelGroup
+        self.assertIs(Group, ModelGroup)
+        self.assertIs(uw_gws.GWS_DAO, GWS_DAO)
+        self.assertRaises(AttributeError, getattr, uw_gws, "Missing")
+
     def test_request_headers(self):
         gws = GWS()
 
@@ -35,6 +67,44 @@ class GWSGroupTest(TestCase):
                           'Connection': 'keep-alive',
                           'X-UW-Act-as': 'javerage'})
 
+    def test_acting_as(self):
+        gws = GWS(act_as='javerage')
+        with acting_as('bill'):
+            self.assertEqual(gws._headers()['X-UW-Act-as'], 'bill')
+            self.assertEqual(gws._cache_key('/group_sws/v3/group/x/member'),
+                             'member|x|bill|')
+            with acting_as(''):
+                self.assertNotIn('X-UW-Act-as', gws._headers())
+            # Batch operations act as the caller
+            self.assertEqual(list(map_concurrent(
+                lambda i: gws._headers()['X-UW-Act-as'], [1])),
+                [(1, 'bill', None)])
+        self.assertEqual(gws._headers()['X-UW-Act-as'], 'javerage')
+
+        # Threads sharing a client act for different users
+        def request(netid):
+            with acting_as(netid):
+                gws.get_members('u_acadev_unittest')
+
+        with mock.patch.object(gws.DAO, 'getURL',
+                               wraps=gws.DAO.getURL) as get_url:
+            threads = [threading.Thread(target=request, args=(netid,))
+                       for netid in ('one', 'two', 'three')]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sorted(c[0][1]['X-UW-Act-as'] for c in
+                                get_url.call_args_list),
+                         ['one', 'three', 'two'])
+
+        # Passed headers are not modified
+        headers = {'If-Match': '*'}
+        gws.add_members('u_acadev_unittest', ['seven'])
+        gws._put_resource('/group_sws/v3/group/u_acadev_unittest/member/'
+                          'seven', headers)
+        self.assertEqual(headers, {'If-Match': '*'})
+
     def test_get_nonexistent_group(self):
         gws = GWS()
         self.assertRaises(DataFailureException,
@@ -59,6 +129,32 @@ class GWSGroupTest(TestCase):
         self.assertEqual(group.classification, "u")
         self.assertEqual(group.dependson, "")
 
+    def test_groups_from_json_many(self):
+        gws = GWS()
+        data = [gws._get_resource("/group_sws/v3/group/{}".format(
+            group_id))["data"] for group_id in (
+                "u_acadev_tester", "course_2012aut-train102a")]
+        data.append(dict(data[0], id="u_acadev_other", lastModified=None))
+
+        groups = gws.groups_from_json_many(iter(data))
+        self.assertEqual([type(g) for g in groups],
+                         [Group, CourseGroup, Group])
+        for group, datum in zip(groups, data):
+            self.assertEqual(group.json_data(),
+                             gws.group_from_json(datum).json_data())
+        self.assertEqual(groups[1].quarter, "autumn")
+        self.assertEqual(len(groups[1].instructors), 11)
+        self.assertEqual(groups[0].affiliates[0].name, "google")
+
+        columns = gws.groups_from_json_many(data, columns=True)
+        self.assertEqual(sorted(columns), sorted(GWS.GROUP_COLUMNS))
+        for name in GWS.GROUP_COLUMNS:
+            self.assertEqual(columns[name],
+                             [getattr(g, name) for g in groups])
+        self.assertIsNone(columns["last_modified"][2])
+        self.assertEqual(gws.groups_from_json_many([], columns=True)["name"],
+                         [])
+
     def test_get_course_group(self):
         gws = GWS()
         group = gws.get_group_by_id("course_2012aut-train102a")
@@ -125,6 +221,26 @@ class GWSGroupTest(TestCase):
         group1 = gws.update_group(group)
         self.assertIsNotNone(group1)
 
+    def test_update_group_unchanged(self):
+        gws = GWS()
+        group = gws.get_group_by_id("u_acadev_tester")
+        with mock.patch.object(gws.DAO, "putURL") as put_url:
+            self.assertEqual(gws.update_group(group), group)
+
+            # Entity order and server-set fields don't count as changes
+            group.admins.reverse()
+            group.uwregid = None
+            gws.update_group(group)
+            self.assertEqual(put_url.call_count, 0)
+
+        group.display_name = "ACA Tester"
+        with mock.patch.object(gws, "_send_resource",
+                               wraps=gws._send_resource) as send:
+            gws.update_group(group)
+            self.assertEqual(send.call_args[0][1]["If-Match"], "*")
+            gws.update_group(group, force=True)
+            self.assertEqual(send.call_count, 2)
+
     def test_delete_group(self):
         gws = GWS()
         group = Group(name='u_acadev_tester')
@@ -253,6 +369,59 @@ class GWSGroupTest(TestCase):
         count = gws.get_effective_member_count('u_acadev_unittest')
         self.assertEqual(count, 3)
 
+    def test_member_counts(self):
+        gws = GWS()
+        self.assertEqual(gws.get_member_count('u_acadev_unittest'), 2)
+
+        with mock.patch.object(
+                gws, 'get_effective_member_count',
+                wraps=gws.get_effective_member_count) as get_count:
+            groups = ['u_acadev_unittest', 'u_acadev_nonexistent',
+                      'u_acadev_unittest']
+            self.assertEqual(gws.get_effective_member_counts(groups), {
+                'u_acadev_unittest': 3, 'u_acadev_nonexistent': None})
+            self.assertEqual(get_count.call_count, 2)
+
+            # Counts, and missing groups, are reused within the ttl
+            gws.get_effective_member_counts(groups)
+            self.assertEqual(get_count.call_count, 2)
+            gws.get_effective_member_counts(groups, ttl=0)
+            self.assertEqual(get_count.call_count, 4)
+
+        self.assertEqual(gws.get_member_counts(
+            ['u_acadev_unittest', 'u_acadev_tester']),
+            {'u_acadev_unittest': 2, 'u_acadev_tester': 5})
+        self.assertRaises(InvalidGroupID, gws.get_member_counts, ['bad id'])
+
+        # Counts kept for reuse are bounded
+        gws.MAX_COUNTS = 2
+        with acting_as('javerage'):
+            gws.get_member_counts(['u_acadev_unittest'])
+        self.assertEqual(len(gws._counts), 2)
+        self.assertIn(('u_acadev_unittest', False, 'javerage'), gws._counts)
+
+    def test_member_counts_error(self):
+        gws = GWS()
+        count = gws.get_member_count
+
+        def get_count(group_id):
+            if group_id == 'u_acadev_tester':
+                raise DataFailureException('url', 500, '')
+            return count(group_id)
+
+        with mock.patch.object(gws, 'get_member_count',
+                               side_effect=get_count) as mock_count:
+            counts = gws.get_member_counts(
+                ['u_acadev_unittest', 'u_acadev_tester'])
+            self.assertEqual(counts['u_acadev_unittest'], 2)
+            self.assertIsInstance(counts['u_acadev_tester'],
+                                  DataFailureException)
+            self.assertEqual(counts['u_acadev_tester'].status, 500)
+
+            # The failed count is fetched again, the other is reused
+            gws.get_member_counts(['u_acadev_unittest', 'u_acadev_tester'])
+            self.assertEqual(mock_count.call_count, 3)
+
     def test_is_effective_member(self):
         gws = GWS()
 
@@ -266,6 +435,54 @@ class GWSGroupTest(TestCase):
         self.assertEqual(
             gws.is_effective_member('u_acadev_unittest', 'not_member'), False)
 
+    def test_is_member_of_any_all(self):
+        gws = GWS()
+        groups = ['u_acadev_tester', 'u_acadev_unittest']
+        self.assertTrue(gws.is_member_of_any('javerage', groups))
+        self.assertTrue(gws.is_member_of_any('eight', groups))
+        self.assertFalse(gws.is_member_of_any('not_member', groups))
+        self.assertFalse(gws.is_member_of_any('javerage', []))
+        self.assertTrue(gws.is_member_of_all('javerage', groups))
+        self.assertFalse(gws.is_member_of_all('eight', groups))
+        self.assertTrue(gws.is_member_of_all('eight', []))
+        self.assertRaises(InvalidGroupID, gws.is_member_of_any,
+                          'javerage', ['u_acadev_tester', '$invalid'])
+
+    def test_is_member_of_any_short_circuit(self):
+        gws = GWS()
+        released = threading.Event()
+
+        def is_member(group_id, netid, is_effective):
+            if group_id == 'u_acadev_slow':
+                released.wait(5)
+            if group_id == 'u_acadev_error':
+                raise DataFailureException(group_id, 500, '')
+            return group_id == 'u_acadev_tester'
+
+        with mock.patch.object(gws, 'is_member', side_effect=is_member):
+            self.assertTrue(gws.is_member_of_any('javerage', [
+                'u_acadev_slow', 'u_acadev_error', 'u_acadev_tester']))
+            self.assertFalse(gws.is_member_of_all('javerage', [
+                'u_acadev_slow', 'u_acadev_unittest']))
+            self.assertFalse(released.is_set())
+            released.set()
+
+            # An error is raised only if it could change the answer
+            self.assertRaises(
+                DataFailureException, gws.is_member_of_any, 'javerage',
+                ['u_acadev_error', 'u_acadev_unittest'])
+
+    def test_is_member_of_any_cached(self):
+        cache = MemoryCache()
+        gws = GWS(cache=cache)
+        groups = ['u_acadev_tester', 'u_acadev_unittest']
+        self.assertTrue(gws.is_member_of_all('javerage', groups))
+
+        with mock.patch.object(gws.DAO, 'getURL') as get_url:
+            self.assertTrue(gws.is_member_of_all('javerage', groups))
+            self.assertTrue(gws.is_member_of_any('javerage', groups))
+            self.assertEqual(get_url.call_count, 0)
+
     def test_is_direct_member(self):
         gws = GWS()
 
@@ -295,6 +512,28 @@ class GWSGroupTest(TestCase):
                           'url': None})
         self.assertIsNotNone(str(groups[0]))
 
+    def test_groups_for_members(self):
+        gws = GWS()
+        results = list(gws.groups_for_members(["javerage", "javerage"]))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], "javerage")
+        self.assertEqual(len(results[0][1]), 7)
+
+        results = dict(gws.groups_for_members(["javerage"], effective=False))
+        self.assertEqual(len(results["javerage"]), 15)
+
+        results = dict(gws.groups_for_members(
+            ["javerage"], stem="uw_affiliation"))
+        self.assertEqual(sorted(g.name for g in results["javerage"]), [
+            "uw_affiliation_seattle-student",
+            "uw_affiliation_staff-employee",
+            "uw_affiliation_undergraduate"])
+
+        # Failed searches are yielded with their error
+        results = dict(gws.groups_for_members(["nobody", "javerage"]))
+        self.assertIsInstance(results["nobody"], DataFailureException)
+        self.assertEqual(len(results["javerage"]), 7)
+
     def test_affiliates(self):
         group = GWS().get_group_by_id('u_acadev_unittest')
         self.assertEqual(len(group.affiliates), 0)
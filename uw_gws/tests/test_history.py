@@ -0,0 +1,97 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from datetime import datetime
+from uw_gws import GWS
+from uw_gws.history import MembershipTimeline
+from uw_gws.tests.fixtures import history
+from uw_gws.utilities import fdao_gws_override
+import mock
+import os
+import tempfile
+
+DAY = 86400
+NOW = 100 * DAY
+
+
+def ms(day):
+    return int(day * DAY * 1000)
+
+
+EVENTS = [
+    history("add member: 'one'", ms(10)),
+    history("add member: 'two'", ms(20.5)),
+    history("delete member: 'one'", ms(50.5)),
+    history("add member: 'three'", ms(90.5)),
+]
+
+
+def get_history(group_id, activity, start):
+    return [h for h in EVENTS if h.timestamp >= start * 1000]
+
+
+@fdao_gws_override
+@mock.patch("uw_gws.history.time.time", return_value=NOW)
+@mock.patch.object(GWS, "get_group_history", side_effect=get_history)
+class MembershipTimelineTest(TestCase):
+    def test_membership_at(self, mock_history, mock_time):
+        gws = GWS()
+        with mock.patch.object(GWS, "get_members") as mock_members:
+            mock_members.return_value = [
+                gws._group_member_from_json({"id": netid, "type": "uwnetid"})
+                for netid in ["base", "two", "three"]]
+            timeline = MembershipTimeline(gws, checkpoint_interval=10 * DAY)
+
+            self.assertEqual(timeline.membership_at("u_acadev_x", 95 * DAY),
+                             set(["base", "two", "three"]))
+            self.assertEqual(mock_members.call_count, 1)
+            self.assertEqual(timeline.checkpoints("u_acadev_x"), [
+                d * DAY * 1000 for d in range(100, 90, -10)][::-1])
+
+            self.assertEqual(timeline.membership_at("u_acadev_x", 60 * DAY),
+                             set(["base", "two"]))
+            mock_history.assert_called_with(
+                "u_acadev_x", activity="membership", start=60 * DAY)
+            self.assertEqual(timeline.membership_at("u_acadev_x", 30 * DAY),
+                             set(["base", "one", "two"]))
+            self.assertEqual(timeline.membership_at("u_acadev_x", 15 * DAY),
+                             set(["base", "one"]))
+            self.assertEqual(timeline.membership_at("u_acadev_x", 5 * DAY),
+                             set(["base"]))
+            self.assertEqual(timeline.membership_at(
+                "u_acadev_x", datetime.fromtimestamp(21 * DAY)),
+                set(["base", "one", "two"]))
+            self.assertEqual(mock_members.call_count, 1)
+            self.assertEqual(len(timeline.checkpoints("u_acadev_x")), 10)
+
+            # The nearest checkpoint bounds the replayed window
+            mock_history.reset_mock()
+            timeline.membership_at("u_acadev_x", 52 * DAY)
+            mock_history.assert_called_once_with(
+                "u_acadev_x", activity="membership", start=50 * DAY)
+
+    def test_save_load(self, mock_history, mock_time):
+        gws = GWS()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "checkpoints.json")
+            timeline = MembershipTimeline(gws, checkpoint_interval=30 * DAY,
+                                          path=path)
+            members = timeline.membership_at("u_acadev_unittest", 80 * DAY)
+            self.assertEqual(members, set(["javerage", "eight"]))
+            timeline.save()
+
+            loaded = MembershipTimeline(gws, path=path)
+            self.assertEqual(loaded.checkpoints("u_acadev_unittest"),
+                             timeline.checkpoints("u_acadev_unittest"))
+            self.assertEqual(loaded.membership_at("u_acadev_unittest",
+                                                  55 * DAY),
+                             set(["javerage", "eight"]))
+
+    def test_gws_membership_at(self, mock_history, mock_time):
+        gws = GWS()
+        self.assertEqual(gws.membership_at("u_acadev_unittest", 5 * DAY),
+                         set(["javerage", "eight"]))
+        self.assertEqual(gws.membership_at("u_acadev_unittest", 15 * DAY),
+                         set(["javerage", "eight", "one"]))
+        self.assertIsNotNone(gws._timeline)
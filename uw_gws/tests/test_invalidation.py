@@ -0,0 +1,141 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException
+from uw_gws import GWS, acting_as
+from uw_gws.cache import MemoryCache
+from uw_gws.invalidation import HistoryInvalidator
+from uw_gws.tests.fixtures import history
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import fdao_gws_override
+import mock
+
+
+@fdao_gws_override
+class HistoryInvalidatorTest(TestCase):
+    def setUp(self):
+        self.cache = MemoryCache()
+        self.gws = GWS(cache=self.cache)
+        patcher = mock.patch.object(
+            self.gws.DAO, "getURL", wraps=self.gws.DAO.getURL)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.read()
+        self.assertEqual(self.mock_get.call_count, 4)
+
+    def read(self):
+        self.gws.get_group_by_id("u_acadev_unittest")
+        self.gws.get_members("u_acadev_unittest")
+        self.gws.search_groups(member="javerage")
+        with acting_as("javerage"):
+            self.gws.get_group_by_id("u_acadev_unittest")
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_membership_change(self, mock_history):
+        changes = []
+        invalidator = HistoryInvalidator(
+            self.gws, group_ids=["u_acadev_unittest"], since=1626190000,
+            on_change=lambda group_id, c: changes.append((group_id, c)))
+        self.assertEqual(invalidator.watched, ["u_acadev_unittest"])
+
+        mock_history.return_value = [
+            history("delete member: 'eight'", 1626193233239)]
+        self.assertEqual(invalidator.poll(), 1)
+        # History is polled once, for every activity
+        mock_history.assert_called_once_with(
+            "u_acadev_unittest", start=1626190000)
+        self.assertEqual(invalidator.cursor("u_acadev_unittest"),
+                         1626193233239)
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0][1][0].member_uwnetid, "eight")
+
+        # The group's reads, for every act_as, and searches are fetched
+        self.read()
+        self.assertEqual(self.mock_get.call_count, 8)
+
+        # Events at or before the cursor are not applied again
+        self.assertEqual(invalidator.poll(), 0)
+        mock_history.assert_called_with(
+            "u_acadev_unittest", start=1626193233)
+        self.assertEqual(len(changes), 1)
+        self.read()
+        self.assertEqual(self.mock_get.call_count, 8)
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_group_change(self, mock_history):
+        invalidator = HistoryInvalidator(self.gws, since=1626190000)
+        self.assertEqual(invalidator.poll(), 0)
+        invalidator.watch("u_acadev_unittest")
+
+        mock_history.return_value = [
+            history("set admin acl for: 'u_acadev_unittest'",
+                    1626193233239, "acl"),
+            history("set displayName to 'Renamed'", 1626193233240, "group"),
+            history("not a change to cached reads", 1626193233241,
+                    "other")]
+        self.assertEqual(invalidator.poll(), 2)
+        self.assertEqual(invalidator.cursor("u_acadev_unittest"),
+                         1626193233241)
+        self.read()
+        self.assertEqual(self.mock_get.call_count, 8)
+
+        invalidator.unwatch("u_acadev_unittest")
+        self.assertEqual(invalidator.watched, [])
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_history_error(self, mock_history):
+        invalidator = HistoryInvalidator(
+            self.gws, group_ids=["u_acadev_unittest"])
+        mock_history.side_effect = DataFailureException("url", 500, "")
+        self.assertEqual(invalidator.poll(), 0)
+        self.read()
+        self.assertEqual(self.mock_get.call_count, 4)
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_same_millisecond(self, mock_history):
+        changes = []
+        invalidator = HistoryInvalidator(
+            self.gws, group_ids=["u_acadev_unittest"], since=1626190000,
+            on_change=lambda group_id, c: changes.extend(c))
+        first = history("add member: 'a1'", 1626193233239)
+        second = history("add member: 'a2'", 1626193233239)
+
+        mock_history.return_value = [first]
+        invalidator.poll()
+        # A change made later in the same millisecond
+        mock_history.return_value = [first, second]
+        invalidator.poll()
+        invalidator.poll()
+        self.assertEqual([c.member_uwnetid for c in changes], ["a1", "a2"])
+        self.assertEqual(invalidator.cursor("u_acadev_unittest"),
+                         1626193233239)
+
+
+class HistoryInvalidatorLiveTest(LiveGWSTestCase):
+    def test_poll(self):
+        cache = MemoryCache()
+        gws = GWS(cache=cache)
+        invalidator = HistoryInvalidator(gws, group_ids=["u_acadev_unittest"])
+        self.assertEqual(invalidator.poll(), 0)
+        self.assertEqual(len(gws.get_members("u_acadev_unittest")), 2)
+
+        # Changes made by other systems, after the first poll
+        other = GWS()
+        members = ["eight", "javerage"]
+        for netid in ("a1", "a2", "a3"):
+            other.add_members("u_acadev_unittest", [netid])
+            members.append(netid)
+            self.assertGreater(invalidator.poll(), 0)
+            self.assertEqual(sorted(
+                m.name for m in gws.get_members("u_acadev_unittest")),
+                sorted(members))
+        self.assertEqual(invalidator.poll(), 0)
+
+        # A rename by another system evicts the cached group document
+        group = gws.get_group_by_id("u_acadev_unittest")
+        group.display_name = "Renamed"
+        other.update_group(group)
+        self.assertGreater(invalidator.poll(), 0)
+        self.assertEqual(
+            gws.get_group_by_id("u_acadev_unittest").display_name, "Renamed")
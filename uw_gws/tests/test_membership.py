@@ -0,0 +1,104 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.exceptions import InvalidGroupID
+from uw_gws.membership import MembershipStore, SymbolTable
+from uw_gws.models import GroupMember
+from uw_gws.refresh import Refresher
+from uw_gws.utilities import fdao_gws_override
+
+
+@fdao_gws_override
+class MembershipStoreTest(TestCase):
+    def test_crawl(self):
+        gws = GWS()
+        store = MembershipStore()
+        errors = store.crawl(gws, ["u_acadev_unittest", "u_acadev_tester",
+                                   "bad group"])
+        self.assertEqual(list(errors), ["bad group"])
+        self.assertIsInstance(errors["bad group"], InvalidGroupID)
+        self.assertEqual(store.group_ids(),
+                         ["u_acadev_tester", "u_acadev_unittest"])
+
+        # Members convert back to what GWS returns
+        def json_data(members):
+            return sorted((m.json_data() for m in members),
+                          key=lambda d: d["id"])
+        self.assertEqual(
+            json_data(store.members("u_acadev_tester")),
+            json_data(gws.get_effective_members("u_acadev_tester")))
+
+        self.assertTrue(store.is_member("u_acadev_unittest", "javerage"))
+        self.assertFalse(store.is_member("u_acadev_unittest", "nine"))
+        self.assertFalse(store.is_member("u_acadev_unittest", "javerage",
+                                         type="eppn"))
+        self.assertRaises(KeyError, store.is_member, "u_acadev_x", "eight")
+        self.assertEqual(store.groups_for("nine"), ["u_acadev_tester"])
+        self.assertEqual(store.groups_for("seven"),
+                         ["u_acadev_tester", "u_acadev_unittest"])
+
+        store.crawl(gws, ["u_acadev_unittest"], effective=False)
+        self.assertEqual(store.member_set("u_acadev_unittest").names(),
+                         ["eight", "javerage"])
+
+    def test_set_operations(self):
+        store = MembershipStore()
+        store.update_json("a", [{"id": n, "type": "uwnetid"}
+                                for n in ("one", "two", "three")])
+        store.update("b", [GroupMember(name="two", type="uwnetid"),
+                           GroupMember(name="four", type="uwnetid"),
+                           GroupMember(name="u_acadev_x", type="group")])
+        self.assertEqual(store.intersection("a", "b").names(), ["two"])
+        self.assertEqual(store.union("a", "b").names(),
+                         ["four", "one", "three", "two"])
+        self.assertEqual(store.union("a", "b").names(type="group"),
+                         ["u_acadev_x"])
+        self.assertEqual(store.difference("a", "b").names(),
+                         ["one", "three"])
+
+        members = store.member_set("b")
+        self.assertEqual(len(members), 3)
+        self.assertIn("four", members)
+        self.assertIn(("u_acadev_x", "group"), members)
+        self.assertNotIn("one", members)
+        self.assertEqual(members & store.member_set("b"), members)
+        self.assertEqual([m.name for m in (members - store.member_set(
+            "a")).to_members()], ["four", "u_acadev_x"])
+
+        other = MembershipStore()
+        other.update("b", [])
+        self.assertRaises(ValueError, members.__or__, other.member_set("b"))
+
+    def test_shared_symbols(self):
+        symbols = SymbolTable()
+        first = MembershipStore(symbols)
+        second = MembershipStore(symbols)
+        first.update_json("a", [{"id": "javerage", "type": "uwnetid",
+                                 "mtype": "indirect", "source": "b"}])
+        second.update_json("a", [{"id": "javerage", "type": "uwnetid",
+                                  "mtype": "direct"}])
+        # Repeated members and attributes are interned once
+        self.assertEqual(len(symbols), 3)
+        self.assertEqual(first.member_set("a"), second.member_set("a"))
+        member = first.members("a")[0]
+        self.assertEqual((member.mtype, member.source), ("indirect", "b"))
+        self.assertGreater(first.nbytes(), 0)
+        first.remove("a")
+        self.assertNotIn("a", first)
+        self.assertEqual(len(first), 0)
+
+    def test_refresher_store(self):
+        store = MembershipStore()
+        refresher = Refresher(GWS(), store=store)
+        members = refresher.get_effective_members("u_acadev_unittest")
+        self.assertIn("u_acadev_unittest", store)
+        cached = refresher.get_effective_members("u_acadev_unittest")
+        self.assertEqual(sorted(m.name for m in cached),
+                         sorted(m.name for m in members))
+        self.assertEqual(refresher.stats["hits"], 1)
+
+        refresher.invalidate("u_acadev_unittest")
+        self.assertNotIn("u_acadev_unittest", store)
+        refresher.stop()
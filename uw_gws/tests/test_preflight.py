@@ -0,0 +1,90 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from restclients_core.exceptions import DataFailureException
+from uw_gws import GWS
+from uw_gws.exceptions import PreflightFailed
+from uw_gws.models import GroupMember
+from uw_gws.preflight import Problem
+from uw_gws.utilities import fdao_gws_override
+import mock
+
+
+@fdao_gws_override
+class PreflightTest(TestCase):
+    def test_group_exists(self):
+        gws = GWS()
+        self.assertTrue(gws.group_exists("u_acadev_unittest"))
+        self.assertFalse(gws.group_exists("u_acadev_nonexistent"))
+
+    def test_local(self):
+        report = GWS().preflight(
+            ["u_acadev_unittest", "bad group", None],
+            members={"u_acadev_new": [
+                "javerage", "bad netid",
+                ("javerage@washington.edu", "eppn"), ("javerage@", "eppn"),
+                GroupMember(name="u_acadev_tester", type="group"),
+                {"id": "host.example.edu", "type": "dns"},
+                {"id": "host..edu", "type": "dns"},
+                ("x", "person"), ("a", "uwnetid", "b"), None],
+                "u/bad": []})
+        self.assertFalse(report.ok)
+        self.assertEqual((report.group_ids, report.members, report.lookups),
+                         (5, 10, 0))
+        self.assertEqual([str(p) for p in report.problems], [
+            "invalid group bad group", "invalid group None",
+            "invalid uwnetid bad netid in u_acadev_new",
+            "invalid eppn javerage@ in u_acadev_new",
+            "invalid dns host..edu in u_acadev_new",
+            "invalid person x in u_acadev_new: unknown member type",
+            "invalid member ('a', 'uwnetid', 'b') in u_acadev_new: "
+            "not a member identifier",
+            "invalid member None in u_acadev_new: not a member identifier",
+            "invalid group u/bad"])
+        self.assertEqual(report.invalid_group_ids(), [
+            "bad group", None, "u/bad"])
+        self.assertEqual(report.counts(), {"invalid": 9})
+
+        with self.assertRaises(PreflightFailed) as cm:
+            report.raise_for_problems()
+        self.assertIs(cm.exception.report, report)
+        self.assertIn("5 group ids, 10 members, 0 lookups: 9 invalid",
+                      str(cm.exception))
+
+        report = GWS().preflight(members={"u_acadev_new": ["javerage"]})
+        self.assertTrue(report.ok)
+        report.raise_for_problems()
+
+    def test_check_exists(self):
+        gws = GWS()
+        members = [("u_acadev_unittest", "group"),
+                   ("u_acadev_nonexistent", "group"), "javerage"]
+        with mock.patch.object(GWS, "group_exists",
+                               wraps=gws.group_exists) as exists:
+            report = gws.preflight(
+                ["u_acadev_tester", "u_acadev_nonexistent"],
+                members={"u_acadev_a": members, "u_acadev_b": members},
+                check_exists=True)
+        # Each distinct group is looked up once
+        self.assertEqual(exists.call_count, 3)
+        self.assertEqual(report.lookups, 3)
+        self.assertEqual([p.json_data() for p in report.problems], [
+            {"kind": "not found", "name": "u_acadev_nonexistent",
+             "type": "group", "group_id": group_id, "reason": None}
+            for group_id in (None, "u_acadev_a", "u_acadev_b")])
+
+        # Groups of the batch may be created by it, so aren't looked up
+        with mock.patch.object(GWS, "group_exists") as exists:
+            report = gws.preflight(members={
+                "u_acadev_new": [("u_acadev_other", "group")],
+                "u_acadev_other": []}, check_exists=True)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.lookups, 0)
+        self.assertFalse(exists.called)
+
+        with mock.patch.object(GWS, "group_exists", side_effect=(
+                DataFailureException("url", 500, "error"))):
+            report = gws.preflight(["u_acadev_tester"], check_exists=True)
+        self.assertEqual([p.kind for p in report.problems],
+                         [Problem.UNCHECKED])
@@ -0,0 +1,130 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from uw_gws import GWS, uncached
+from uw_gws.cache import MemoryCache
+from uw_gws.models import Group, GroupEntity, GroupMember
+from uw_gws.reconcile import Operation, Plan, Reconciler
+from uw_gws.tests.live import LiveGWSTestCase
+import mock
+
+
+class ReconcilerTest(LiveGWSTestCase):
+    def desired(self):
+        tester = GWS().get_group_by_id("u_acadev_tester")
+        tester.uwregid = None
+        tester.display_name = "ACA Tester"
+        new = Group(name="u_acadev_new", display_name="New")
+        new.admins = [GroupEntity(name="javerage", type="uwnetid")]
+        return [tester, new]
+
+    def test_plan_apply(self):
+        gws = GWS()
+        reconciler = Reconciler(gws, stem="u_acadev", max_writes=2)
+        members = {
+            "u_acadev_new": ["a1", GroupMember(name="u_acadev_unittest",
+                                               type="group")],
+            "u_acadev_tester": ["javerage", "eight", "nine", "six"],
+        }
+        plan = reconciler.plan(self.desired(), members)
+        self.assertEqual(plan.diff(), "\n".join([
+            "+ u_acadev_new",
+            "~ u_acadev_new members: +a1 +u_acadev_unittest",
+            "~ u_acadev_tester: displayName",
+            "~ u_acadev_tester members: -seven",
+            "- u_acadev_unittest"]))
+        self.assertEqual(plan.counts(), {
+            "create": 1, "update": 1, "members": 2, "delete": 1})
+        self.assertEqual(plan.json_data()[1], {
+            "action": "members", "id": "u_acadev_new",
+            "add": ["a1", "u_acadev_unittest"], "remove": []})
+
+        puts = self.server.requests.get("PUT", 0)
+        self.assertEqual(reconciler.apply(plan), {})
+        # create, update and update_members, then delete_members and delete
+        self.assertEqual(self.server.requests["PUT"] - puts, 3)
+        self.assertEqual(self.server.requests["DELETE"], 2)
+
+        self.assertEqual(gws.get_group_by_id(
+            "u_acadev_tester").display_name, "ACA Tester")
+        self.assertEqual(sorted(m.name for m in gws.get_members(
+            "u_acadev_new")), ["a1", "u_acadev_unittest"])
+        self.assertEqual(reconciler.plan(self.desired()[1:], members).diff(),
+                         "- u_acadev_tester")
+        self.assertEqual(len(Reconciler(gws).plan([], members)), 0)
+
+    def test_plan_uncached(self):
+        cache = MemoryCache()
+        gws = GWS(cache=cache)
+        desired = gws.get_group_by_id("u_acadev_tester")
+        gws.get_members("u_acadev_tester")
+
+        # Changes made by other clients aren't in the cache
+        other = GWS()
+        group = other.get_group_by_id("u_acadev_tester")
+        group.display_name = "Changed"
+        other.update_group(group)
+        other.delete_members("u_acadev_tester", ["seven"])
+        self.assertNotEqual(gws.get_group_by_id(
+            "u_acadev_tester").display_name, "Changed")
+
+        plan = Reconciler(gws).plan([desired], {"u_acadev_tester": [
+            "javerage", "eight", "nine", "six", "seven"]})
+        self.assertEqual(plan.diff(), "\n".join([
+            "~ u_acadev_tester: displayName",
+            "~ u_acadev_tester members: +seven"]))
+
+        # and the reads refresh it
+        self.assertEqual(gws.get_group_by_id(
+            "u_acadev_tester").display_name, "Changed")
+        with uncached():
+            self.assertEqual(len(gws.get_members("u_acadev_tester")), 4)
+
+    def test_member_replace(self):
+        gws = GWS()
+        reconciler = Reconciler(gws)
+        members = {"u_acadev_unittest": ["javerage", "nine"]}
+        plan = reconciler.plan([gws.get_group_by_id("u_acadev_unittest")],
+                               members)
+        self.assertEqual([op.action for op in plan], [Operation.MEMBERS])
+
+        puts = self.server.requests.get("PUT", 0)
+        self.assertEqual(reconciler.apply(plan), {})
+        self.assertEqual(self.server.requests["PUT"] - puts, 1)
+        self.assertEqual(sorted(m.name for m in gws.get_members(
+            "u_acadev_unittest")), ["javerage", "nine"])
+        self.assertEqual(len(reconciler.plan(
+            [gws.get_group_by_id("u_acadev_unittest")], members)), 0)
+
+    def test_apply_order(self):
+        gws = GWS()
+        written = []
+        plan = Plan([
+            Operation(Operation.CREATE, "u_acadev_x_stem_child",
+                      Group(name="u_acadev_x_stem_child")),
+            Operation(Operation.DELETE, "u_acadev_old"),
+            Operation(Operation.CREATE, "u_acadev_x_stem",
+                      Group(name="u_acadev_x_stem")),
+            Operation(Operation.DELETE, "u_acadev_old_child"),
+            Operation(Operation.UPDATE, "u_acadev_x",
+                      Group(name="u_acadev_x"), ["displayName"])])
+        with mock.patch.object(
+                gws, "create_group", lambda g: written.append(g.name)), \
+                mock.patch.object(
+                gws, "update_group", lambda g: written.append(g.name)), \
+                mock.patch.object(gws, "delete_group", written.append):
+            self.assertEqual(Reconciler(gws, max_writes=8).apply(plan), {})
+
+        # Parents are written before their children, and deleted after
+        self.assertEqual(written, [
+            "u_acadev_x", "u_acadev_x_stem", "u_acadev_x_stem_child",
+            "u_acadev_old_child", "u_acadev_old"])
+
+    def test_apply_errors(self):
+        gws = GWS()
+        reconciler = Reconciler(gws)
+        plan = reconciler.plan(self.desired())
+        self.server.behavior.error_rate = 1.0
+        errors = reconciler.apply(plan)
+        self.assertEqual(sorted(errors), ["u_acadev_new", "u_acadev_tester"])
+        self.assertEqual(errors["u_acadev_new"].status, 500)
@@ -0,0 +1,267 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS, acting_as
+from uw_gws.cache import MemoryCache
+from uw_gws.membership import MembershipStore
+from uw_gws.models import GroupMember
+from uw_gws.refresh import Refresher
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import fdao_gws_override
+import mock
+import threading
+import time
+
+
+@fdao_gws_override
+@mock.patch("uw_gws.refresh.time.time")
+class RefresherTest(TestCase):
+    def setUp(self):
+        self.gws = GWS()
+        patcher = mock.patch.object(
+            self.gws, "get_group_by_id", wraps=self.gws.get_group_by_id)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fresh_and_stale(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws, ttl=60, max_stale=600,
+                              hot_threshold=10)
+        group = refresher.get_group_by_id("u_acadev_tester")
+        self.assertEqual(group.name, "u_acadev_tester")
+        self.assertIs(refresher.get_group_by_id("u_acadev_tester"), group)
+        self.assertEqual(self.mock_get.call_count, 1)
+
+        # Stale entries are served while a refresh runs
+        mock_time.return_value = 1100.0
+        self.assertIs(refresher.get_group_by_id("u_acadev_tester"), group)
+        refresher.wait()
+        self.assertEqual(self.mock_get.call_count, 2)
+        self.assertIsNot(refresher.get_group_by_id("u_acadev_tester"), group)
+
+        # Entries past max_stale are fetched on the request path
+        mock_time.return_value = 2000.0
+        refresher.get_group_by_id("u_acadev_tester")
+        self.assertEqual(self.mock_get.call_count, 3)
+        self.assertEqual(refresher.stats["hits"], 2)
+        self.assertEqual(refresher.stats["stale_hits"], 1)
+        self.assertEqual(refresher.stats["misses"], 2)
+        self.assertEqual(refresher.stats["refreshes"], 1)
+
+        members = refresher.get_effective_members("u_acadev_unittest")
+        self.assertEqual(len(members), 3)
+        self.assertRaises(ValueError, refresher.get, "delete_group", "x")
+        refresher.stop()
+
+    def test_hot_refresh_ahead(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws, ttl=100, refresh_ahead=0.5,
+                              hot_threshold=3)
+        for i in range(4):
+            refresher.get_group_by_id("u_acadev_tester")
+        refresher.get_group_by_id("course_2012aut-train102a")
+
+        mock_time.return_value = 1060.0
+        self.assertEqual(refresher.refresh_due(), 1)
+        refresher.wait()
+        self.assertEqual(self.mock_get.call_count, 3)
+        self.assertEqual(self.mock_get.call_args[0][0], "u_acadev_tester")
+
+        # Accesses to a hot entry trigger the refresh too
+        mock_time.return_value = 1120.0
+        refresher.get_group_by_id("u_acadev_tester")
+        refresher.wait()
+        self.assertEqual(self.mock_get.call_count, 4)
+        refresher.stop()
+
+    def test_limits(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws, ttl=10, max_per_minute=1)
+        refresher.get_group_by_id("u_acadev_tester")
+        refresher.get_group_by_id("u_acadev_unittest")
+
+        mock_time.return_value = 1020.0
+        refresher.get_group_by_id("u_acadev_tester")
+        refresher.get_group_by_id("u_acadev_unittest")
+        refresher.wait()
+        self.assertEqual(self.mock_get.call_count, 3)
+        self.assertEqual(refresher.stats["throttled"], 1)
+
+        mock_time.return_value = 1080.0
+        refresher.get_group_by_id("u_acadev_unittest")
+        refresher.wait()
+        self.assertEqual(self.mock_get.call_count, 4)
+
+        refresher.invalidate("u_acadev_unittest")
+        refresher.get_group_by_id("u_acadev_unittest")
+        self.assertEqual(self.mock_get.call_count, 5)
+        refresher.stop()
+
+    def test_refresh_error(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws, ttl=10)
+        group = refresher.get_group_by_id("u_acadev_tester")
+
+        mock_time.return_value = 1020.0
+        self.mock_get.side_effect = Exception("unavailable")
+        self.assertIs(refresher.get_group_by_id("u_acadev_tester"), group)
+        refresher.wait()
+        self.assertEqual(refresher.stats["refresh_errors"], 1)
+        self.assertIs(refresher.get_group_by_id("u_acadev_tester"), group)
+        refresher.stop()
+
+    def test_max_entries(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws, max_entries=2)
+        for i in range(3):
+            refresher.get_group_by_id("u_acadev_tester")
+        refresher.get_group_by_id("u_acadev_unittest")
+        refresher.get_group_by_id("course_2012aut-train102a")
+        self.assertIn(("get_group_by_id", "u_acadev_tester", None),
+                      refresher._entries)
+        self.assertEqual(len(refresher._entries), 2)
+        refresher.stop()
+
+    def test_store_act_as(self, mock_time):
+        mock_time.return_value = 1000.0
+        store = MembershipStore()
+        refresher = Refresher(self.gws, store=store)
+        with mock.patch.object(self.gws, "get_effective_members") as get:
+            get.side_effect = lambda group_id: [GroupMember(
+                name=self.gws._acting_as() or "self", type="uwnetid")]
+            members = refresher.get_effective_members("u_acadev_unittest")
+            other = refresher.get_effective_members(
+                "u_acadev_unittest", act_as="javerage")
+
+        # Only the client's own read is in the store, shared by group id
+        self.assertEqual([m.name for m in members], ["self"])
+        self.assertEqual([m.name for m in other], ["javerage"])
+        self.assertEqual([m.name for m in store.members(
+            "u_acadev_unittest")], ["self"])
+        self.assertEqual([m.name for m in refresher.get_effective_members(
+            "u_acadev_unittest", act_as="javerage")], ["javerage"])
+        self.assertEqual(get.call_count, 2)
+
+        refresher.invalidate("u_acadev_unittest")
+        self.assertNotIn("u_acadev_unittest", store)
+        refresher.stop()
+
+    def test_store_client_act_as(self, mock_time):
+        mock_time.return_value = 1000.0
+        store = MembershipStore()
+        refresher = Refresher(GWS(act_as="javerage"), store=store)
+        members = refresher.get_effective_members("u_acadev_unittest")
+        self.assertEqual(store.group_ids(), ["u_acadev_unittest"])
+        self.assertEqual(
+            sorted(m.name for m in refresher.get_effective_members(
+                "u_acadev_unittest", act_as="javerage")),
+            sorted(m.name for m in members))
+        self.assertEqual(refresher.stats["hits"], 1)
+        refresher.stop()
+
+    def test_refresh_bypasses_cache(self, mock_time):
+        mock_time.return_value = 1000.0
+        gws = GWS(cache=MemoryCache())
+        refresher = Refresher(gws, ttl=10)
+        with mock.patch.object(
+                gws.DAO, "getURL", wraps=gws.DAO.getURL) as mock_get:
+            refresher.get_group_by_id("u_acadev_tester")
+            calls = mock_get.call_count
+
+            mock_time.return_value = 1020.0
+            refresher.get_group_by_id("u_acadev_tester")
+            refresher.wait()
+            self.assertEqual(refresher.stats["refreshes"], 1)
+            self.assertGreater(mock_get.call_count, calls)
+        refresher.stop()
+
+    def test_invalidate_during_fetch(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws, ttl=10)
+        fetched = []
+
+        def invalidate_then_get(group_id):
+            # The group is written while the fetch runs
+            refresher.invalidate(group_id)
+            fetched.append(group_id)
+            return mock.DEFAULT
+
+        self.mock_get.side_effect = invalidate_then_get
+        refresher.get_group_by_id("u_acadev_tester")
+        self.assertEqual(refresher._entries, {})
+        self.mock_get.side_effect = None
+        refresher.get_group_by_id("u_acadev_tester")
+        refresher.get_group_by_id("u_acadev_tester")
+        self.assertEqual(self.mock_get.call_count, 2)
+
+        # Refreshes too
+        mock_time.return_value = 1020.0
+        self.mock_get.side_effect = invalidate_then_get
+        refresher.get_group_by_id("u_acadev_tester")
+        refresher.wait()
+        self.assertEqual(self.mock_get.call_count, 3)
+        self.assertEqual(refresher._entries, {})
+        self.assertEqual(len(fetched), 2)
+        refresher.stop()
+
+    def test_shared_miss(self, mock_time):
+        mock_time.return_value = 1000.0
+        refresher = Refresher(self.gws)
+        release = threading.Event()
+
+        def slow_get(group_id):
+            release.wait(5)
+            return mock.DEFAULT
+
+        self.mock_get.side_effect = slow_get
+        groups = []
+        threads = [threading.Thread(target=lambda: groups.append(
+            refresher.get_group_by_id("u_acadev_tester"))) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for i in range(500):
+            if refresher.stats["shared_misses"] == 2:
+                break
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.mock_get.call_count, 1)
+        self.assertEqual(refresher.stats["misses"], 3)
+        self.assertEqual(refresher.stats["shared_misses"], 2)
+        self.assertEqual(len(groups), 3)
+        self.assertTrue(all(g is groups[0] for g in groups))
+        refresher.stop()
+
+
+class RefresherLiveTest(LiveGWSTestCase):
+    def test_start_refresher(self):
+        gws = GWS()
+        refresher = gws.start_refresher(ttl=60)
+        self.assertIs(gws.refresher, refresher)
+        with mock.patch.object(gws.DAO, "getURL",
+                               wraps=gws.DAO.getURL) as mock_get:
+            group = gws.get_group_by_id("u_acadev_tester")
+            self.assertIs(gws.get_group_by_id("u_acadev_tester"), group)
+            members = gws.get_effective_members("u_acadev_unittest")
+            self.assertIs(gws.get_effective_members("u_acadev_unittest"),
+                          members)
+            self.assertEqual(mock_get.call_count, 2)
+
+            # Entries are kept per act_as user
+            with acting_as("javerage"):
+                self.assertIsNot(gws.get_group_by_id("u_acadev_tester"),
+                                 group)
+            self.assertEqual(mock_get.call_count, 3)
+
+            # Writes drop the group's entries
+            gws.add_members("u_acadev_unittest", ["a1"])
+            self.assertIn("a1", [
+                m.name for m in gws.get_effective_members(
+                    "u_acadev_unittest")])
+            self.assertEqual(mock_get.call_count, 4)
+
+        refresher.stop()
+        self.assertIsNone(gws.refresher)
@@ -0,0 +1,103 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.deadline import deadline
+from uw_gws.exceptions import DeadlineExceeded
+from uw_gws.scheduler import (
+    BULK, DEFAULT, INTERACTIVE, RequestScheduler, current_priority, priority)
+from uw_gws.utilities import fdao_gws_override, map_concurrent
+import threading
+import time
+
+
+def wait_for(condition, timeout=2):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.005)
+    return condition()
+
+
+class RequestSchedulerTest(TestCase):
+    def test_priority(self):
+        self.assertEqual(current_priority(), DEFAULT)
+        self.assertEqual(current_priority(INTERACTIVE), INTERACTIVE)
+        with priority(BULK):
+            self.assertEqual(current_priority(INTERACTIVE), BULK)
+            # Batch operations run in the caller's priority
+            self.assertEqual(list(map_concurrent(
+                lambda i: current_priority(), [1])), [(1, BULK, None)])
+        self.assertRaises(ValueError, priority("urgent").__enter__)
+
+    def test_preemption(self):
+        scheduler = RequestScheduler(max_concurrent=2)
+        self.assertEqual(scheduler.reserved, {
+            INTERACTIVE: 1, DEFAULT: 0, BULK: 0})
+        scheduler.acquire(BULK)
+        scheduler.acquire(BULK)
+
+        started = []
+
+        def request(name):
+            scheduler.acquire(name)
+            started.append(name)
+
+        threads = []
+        for name in (BULK, DEFAULT, INTERACTIVE):
+            threads.append(threading.Thread(target=request, args=(name,)))
+            threads[-1].start()
+            self.assertTrue(wait_for(
+                lambda: scheduler.stats()[name]["queued"] == 1))
+
+        stats = scheduler.stats()
+        self.assertEqual(stats[BULK]["running"], 2)
+        self.assertEqual(stats[BULK]["queued"], 1)
+        self.assertEqual(stats[INTERACTIVE]["queued"], 1)
+
+        # Freed slots go to the waiting classes in priority order
+        scheduler.release(BULK)
+        self.assertTrue(wait_for(lambda: started == [INTERACTIVE]))
+        scheduler.release(BULK)
+        self.assertTrue(wait_for(lambda: started == [INTERACTIVE, DEFAULT]))
+        scheduler.release(INTERACTIVE)
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(started, [INTERACTIVE, DEFAULT, BULK])
+
+        stats = scheduler.stats()
+        self.assertEqual(stats[INTERACTIVE]["requests"], 1)
+        self.assertEqual(stats[BULK]["requests"], 3)
+        self.assertEqual(stats[BULK]["queued"], 0)
+        self.assertGreater(stats[BULK]["max_wait_ms"], 0)
+
+    def test_shares_and_limits(self):
+        scheduler = RequestScheduler(max_concurrent=4, limits={BULK: 1})
+        scheduler.acquire(DEFAULT)
+        scheduler.acquire(DEFAULT)
+        scheduler.acquire(BULK)
+        # Bulk is at its limit, the last slot is left for other classes
+        with deadline(0.05):
+            self.assertRaises(DeadlineExceeded, scheduler.acquire, BULK)
+        self.assertEqual(scheduler.stats()[BULK]["queued"], 0)
+        scheduler.acquire(INTERACTIVE)
+        with deadline(0.05):
+            self.assertRaises(DeadlineExceeded, scheduler.acquire,
+                              INTERACTIVE)
+
+    @fdao_gws_override
+    def test_gws_requests(self):
+        scheduler = RequestScheduler(max_concurrent=4)
+        gws = GWS(scheduler=scheduler)
+        self.assertTrue(gws.is_effective_member("u_acadev_unittest",
+                                                "javerage"))
+        self.assertEqual(len(gws.get_members("u_acadev_unittest")), 2)
+        with priority(BULK):
+            gws.get_effective_members("u_acadev_unittest")
+            gws.is_effective_member("u_acadev_unittest", "eight")
+
+        stats = scheduler.stats()
+        self.assertEqual(stats[INTERACTIVE]["requests"], 1)
+        self.assertEqual(stats[DEFAULT]["requests"], 1)
+        self.assertEqual(stats[BULK]["requests"], 2)
+        self.assertEqual(sum(s["running"] for s in stats.values()), 0)
@@ -0,0 +1,83 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws import GWS
+from uw_gws.models import Group
+from uw_gws.tracing import Tracer, profile
+from uw_gws.utilities import fdao_gws_override
+import io
+import json
+import mock
+import os
+import tempfile
+
+
+@fdao_gws_override
+class TracingTest(TestCase):
+    def test_spans(self):
+        tracer = Tracer()
+        gws = GWS(tracer=tracer)
+        gws.get_effective_members("u_acadev_unittest")
+        names = [span["name"] for span in tracer.spans]
+        self.assertEqual(names, ["network", "decompress", "decode", "parse",
+                                 "get_effective_members"])
+
+        # Stages nest within the call
+        call = tracer.spans[-1]
+        for span in list(tracer.spans)[:-1]:
+            self.assertGreaterEqual(span["ts"], call["ts"])
+            self.assertLessEqual(span["ts"] + span["dur"],
+                                 call["ts"] + call["dur"] + 1)
+        self.assertEqual(tracer.spans[0]["args"]["url"],
+                         "/group_sws/v3/group/u_acadev_unittest/"
+                         "effective_member")
+
+        tracer.clear()
+        gws.create_group(Group(name="u_acadev_tester", display_name="New"))
+        self.assertEqual([span["name"] for span in tracer.spans], [
+            "serialize", "serialize", "network", "decompress", "decode",
+            "parse", "create_group"])
+
+        summary = tracer.summary()
+        self.assertEqual(summary["serialize"]["count"], 2)
+        self.assertEqual(summary["create_group"]["count"], 1)
+
+    def test_sampling(self):
+        tracer = Tracer(sample_rate=0.5)
+        gws = GWS(tracer=tracer)
+        with mock.patch("uw_gws.tracing.random.random",
+                        side_effect=[0.9, 0.1]):
+            gws.is_effective_member("u_acadev_unittest", "javerage")
+            gws.is_effective_member("u_acadev_unittest", "eight")
+        self.assertEqual([span["name"] for span in tracer.spans],
+                         ["network", "decompress", "is_member"])
+        self.assertEqual(GWS(tracer=Tracer(sample_rate=0)).get_members(
+            "u_acadev_unittest")[0].name, "javerage")
+
+    def test_chrome_trace(self):
+        tracer = Tracer(max_spans=3)
+        GWS(tracer=tracer).get_group_by_id("u_acadev_tester")
+        self.assertEqual(len(tracer.spans), 3)
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            tracer.dump(path)
+            with open(path) as f:
+                data = json.load(f)
+        finally:
+            os.remove(path)
+        self.assertEqual(data["displayTimeUnit"], "ms")
+        self.assertEqual(data["traceEvents"][-1]["name"], "get_group_by_id")
+        for event in data["traceEvents"]:
+            self.assertEqual(event["ph"], "X")
+            self.assertIn("tid", event)
+
+    def test_profile(self):
+        stream = io.StringIO()
+        with profile(stream=stream, limit=5) as result:
+            GWS().get_effective_members("u_acadev_unittest")
+        self.assertIn("uw_gws", stream.getvalue())
+        self.assertIn("get_effective_members", stream.getvalue())
+        self.assertGreater(result.stats.total_calls, 0)
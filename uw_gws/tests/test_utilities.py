@@ -0,0 +1,19 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from uw_gws.utilities import map_concurrent
+
+
+class MapConcurrentTest(TestCase):
+    def test_map_concurrent(self):
+        def square(x):
+            if x == 3:
+                raise ValueError(x)
+            return x * x
+
+        results = dict((item, (result, ex)) for item, result, ex in
+                       map_concurrent(square, iter(range(10)), 3))
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results[4], (16, None))
+        self.assertIsInstance(results[3][1], ValueError)
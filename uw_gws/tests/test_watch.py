@@ -0,0 +1,187 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest import TestCase
+from itertools import islice
+from restclients_core.exceptions import DataFailureException
+from uw_gws import GWS
+from uw_gws.cache import MemoryCache
+from uw_gws.exceptions import InvalidGroupID
+from uw_gws.tests.fixtures import history
+from uw_gws.tests.live import LiveGWSTestCase
+from uw_gws.utilities import fdao_gws_override
+from uw_gws.watch import MemberAdded, MemberDeleted, WatchCursor
+import asyncio
+import mock
+import time
+
+
+HISTORY = [history("add member: 'five'", 1626190001000),
+           history("add member: 'six'", 1626190002000),
+           history("delete member: 'eight'", 1626190002000)]
+
+
+@fdao_gws_override
+class WatcherTest(TestCase):
+    @mock.patch.object(GWS, "get_group_history")
+    def test_events(self, mock_history):
+        mock_history.side_effect = lambda group_id, **kwargs: [
+            h for h in HISTORY if h.timestamp >= kwargs["start"] * 1000]
+        gws = GWS()
+        watcher = gws.watch(["u_acadev_tester"], since=1626190000,
+                            min_interval=0)
+        events = list(islice(watcher, 2))
+        self.assertEqual(events, [
+            MemberAdded("u_acadev_tester", "five", 1626190001000, ""),
+            MemberAdded("u_acadev_tester", "six", 1626190002000, "")])
+        mock_history.assert_called_once_with(
+            "u_acadev_tester", activity="membership", start=1626190000)
+
+        # A cursor saved before the last event was handled delivers it again
+        cursor = watcher.cursor().json_data()
+        self.assertEqual(cursor, {"u_acadev_tester": {
+            "timestamp": 1626190002000, "seen": ["add member: 'six'"]}})
+        resumed = gws.watch(["u_acadev_tester"], since=cursor)
+        event = next(iter(resumed))
+        self.assertIsInstance(event, MemberDeleted)
+        self.assertEqual(event.json_data(), {
+            "group_id": "u_acadev_tester", "action": "delete",
+            "member": "eight", "timestamp": 1626190002000})
+        self.assertEqual(resumed.cursor(), WatchCursor({"u_acadev_tester": (
+            1626190002000, ["add member: 'six'", "delete member: 'eight'"])}))
+        self.assertEqual(resumed.poll(), [])
+
+        self.assertRaises(InvalidGroupID, gws.watch, ["bad group"])
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_intervals(self, mock_history):
+        clock = [1000.0]
+        changes = {"u_acadev_tester": HISTORY[:1], "u_acadev_unittest": []}
+        mock_history.side_effect = lambda group_id, **kwargs: changes[
+            group_id]
+        with mock.patch("uw_gws.watch.time.monotonic", lambda: clock[0]):
+            watcher = GWS().watch(
+                ["u_acadev_tester", "u_acadev_unittest"], since=1626190000,
+                min_interval=1, max_interval=4)
+            events = watcher.poll()
+            self.assertEqual(len(events), 1)
+            watcher.ack(events[0])
+            # The busy group is polled again soon, the idle one backs off
+            self.assertEqual(watcher.interval("u_acadev_tester"), 1)
+            self.assertEqual(watcher.interval("u_acadev_unittest"), 2)
+            self.assertEqual(watcher.delay(), 1)
+
+            clock[0] += 1
+            watcher.poll()
+            self.assertEqual(mock_history.call_count, 3)
+            self.assertEqual(watcher.interval("u_acadev_tester"), 2)
+
+            for i in range(4):
+                clock[0] += 4
+                watcher.poll()
+            self.assertEqual(watcher.interval("u_acadev_unittest"), 4)
+
+            # Errors are logged and the group backs off
+            mock_history.side_effect = DataFailureException("", 500, "")
+            watcher.remove("u_acadev_unittest")
+            watcher.add("u_acadev_unittest")
+            self.assertEqual(watcher.poll(), [])
+            self.assertEqual(watcher.watched,
+                             ["u_acadev_tester", "u_acadev_unittest"])
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_unexpected_error(self, mock_history):
+        clock = [1000.0]
+
+        def get_history(group_id, **kwargs):
+            if group_id == "u_acadev_unittest":
+                raise ValueError(group_id)
+            return HISTORY[:1]
+
+        mock_history.side_effect = get_history
+        with mock.patch("uw_gws.watch.time.monotonic", lambda: clock[0]):
+            watcher = GWS().watch(
+                ["u_acadev_tester", "u_acadev_unittest"], since=1626190000,
+                min_interval=1, max_interval=4)
+            self.assertRaises(ValueError, watcher.poll)
+
+            # Every due group stays scheduled, the failed one backs off
+            self.assertEqual(watcher.interval("u_acadev_tester"), 1)
+            self.assertEqual(watcher.interval("u_acadev_unittest"), 2)
+            mock_history.side_effect = lambda group_id, **kwargs: []
+            clock[0] += 2
+            self.assertEqual(watcher.poll(), [])
+            self.assertEqual(mock_history.call_count, 4)
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_async(self, mock_history):
+        mock_history.return_value = HISTORY
+        watcher = GWS().watch(["u_acadev_tester"], since=1626190000,
+                              min_interval=0)
+
+        async def collect():
+            events = []
+            async for event in watcher:
+                events.append(event)
+                if len(events) == 3:
+                    watcher.stop()
+            return events
+
+        events = asyncio.run(collect())
+        self.assertEqual([(e.action, e.member) for e in events], [
+            ("add", "five"), ("add", "six"), ("delete", "eight")])
+
+    @mock.patch.object(GWS, "get_group_history")
+    def test_stop(self, mock_history):
+        mock_history.return_value = []
+        watcher = GWS().watch(["u_acadev_tester"], min_interval=60)
+
+        # A watcher stopped before iterating yields nothing
+        watcher.stop()
+        self.assertEqual(list(watcher), [])
+        self.assertFalse(mock_history.called)
+
+        # stop() wakes an async iterator waiting for the next poll
+        watcher = GWS().watch(["u_acadev_tester"], min_interval=60)
+
+        async def collect():
+            asyncio.get_running_loop().call_later(0.1, watcher.stop)
+            return [event async for event in watcher]
+
+        start = time.time()
+        self.assertEqual(asyncio.run(collect()), [])
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(mock_history.call_count, 1)
+
+
+class WatcherLiveTest(LiveGWSTestCase):
+    def test_watch(self):
+        gws = GWS()
+        watcher = gws.watch(["u_acadev_tester", "u_acadev_unittest"],
+                            min_interval=0)
+        self.assertEqual(watcher.poll(), [])
+
+        # Changes made in the same millisecond are each delivered
+        gws.add_members("u_acadev_unittest", ["a1", "a2"])
+        gws.delete_members("u_acadev_tester", ["six"])
+        events = list(islice(watcher, 3))
+        self.assertEqual(sorted((e.group_id, e.action, e.member)
+                                for e in events), [
+            ("u_acadev_tester", "delete", "six"),
+            ("u_acadev_unittest", "add", "a1"),
+            ("u_acadev_unittest", "add", "a2")])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_watch_cached(self):
+        # History is polled from GWS, not from the client's cache
+        gws = GWS(cache=MemoryCache())
+        watcher = gws.watch(["u_acadev_unittest"], min_interval=0)
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [])
+
+        GWS().add_members("u_acadev_unittest", ["a1"])
+        events = watcher.poll()
+        self.assertEqual([(e.action, e.member) for e in events],
+                         [("add", "a1")])
+        watcher.ack(events[0])
+        self.assertEqual(watcher.poll(), [])
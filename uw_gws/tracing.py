@@ -0,0 +1,155 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Opt-in tracing and profiling of GWS calls.
+
+    tracer = Tracer(sample_rate=0.1)
+    gws = GWS(tracer=tracer)
+    ...
+    tracer.dump("gws_trace.json")   # open in ui.perfetto.dev
+
+    with profile("gws.prof.txt"):
+        gws.get_effective_members("u_acadev_unittest")
+
+Each sampled GWS call records a span for the call and for its stages:
+network, decompress, decode (json loads), parse (building models) and
+serialize (json_data and json dumps).
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# The tracer of the current call and whether the call is sampled
+_current = ContextVar("uw_gws_trace", default=None)
+
+
+class Tracer(object):
+    def __init__(self, sample_rate=1.0, max_spans=100000):
+        """
+        :param sample_rate: fraction of top level calls that are recorded
+        :param max_spans: spans kept, the oldest are dropped first
+        """
+        self.sample_rate = sample_rate
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **args):
+        """
+        Records the block as a span.  A span with no enclosing span starts
+        a new trace, which is sampled at sample_rate; spans within it are
+        recorded only if it is sampled.
+        """
+        current = _current.get()
+        token = None
+        if current is None or current[0] is not self:
+            sampled = random.random() < self.sample_rate
+            token = _current.set((self, sampled))
+        else:
+            sampled = current[1]
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if sampled:
+                self._record(name, start, time.perf_counter(), args)
+            if token is not None:
+                _current.reset(token)
+
+    def _record(self, name, start, end, args):
+        span = {"name": name, "cat": "uw_gws", "ph": "X",
+                "ts": start * 1e6, "dur": (end - start) * 1e6,
+                "pid": os.getpid(), "tid": threading.get_ident()}
+        if len(args):
+            span["args"] = args
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self):
+        """
+        Returns a dict of span name to its count and total and average time.
+        """
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            count, total = totals.get(span["name"], (0, 0.0))
+            totals[span["name"]] = (count + 1, total + span["dur"])
+        return dict((name, {"count": count, "total_ms": total / 1000,
+                            "avg_ms": total / count / 1000})
+                    for name, (count, total) in totals.items())
+
+    def chrome_trace(self):
+        """
+        Returns the spans in Chrome trace event format, which Perfetto and
+        chrome://tracing load.
+        """
+        with self._lock:
+            return {"traceEvents": list(self.spans),
+                    "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+def traced(method):
+    """
+    Records calls to a GWS method as spans, if the client has a tracer.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.tracer is None:
+            return method(self, *args, **kwargs)
+        with self.tracer.span(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ProfileResult(object):
+    def __init__(self):
+        self.stats = None
+
+
+@contextmanager
+def profile(path=None, limit=30, stream=None, sort="cumulative"):
+    """
+    Profiles the block with cProfile and writes a summary of the uw_gws
+    functions, sorted by cumulative time, to path or stream (default
+    stderr).  The pstats.Stats are available as the yielded object's
+    stats attribute after the block.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    result = ProfileResult()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        result.stats = pstats.Stats(profiler, stream=out)
+        result.stats.sort_stats(sort).print_stats("uw_gws", limit)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(out.getvalue())
+        else:
+            (stream or sys.stderr).write(out.getvalue())
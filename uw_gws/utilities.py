@@ -3,6 +3,63 @@
 
 
 from commonconf import override_settings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from itertools import islice
+from uw_gws.deadline import remaining
+from uw_gws.exceptions import DeadlineExceeded
 
 
 fdao_gws_override = override_settings(RESTCLIENTS_GWS_DAO_CLASS='Mock')
+
+
+def map_concurrent(func, items, max_workers=8, wait_running=True):
+    """
+    Calls func on each of items using a pool of max_workers threads, and
+    yields (item, result, exception) tuples as the calls complete.  Only a
+    bounded window of items is pulled from the iterable at once, so items
+    can be an unbounded stream.  Calls run in the caller's context, so
+    they share its deadline.
+
+    If the deadline passes, the items not completed are yielded with a
+    DeadlineExceeded exception.
+
+    If the caller stops early, calls not yet started are cancelled.  Pass
+    wait_running=False to return without waiting for the running calls.
+    """
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+
+    def submit(count):
+        for item in islice(items, count):
+            pending[executor.submit(copy_context().run, func, item)] = item
+
+    try:
+        submit(max_workers * 2)
+        while len(pending):
+            done, _ = wait(pending, timeout=remaining(),
+                           return_when=FIRST_COMPLETED)
+            if not len(done):
+                break
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as ex:
+                    yield item, None, ex
+            submit(len(done))
+
+        if len(pending):
+            # The deadline passed, running calls are left to time out
+            wait_running = False
+            for future, item in list(pending.items()):
+                future.cancel()
+                yield item, None, DeadlineExceeded()
+            for item in items:
+                yield item, None, DeadlineExceeded()
+    finally:
+        # The caller stopped early, drop the calls not yet started
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=wait_running)
@@ -0,0 +1,371 @@
+# Copyright 2025 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+A stream of membership changes across many groups, read from group history.
+
+    watcher = gws.watch(group_ids, since=cursor)
+    for event in watcher:
+        handle(event)
+        save(watcher.cursor())
+
+or, in a coroutine, "async for event in watcher".
+
+Each group is polled on its own interval, which drops to min_interval when
+the group has changes and backs off to max_interval while it is idle, so a
+few busy groups don't cost a request per idle group per poll.
+
+Delivery is at least once.  The cursor moves past an event as the event is
+yielded, so a cursor saved after an event is handled resumes after it, and
+events not yet handled are delivered again.  History timestamps are in
+milliseconds and several changes can share one, so the cursor keeps the
+descriptions already delivered at its timestamp.
+"""
+
+from contextvars import copy_context
+from datetime import datetime
+from functools import partial
+from heapq import heappop, heappush
+from restclients_core.exceptions import DataFailureException
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MembershipEvent(object):
+    """
+    A member added to or deleted from a group.
+    """
+    action = None
+
+    def __init__(self, group_id, member, timestamp, description):
+        """
+        :param timestamp: epoch milliseconds, as in GroupHistory
+        """
+        self.group_id = group_id
+        self.member = member
+        self.timestamp = timestamp
+        self.description = description
+
+    @staticmethod
+    def from_history(group_id, history):
+        """
+        Returns the event for a GroupHistory, None if it isn't a member
+        add or delete.
+        """
+        if history.is_add_member():
+            cls = MemberAdded
+        elif history.is_delete_member():
+            cls = MemberDeleted
+        else:
+            return None
+        return cls(group_id, history.member_uwnetid, history.timestamp,
+                   history.description)
+
+    def json_data(self):
+        return {
+            "group_id": self.group_id,
+            "action": self.action,
+            "member": self.member,
+            "timestamp": self.timestamp,
+        }
+
+    def __eq__(self, other):
+        return (type(self) is type(other) and
+                self.json_data() == other.json_data())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "{}({!r}, {!r}, {})".format(
+            type(self).__name__, self.group_id, self.member, self.timestamp)
+
+
+class MemberAdded(MembershipEvent):
+    action = "add"
+
+
+class MemberDeleted(MembershipEvent):
+    action = "delete"
+
+
+class WatchCursor(object):
+    """
+    The position of a Watcher in each group's history, as the latest
+    timestamp delivered and the descriptions delivered at it.
+    """
+    def __init__(self, positions=None):
+        self._positions = dict(
+            (group_id, (int(timestamp), frozenset(seen)))
+            for group_id, (timestamp, seen) in (positions or {}).items())
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(dict((group_id, (d["timestamp"], d["seen"]))
+                        for group_id, d in data.items()))
+
+    def json_data(self):
+        return dict((group_id, {"timestamp": timestamp,
+                                "seen": sorted(seen)})
+                    for group_id, (timestamp, seen) in self._positions.items())
+
+    def get(self, group_id):
+        return self._positions.get(group_id)
+
+    def __contains__(self, group_id):
+        return group_id in self._positions
+
+    def __eq__(self, other):
+        return (isinstance(other, WatchCursor) and
+                self._positions == other._positions)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class Watcher(object):
+    """
+    Multiplexes membership history polling across groups with adaptive
+    intervals, yielding MemberAdded and MemberDeleted events.  Iterate it,
+    or async iterate it, until stop() is called.  A stopped watcher
+    yields no more events.
+    """
+    def __init__(self, gws, group_ids, since=None, min_interval=5,
+                 max_interval=300, backoff=2, max_workers=8):
+        """
+        :param gws: the GWS client used for polling
+        :param since: a WatchCursor or its json_data to resume from, or
+            epoch seconds or a datetime to start from, defaults to now.
+            Groups not in a cursor start from now.
+        :param min_interval: seconds between polls of a group with changes
+        :param max_interval: seconds between polls of an idle group
+        :param backoff: the factor an idle group's interval grows by
+        :param max_workers: the most groups polled at once
+        """
+        self.gws = gws
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # (loop, asyncio.Event) waking each async iterator on stop()
+        self._wakers = set()
+        self._positions = {}
+        self._intervals = {}
+        self._next = {}
+        self._due = []
+
+        if isinstance(since, dict):
+            since = WatchCursor.from_json(since)
+        if isinstance(since, WatchCursor):
+            self._cursor, since = since, None
+        else:
+            self._cursor = WatchCursor()
+        if isinstance(since, datetime):
+            since = since.timestamp()
+        self._since = since
+        for group_id in group_ids:
+            self.add(group_id)
+
+    def add(self, group_id, since=None):
+        """
+        Starts watching a group, from since (epoch seconds) if given.
+        """
+        position = self._cursor.get(group_id)
+        if since is None and position is None:
+            since = self._since if self._since is not None else time.time()
+        if since is not None:
+            position = (int(since * 1000), frozenset())
+        with self._lock:
+            if group_id not in self._positions:
+                self._positions[group_id] = position
+                self._intervals[group_id] = self.min_interval
+                self._schedule(group_id, time.monotonic())
+
+    def remove(self, group_id):
+        with self._lock:
+            self._positions.pop(group_id, None)
+            self._intervals.pop(group_id, None)
+            self._next.pop(group_id, None)
+
+    @property
+    def watched(self):
+        return sorted(self._positions)
+
+    def interval(self, group_id):
+        """
+        Returns the current seconds between polls of the group.
+        """
+        return self._intervals[group_id]
+
+    def cursor(self):
+        """
+        Returns a WatchCursor to resume from, past every event yielded.
+        """
+        with self._lock:
+            return WatchCursor(self._positions)
+
+    def stop(self):
+        """
+        Ends iteration, waking iterators waiting for the next poll.  Can be
+        called from any thread.
+        """
+        self._stopped.set()
+        with self._lock:
+            wakers = list(self._wakers)
+        for loop, wake in wakers:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                # The loop is closed
+                pass
+
+    def poll(self):
+        """
+        Polls the groups that are due and returns their new events, oldest
+        first within each group.  The cursor doesn't move until the events
+        are yielded, or passed to ack().
+
+        A group whose history can't be read backs off like an idle group.
+        An error other than DataFailureException is raised once every due
+        group is rescheduled.
+        """
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while len(self._due) and self._due[0][0] <= now:
+                when, group_id = heappop(self._due)
+                # Skips entries left by remove() or an earlier add()
+                if self._next.get(group_id) == when:
+                    del self._next[group_id]
+                    due.append(group_id)
+
+        from uw_gws.utilities import map_concurrent
+
+        events = []
+        error = None
+        pending = set(due)
+        try:
+            for group_id, history, ex in map_concurrent(
+                    self._history, due, self.max_workers):
+                pending.discard(group_id)
+                new = []
+                try:
+                    if ex is not None:
+                        raise ex
+                    new = self._new_events(group_id, history)
+                except DataFailureException as ex:
+                    logger.warning("history {}: {}".format(group_id, ex))
+                except Exception as ex:
+                    logger.warning("history {}: {!r}".format(group_id, ex))
+                    if error is None:
+                        error = ex
+                self._reschedule(group_id, len(new) > 0)
+                events.extend(new)
+        finally:
+            # Groups not polled, if the loop ended early, stay scheduled
+            for group_id in pending:
+                self._reschedule(group_id, False)
+
+        if error is not None:
+            raise error
+        return events
+
+    def ack(self, event):
+        """
+        Moves the cursor past event.
+        """
+        with self._lock:
+            position = self._positions.get(event.group_id)
+            if position is None or event.timestamp < position[0]:
+                return
+            seen = position[1] if event.timestamp == position[0] else ()
+            self._positions[event.group_id] = (
+                event.timestamp, frozenset(seen).union([event.description]))
+
+    def delay(self):
+        """
+        Returns the seconds until the next group is due.
+        """
+        with self._lock:
+            if not len(self._due):
+                return self.max_interval
+            return max(0, self._due[0][0] - time.monotonic())
+
+    def __iter__(self):
+        while not self._stopped.is_set():
+            for event in self.poll():
+                self.ack(event)
+                yield event
+                if self._stopped.is_set():
+                    return
+            self._stopped.wait(self.delay())
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        loop = asyncio.get_running_loop()
+        waker = (loop, asyncio.Event())
+        with self._lock:
+            self._wakers.add(waker)
+        try:
+            while not self._stopped.is_set():
+                # Polls in the executor with the caller's context, so the
+                # requests share its deadline and act_as
+                events = await loop.run_in_executor(
+                    None, partial(copy_context().run, self.poll))
+                for event in events:
+                    self.ack(event)
+                    yield event
+                    if self._stopped.is_set():
+                        return
+                try:
+                    await asyncio.wait_for(waker[1].wait(), self.delay())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._wakers.discard(waker)
+
+    def _history(self, group_id):
+        with self._lock:
+            position = self._positions.get(group_id)
+        if position is None:
+            return []
+        return self.gws.get_group_history(
+            group_id, activity="membership", start=position[0] // 1000)
+
+    def _new_events(self, group_id, history):
+        with self._lock:
+            position = self._positions.get(group_id)
+        if position is None:
+            return []
+        timestamp, seen = position
+        events = []
+        for h in history:
+            if h.timestamp > timestamp or (
+                    h.timestamp == timestamp and h.description not in seen):
+                event = MembershipEvent.from_history(group_id, h)
+                if event is not None:
+                    events.append(event)
+        return events
+
+    def _reschedule(self, group_id, changed):
+        with self._lock:
+            if group_id not in self._intervals:
+                return
+            interval = self.min_interval if changed else min(
+                self._intervals[group_id] * self.backoff, self.max_interval)
+            self._intervals[group_id] = interval
+            self._schedule(group_id, time.monotonic() + interval)
+
+    def _schedule(self, group_id, when):
+        self._next[group_id] = when
+        heappush(self._due, (when, group_id))